@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.repositories.alert_repo import AlertRepository
 from app.repositories.delivery_repo import DeliveryRepository
 from app.repositories.preference_repo import UserPreferenceRepository
@@ -32,7 +32,7 @@ def update_alert(alert_id: UUID, update_data: dict, db: Session = Depends(get_db
 # ------------------ SPECIFIC ROUTES ------------------
 
 @router.get("/active")
-def list_active_alerts(db: Session = Depends(get_db)):
+def list_active_alerts(db: Session = Depends(get_read_db)):
     alert_repo = AlertRepository(db)
     alert_service = AlertService(alert_repo)
     return alert_service.list_active_alerts()
@@ -83,7 +83,7 @@ def list_alerts(
     severity: Optional[str] = Query(None, description="Filter by severity: Info, Warning, Critical"),
     status: Optional[str] = Query(None, description="Filter by status: active, expired, archived"),
     audience: Optional[str] = Query(None, description="Filter by audience: org, team, user"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     alert_repo = AlertRepository(db)
     alert_service = AlertService(alert_repo)
@@ -1,24 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
 
-from app.db.session import get_db
+from app.core.settings import settings
+from app.db.session import get_read_db
 from app.services.analytics_service import AnalyticsService
 from app.repositories.alert_repo import AlertRepository
 from app.repositories.delivery_repo import DeliveryRepository
+from app.repositories.delivery_archive_repo import DeliveryArchiveRepository
 from app.repositories.preference_repo import UserPreferenceRepository
 from app.repositories.user_repo import UserRepository
 
 router = APIRouter(prefix="/analytics")
 
-def get_analytics_service(db: Session = Depends(get_db)):
+def get_analytics_service(db: Session = Depends(get_read_db)):
     """Dependency to create AnalyticsService with all required repositories."""
     alert_repo = AlertRepository(db)
     delivery_repo = DeliveryRepository(db)
     pref_repo = UserPreferenceRepository(db)
     user_repo = UserRepository(db)
+    archive_repo = DeliveryArchiveRepository(settings.DELIVERY_ARCHIVE_DIR)
     
-    return AnalyticsService(alert_repo, delivery_repo, pref_repo, user_repo)
+    return AnalyticsService(alert_repo, delivery_repo, pref_repo, user_repo, archive_repo)
 
 @router.get("/dashboard")
 def get_analytics_dashboard(service: AnalyticsService = Depends(get_analytics_service)):
@@ -49,10 +54,19 @@ def get_system_health(service: AnalyticsService = Depends(get_analytics_service)
 @router.get("/trends")
 def get_trends(
     days: int = 7,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = Query("day", description="Bucket size: hour, day, week"),
+    severity: Optional[str] = Query(None, description="Filter by severity: Info, Warning, Critical"),
+    team_id: Optional[UUID] = None,
+    group_by: Optional[str] = Query(None, description="Break down by: severity, team"),
     service: AnalyticsService = Depends(get_analytics_service)
 ):
     """Get trending analytics over time (Admin only)"""
-    return service.get_trend_analytics(days)
+    try:
+        return service.get_trend_analytics(days, start, end, granularity, severity, team_id, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/severity/breakdown")
 def get_severity_breakdown(service: AnalyticsService = Depends(get_analytics_service)):
@@ -62,4 +76,26 @@ def get_severity_breakdown(service: AnalyticsService = Depends(get_analytics_ser
 @router.get("/engagement/summary")
 def get_engagement_summary(service: AnalyticsService = Depends(get_analytics_service)):
     """Get user engagement summary (Admin only)"""
-    return service.get_engagement_summary()
\ No newline at end of file
+    return service.get_engagement_summary()
+
+@router.get("/teams")
+def get_team_analytics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Get engagement analytics broken down by team (Admin only)"""
+    return service.get_team_analytics(start, end)
+
+@router.get("/teams/{team_id}")
+def get_single_team_analytics(
+    team_id: UUID,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Get engagement analytics for a specific team (Admin only)"""
+    analytics = service.get_single_team_analytics(team_id, start, end)
+    if not analytics:
+        raise HTTPException(status_code=404, detail="Team not found")
+    return analytics
@@ -0,0 +1,79 @@
+import io
+from typing import Optional
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.settings import settings
+from app.db.session import get_db
+from app.repositories.alert_repo import AlertRepository
+from app.repositories.team_repo import TeamRepository
+from app.repositories.user_repo import UserRepository
+from app.services.import_service import IMPORT_FORMATS, BulkImportService, read_records
+
+router = APIRouter()
+
+class _RequestBody(io.RawIOBase):
+    """The request body as a blocking file for a worker thread; each read awaits the next
+    chunk on the event loop, so rows are imported while the upload is still arriving."""
+
+    def __init__(self, request: Request):
+        self._chunks = request.stream().__aiter__()
+        self._pending = b""
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._done:
+            try:
+                self._pending = anyio.from_thread.run(self._chunks.__anext__)
+            except StopAsyncIteration:
+                self._done = True
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+def _import_format(request: Request, format: Optional[str]) -> str:
+    """Helper method to pick the format from ?format= or else the Content-Type (NDJSON by default)."""
+    if format:
+        if format not in IMPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(IMPORT_FORMATS)}")
+        return format
+    return "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+async def _run_import(request: Request, format: Optional[str], chunk_size: Optional[int], db: Session, kind: str):
+    """Helper method to stream the body through BulkImportService on a worker thread."""
+    fmt = _import_format(request, format)
+    service = BulkImportService(TeamRepository(db), UserRepository(db), AlertRepository(db),
+                                chunk_size=chunk_size or settings.IMPORT_CHUNK_SIZE)
+    importer = getattr(service, f"import_{kind}")
+
+    def run() -> dict:
+        body = io.TextIOWrapper(io.BufferedReader(_RequestBody(request)), encoding="utf-8-sig",
+                                errors="replace", newline="")
+        with body:
+            return importer(read_records(body, fmt)).as_dict()
+
+    return await run_in_threadpool(run)
+
+@router.post("/teams/import")
+async def import_teams(request: Request, format: Optional[str] = None,
+                       chunk_size: Optional[int] = Query(None, ge=1, le=10000), db: Session = Depends(get_db)):
+    """Bulk-create teams from an NDJSON or CSV body with a name per row (Admin only)"""
+    return await _run_import(request, format, chunk_size, db, "teams")
+
+@router.post("/users/import")
+async def import_users(request: Request, format: Optional[str] = None,
+                       chunk_size: Optional[int] = Query(None, ge=1, le=10000), db: Session = Depends(get_db)):
+    """Bulk-create users from an NDJSON or CSV body; teams may be given by name (Admin only)"""
+    return await _run_import(request, format, chunk_size, db, "users")
+
+@router.post("/alerts/import")
+async def import_alerts(request: Request, format: Optional[str] = None,
+                        chunk_size: Optional[int] = Query(None, ge=1, le=10000), db: Session = Depends(get_db)):
+    """Bulk-create alerts from an NDJSON or CSV body (Admin only)"""
+    return await _run_import(request, format, chunk_size, db, "alerts")
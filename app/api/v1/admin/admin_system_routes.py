@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from uuid import UUID
 
-from app.db.session import get_db
+from app.core.profiling import request_profiler
+from app.core.settings import settings
+from app.db.session import get_db, replica_router
+from app.db.slow_queries import slow_query_log
+from app.repositories.outbox_repo import OutboxRepository
 from app.services.scheduler_service import scheduler_service
+from app.services.outbox_worker import outbox_worker
+from app.channels.circuit_breaker import circuit_breakers
+from app.repositories.alert_cache import active_alert_cache
+from app.repositories.directory import user_directory
 from app.channels.factory import ChannelFactory, ChannelType
 
 router = APIRouter(prefix="/system")
@@ -78,8 +87,8 @@ def test_channel_configuration(channel_config: Dict[str, Any]):
         channel_type = ChannelType(channel_type_str)
         config = channel_config.get("config", {})
         
-        # Create channel instance
-        channel = ChannelFactory.create_channel(channel_type, config)
+        # Create a bare channel instance; probing a config must not touch the shared breaker
+        channel = ChannelFactory.create_channel(channel_type, {**config, "circuit_breaker": False})
         
         # Validate configuration
         is_valid = channel.validate_config()
@@ -94,6 +103,27 @@ def test_channel_configuration(channel_config: Dict[str, Any]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Channel test failed: {str(e)}")
 
+@router.get("/outbox")
+def get_outbox_status(db: Session = Depends(get_db)):
+    """Get outbox backlog per channel and worker status (Admin only)"""
+    outbox_repo = OutboxRepository(db)
+    counts: Dict[str, Dict[str, int]] = {}
+    for channel, status, count in outbox_repo.get_status_counts():
+        counts.setdefault(channel, {})[status] = count
+    return {
+        "worker": outbox_worker.get_status(),
+        "entries": counts,
+        "dead_letters": outbox_repo.get_dead_entries(limit=20)
+    }
+
+@router.post("/outbox/{entry_id}/requeue")
+def requeue_outbox_entry(entry_id: UUID, db: Session = Depends(get_db)):
+    """Requeue a dead-lettered outbox entry (Admin only)"""
+    entry = OutboxRepository(db).requeue(entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Outbox entry not found")
+    return {"message": f"Outbox entry {entry_id} requeued", "entry": entry}
+
 @router.get("/health")
 def get_system_health():
     """Get overall system health status (Admin only)"""
@@ -111,6 +141,15 @@ def get_system_health():
     if scheduler_jobs["total_jobs"] == 0:
         health_status = "warning" 
         issues.append("No scheduled jobs found")
+
+    for channel_name in circuit_breakers.open_channels():
+        health_status = "warning"
+        issues.append(f"Circuit open for channel {channel_name}")
+
+    for replica in replica_router.replicas:
+        if replica.checked_at is not None and not replica.healthy:
+            health_status = "warning"
+            issues.append(f"Read replica {replica.name} unavailable")
     
     return {
         "status": health_status,
@@ -120,18 +159,54 @@ def get_system_health():
         },
         "channels": {
             "available_types": len(ChannelFactory.get_available_channel_types()),
-            "default_configured": True  # In-app is always available
+            "default_configured": True,  # In-app is always available
+            "breakers": circuit_breakers.snapshot()
+        },
+        "database": {
+            "read_replicas": replica_router.status()
+        },
+        "caches": {
+            "active_alerts": active_alert_cache.stats(),
+            "user_directory": user_directory.stats()
         },
         "issues": issues,
         "checked_at": scheduler_jobs.get("checked_at")
     }
 
+@router.get("/profiling")
+def get_request_profiling(top: Optional[int] = Query(None, ge=1, le=100)):
+    """Get the slowest and most-queried routes over recent profiled requests (Admin only)"""
+    return request_profiler.snapshot(top)
+
+@router.post("/profiling/reset")
+def reset_request_profiling():
+    """Clear the profiled request window (Admin only)"""
+    request_profiler.reset()
+    return {"message": "Request profiles cleared"}
+
+@router.get("/slow-queries")
+def get_slow_queries(limit: Optional[int] = Query(None, ge=1, le=1000)):
+    """Get recent slow statements with their plans, and totals per statement (Admin only)"""
+    return {"enabled": settings.SLOW_QUERY_LOG_ENABLED, **slow_query_log.snapshot(limit)}
+
+@router.post("/slow-queries/reset")
+def reset_slow_queries():
+    """Clear the slow query log and its cached plans (Admin only)"""
+    slow_query_log.reset()
+    return {"message": "Slow query log cleared"}
+
 @router.post("/maintenance/cleanup")
 def run_maintenance_cleanup():
     """Run maintenance cleanup tasks (Admin only)"""
     result = scheduler_service.trigger_job_manually("cleanup_expired")
     return {"message": "Maintenance cleanup triggered", "result": result}
 
+@router.post("/maintenance/archive")
+def run_delivery_archival():
+    """Archive deliveries older than the retention window (Admin only)"""
+    result = scheduler_service.trigger_job_manually("archive_deliveries")
+    return {"message": "Delivery archival triggered", "result": result}
+
 @router.get("/configuration")
 def get_system_configuration():
     """Get current system configuration (Admin only)"""
@@ -155,7 +230,12 @@ def get_system_configuration():
             "jobs": [
                 {"name": "2-hour reminders", "frequency": "every 2 hours"},
                 {"name": "daily snooze reset", "frequency": "daily at midnight"},
-                {"name": "cleanup expired", "frequency": "daily at 2 AM"}
+                {"name": "cleanup expired", "frequency": "daily at 2 AM"},
+                {"name": "archive deliveries", "frequency": "daily at 3 AM"}
             ]
+        },
+        "delivery_retention": {
+            "hot_days": settings.DELIVERY_RETENTION_DAYS,
+            "archive_layout": "monthly compressed columnar segments"
         }
     }
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.repositories.team_repo import TeamRepository
 
 router = APIRouter(prefix="/teams")
@@ -27,7 +27,7 @@ def get_team(team_id: str, db: Session = Depends(get_db)):
     return team
 
 @router.get("/")
-def list_teams(db: Session = Depends(get_db)):
+def list_teams(db: Session = Depends(get_read_db)):
     """List all teams (Admin only)"""
     team_repo = TeamRepository(db)
     return team_repo.get_all_teams()
@@ -51,7 +51,7 @@ def delete_team(team_id: str, db: Session = Depends(get_db)):
     return {"message": f"Team {team_id} deleted successfully"}
 
 @router.get("/{team_id}/users")
-def get_team_users(team_id: str, db: Session = Depends(get_db)):
+def get_team_users(team_id: str, db: Session = Depends(get_read_db)):
     """Get all users in a team (Admin only)"""
     from app.repositories.user_repo import UserRepository
     
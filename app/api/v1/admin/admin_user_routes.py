@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.repositories.user_repo import UserRepository
 from app.repositories.team_repo import TeamRepository
 from app.services.user_service import UserService
@@ -36,7 +36,7 @@ def get_user(user_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.get("/")
-def list_users(db: Session = Depends(get_db)):
+def list_users(db: Session = Depends(get_read_db)):
     """List all users (Admin only)"""
     user_repo = UserRepository(db)
     team_repo = TeamRepository(db)
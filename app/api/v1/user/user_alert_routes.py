@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
+from uuid import UUID
 
-from app.db.session import get_db
-from app.repositories.alert_repo import AlertRepository
-from app.repositories.user_repo import UserRepository
-from app.repositories.preference_repo import UserPreferenceRepository
-from app.repositories.delivery_repo import DeliveryRepository
+from app.db.async_session import get_async_db, get_async_read_db
+from app.db.session import get_db, get_read_db
+from app.repositories.alert_repo import AlertRepository, AsyncAlertRepository
+from app.repositories.user_repo import UserRepository, AsyncUserRepository
+from app.repositories.preference_repo import UserPreferenceRepository, AsyncUserPreferenceRepository
+from app.repositories.delivery_repo import DeliveryRepository, AsyncDeliveryRepository
 from app.services.notification_service import NotificationService
-from app.channels.in_app import InAppChannel
 
 router = APIRouter(prefix="/alerts")
 
@@ -18,47 +20,42 @@ def get_notification_service(db: Session = Depends(get_db)):
     pref_repo = UserPreferenceRepository(db)
     alert_repo = AlertRepository(db)
     user_repo = UserRepository(db)
-    channels = [InAppChannel()]
-    return NotificationService(delivery_repo, pref_repo, alert_repo, user_repo, channels)
+    return NotificationService(delivery_repo, pref_repo, alert_repo, user_repo)
 
 @router.get("/feed/{user_id}")
-def get_user_alert_feed(user_id: str, db: Session = Depends(get_db)):
+async def get_user_alert_feed(user_id: UUID, db: AsyncSession = Depends(get_async_read_db)):
     """Get active alerts for a specific user (End User)"""
-    user_repo = UserRepository(db)
-    alert_repo = AlertRepository(db)
-    pref_repo = UserPreferenceRepository(db)
-    delivery_repo = DeliveryRepository(db)
+    user_repo = AsyncUserRepository(db)
+    alert_repo = AsyncAlertRepository(db)
+    pref_repo = AsyncUserPreferenceRepository(db)
+    delivery_repo = AsyncDeliveryRepository(db)
     
-    # Verify user exists
-    user = user_repo.get_user(user_id)
+    # Verify user exists; users created by another process since the directory was loaded come from the DB
+    user = (await user_repo.get_directory()).get_user(user_id) or await user_repo.get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get active alerts
-    active_alerts = alert_repo.get_active_alerts()
+    # Active alerts visible to the user (org-wide, their team, or them directly)
+    visible_alerts = await alert_repo.get_active_alerts_for_user(user.id, user.team_id)
+    alert_ids = [alert.id for alert in visible_alerts]
     
-    # Filter alerts based on visibility
-    service = get_notification_service(db)
+    # Preferences and deliveries for just this user and these alerts
+    prefs = await pref_repo.get_preferences_for_alerts(alert_ids, user_id=user.id)
+    deliveries_by_alert = await delivery_repo.get_user_deliveries_for_alerts(user.id, alert_ids)
     relevant_alerts = []
     
-    for alert in active_alerts:
-        users_for_alert = service.get_users_for_alert(alert, [user])
-        if users_for_alert:  # User should receive this alert
-            # Get user preference for this alert
-            pref = pref_repo.get_user_alert_preference(user_id, alert.id)
-            
-            # Get latest delivery for this alert-user combination
-            deliveries = delivery_repo.get_alert_deliveries(alert.id)
-            user_deliveries = [d for d in deliveries if d.user_id == user_id]
-            latest_delivery = max(user_deliveries, key=lambda x: x.delivered_at) if user_deliveries else None
-            
-            relevant_alerts.append({
-                "alert": alert,
-                "is_read": latest_delivery.read_at is not None if latest_delivery else False,
-                "is_snoozed": pref.is_snoozed_today(user_id, alert.id) if pref else False,
-                "last_delivered": latest_delivery.delivered_at if latest_delivery else None,
-                "delivery_count": len(user_deliveries)
-            })
+    for alert in visible_alerts:
+        pref = prefs.get((alert.id, user.id))
+        user_deliveries = deliveries_by_alert[alert.id]
+        latest_delivery = max(user_deliveries, key=lambda x: x.delivered_at) if user_deliveries else None
+        
+        relevant_alerts.append({
+            "alert": alert,
+            "is_read": latest_delivery.read_at is not None if latest_delivery else False,
+            "is_snoozed": pref.is_snoozed_today(user_id, alert.id) if pref else False,
+            "last_delivered": latest_delivery.delivered_at if latest_delivery else None,
+            "delivery_count": len(user_deliveries)
+        })
     
     return {
         "user_id": user_id,
@@ -69,7 +66,7 @@ def get_user_alert_feed(user_id: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/snoozed/{user_id}")
-def get_snoozed_alerts(user_id: str, db: Session = Depends(get_db)):
+def get_snoozed_alerts(user_id: str, db: Session = Depends(get_read_db)):
     """Get snoozed alerts history for a user (End User)"""
     user_repo = UserRepository(db)
     pref_repo = UserPreferenceRepository(db)
@@ -101,63 +98,58 @@ def get_snoozed_alerts(user_id: str, db: Session = Depends(get_db)):
     }
 
 @router.post("/{alert_id}/read/{user_id}")
-def mark_alert_as_read(alert_id: str, user_id: str, db: Session = Depends(get_db)):
+async def mark_alert_as_read(alert_id: UUID, user_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Mark an alert as read for a user (End User)"""
-    pref_repo = UserPreferenceRepository(db)
-    user_repo = UserRepository(db)
-    alert_repo = AlertRepository(db)
-    delivery_repo = DeliveryRepository(db)
+    pref_repo = AsyncUserPreferenceRepository(db)
+    user_repo = AsyncUserRepository(db)
+    alert_repo = AsyncAlertRepository(db)
+    delivery_repo = AsyncDeliveryRepository(db)
     
     # Verify user and alert exist
-    user = user_repo.get_user(user_id)
-    alert = alert_repo.get_alert_by_id(alert_id)
+    user = await user_repo.get_user(user_id)
+    alert = await alert_repo.get_alert_by_id(alert_id)
     if not user or not alert:
         raise HTTPException(status_code=404, detail="User or Alert not found")
     
     # Mark preference as read
-    pref_repo.mark_as_read(user_id, alert_id)
+    await pref_repo.mark_as_read(user_id, alert_id)
     
     # Also mark the latest delivery as read if exists
-    deliveries = delivery_repo.get_alert_deliveries(alert_id)
-    user_deliveries = [d for d in deliveries if d.user_id == user_id]
-    if user_deliveries:
-        latest_delivery = max(user_deliveries, key=lambda x: x.delivered_at)
-        if not latest_delivery.read_at:
-            delivery_repo.mark_read(latest_delivery.id)
+    await delivery_repo.mark_latest_read(user_id, alert_id)
     
     return {"message": f"Alert {alert_id} marked as read for user {user_id}"}
 
 @router.post("/{alert_id}/unread/{user_id}")
-def mark_alert_as_unread(alert_id: str, user_id: str, db: Session = Depends(get_db)):
+async def mark_alert_as_unread(alert_id: UUID, user_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Mark an alert as unread for a user (End User)"""
-    pref_repo = UserPreferenceRepository(db)
-    user_repo = UserRepository(db)
-    alert_repo = AlertRepository(db)
+    pref_repo = AsyncUserPreferenceRepository(db)
+    user_repo = AsyncUserRepository(db)
+    alert_repo = AsyncAlertRepository(db)
     
     # Verify user and alert exist
-    user = user_repo.get_user(user_id)
-    alert = alert_repo.get_alert_by_id(alert_id)
+    user = await user_repo.get_user(user_id)
+    alert = await alert_repo.get_alert_by_id(alert_id)
     if not user or not alert:
         raise HTTPException(status_code=404, detail="User or Alert not found")
     
-    pref_repo.mark_as_unread(user_id, alert_id)
+    await pref_repo.mark_as_unread(user_id, alert_id)
     return {"message": f"Alert {alert_id} marked as unread for user {user_id}"}
 
 @router.post("/{alert_id}/snooze/{user_id}")
-def snooze_alert(alert_id: str, user_id: str, db: Session = Depends(get_db)):
+async def snooze_alert(alert_id: UUID, user_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Snooze an alert for today for a user (End User)"""
-    pref_repo = UserPreferenceRepository(db)
-    user_repo = UserRepository(db)
-    alert_repo = AlertRepository(db)
+    pref_repo = AsyncUserPreferenceRepository(db)
+    user_repo = AsyncUserRepository(db)
+    alert_repo = AsyncAlertRepository(db)
     
     # Verify user and alert exist
-    user = user_repo.get_user(user_id)
-    alert = alert_repo.get_alert_by_id(alert_id)
+    user = await user_repo.get_user(user_id)
+    alert = await alert_repo.get_alert_by_id(alert_id)
     if not user or not alert:
         raise HTTPException(status_code=404, detail="User or Alert not found")
     
-    pref = pref_repo.snooze_alert_today(user_id, alert_id)
+    pref = await pref_repo.snooze_alert_today(user_id, alert_id)
     return {
         "message": f"Alert {alert_id} snoozed for user {user_id} until tomorrow",
         "snoozed_date": pref.snoozed_date
-    }
\ No newline at end of file
+    }
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from uuid import UUID
 
+from app.db.async_session import get_async_db, get_async_read_db
 from app.db.session import get_db
-from app.repositories.delivery_repo import DeliveryRepository
+from app.repositories.delivery_repo import DeliveryRepository, AsyncDeliveryRepository
 from app.repositories.preference_repo import UserPreferenceRepository
 from app.repositories.alert_repo import AlertRepository
-from app.repositories.user_repo import UserRepository
+from app.repositories.user_repo import UserRepository, AsyncUserRepository
 from app.services.notification_service import NotificationService
 from app.channels.in_app import InAppChannel
 from app.channels.email import EmailChannel
@@ -20,44 +23,42 @@ def get_notification_service(db: Session = Depends(get_db)):
     alert_repo = AlertRepository(db)
     user_repo = UserRepository(db)
     
-    # For MVP: only In-App channel
-    channels = [InAppChannel()]
-    
-    return NotificationService(delivery_repo, pref_repo, alert_repo, user_repo, channels)
+    # Channels come from settings.NOTIFICATION_CHANNELS; each alert is routed by its delivery_types
+    return NotificationService(delivery_repo, pref_repo, alert_repo, user_repo)
 
 @router.get("/deliveries/{user_id}")
-def get_user_deliveries(user_id: str, db: Session = Depends(get_db)):
+async def get_user_deliveries(user_id: UUID, db: AsyncSession = Depends(get_async_read_db)):
     """Get all notification deliveries for a user (End User)"""
-    user_repo = UserRepository(db)
-    delivery_repo = DeliveryRepository(db)
+    user_repo = AsyncUserRepository(db)
+    delivery_repo = AsyncDeliveryRepository(db)
     
     # Verify user exists
-    user = user_repo.get_user(user_id)
+    user = await user_repo.get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    deliveries = delivery_repo.get_user_deliveries(user_id)
-    unread_deliveries = delivery_repo.get_unread_deliveries(user_id)
+    deliveries = await delivery_repo.get_user_deliveries(user_id)
+    unread_count = len([d for d in deliveries if d.read_at is None])
     
     return {
         "user_id": user_id,
         "total_deliveries": len(deliveries),
-        "unread_count": len(unread_deliveries),
+        "unread_count": unread_count,
         "deliveries": deliveries
     }
 
 @router.get("/deliveries/{user_id}/unread")
-def get_unread_deliveries(user_id: str, db: Session = Depends(get_db)):
+async def get_unread_deliveries(user_id: UUID, db: AsyncSession = Depends(get_async_read_db)):
     """Get unread notification deliveries for a user (End User)"""
-    user_repo = UserRepository(db)
-    delivery_repo = DeliveryRepository(db)
+    user_repo = AsyncUserRepository(db)
+    delivery_repo = AsyncDeliveryRepository(db)
     
     # Verify user exists
-    user = user_repo.get_user(user_id)
+    user = await user_repo.get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    unread_deliveries = delivery_repo.get_unread_deliveries(user_id)
+    unread_deliveries = await delivery_repo.get_unread_deliveries(user_id)
     
     return {
         "user_id": user_id,
@@ -66,10 +67,10 @@ def get_unread_deliveries(user_id: str, db: Session = Depends(get_db)):
     }
 
 @router.post("/deliveries/{delivery_id}/read")
-def mark_delivery_as_read(delivery_id: str, db: Session = Depends(get_db)):
+async def mark_delivery_as_read(delivery_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Mark a specific notification delivery as read (End User)"""
-    delivery_repo = DeliveryRepository(db)
-    delivery = delivery_repo.mark_read(delivery_id)
+    delivery_repo = AsyncDeliveryRepository(db)
+    delivery = await delivery_repo.mark_read(delivery_id)
     if not delivery:
         raise HTTPException(status_code=404, detail="Delivery not found")
     return {
@@ -123,7 +124,9 @@ def deliver_alert_with_specific_channels(
         if channel_type in channel_map:
             channels.append(channel_map[channel_type])
     
-    service = NotificationService(delivery_repo, pref_repo, alert_repo, user_repo, channels)
+    # Admin override: call the requested channels inline so their results are returned
+    service = NotificationService(delivery_repo, pref_repo, alert_repo, user_repo, channels,
+                                  use_outbox=False, route_by_delivery_types=False)
     
     alert = alert_repo.get_alert_by_id(alert_id)
     user = user_repo.get_user(user_id)
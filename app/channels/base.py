@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+from app.channels.templates import template_cache
 from app.models.alert import Alert
 from app.models.user import User
 
@@ -6,7 +8,38 @@ from app.models.user import User
 class NotificationChannel(ABC):
     """Abstract base class for all notification channels."""
 
+    channel_name = "base"
+
+    @property
+    def display_name(self) -> str:
+        """Name reported in delivery results."""
+        return self.__class__.__name__
+
     @abstractmethod
     def send(self, alert: Alert, user: User) -> None:
         """Send a notification to a user via this channel."""
         pass
+
+    def send_many(self, alert: Alert, users: List[User]) -> List[Dict[str, Any]]:
+        """Send one alert to a batch of recipients; results are in ``users`` order.
+
+        Channels with a batch-capable provider override this.
+        """
+        return [self.send(alert, user) for user in users]
+
+    def send_digest(self, alerts: List[Alert], user: User) -> Dict[str, Any]:
+        """Send several alerts to one user as a single message.
+
+        Channels without a digest format fall back to one send per alert.
+        """
+        results = [self.send(alert, user) or {} for alert in alerts]
+        failed = any(result.get("status") == "failed" for result in results)
+        return {"status": "failed" if failed else "sent", "alert_count": len(alerts), "results": results}
+
+    def render_template(self, alert: Alert) -> Any:
+        """Render the alert-invariant part of this channel's payload."""
+        return None
+
+    def get_template(self, alert: Alert) -> Any:
+        """Cached template for the alert, rendered once per alert version."""
+        return template_cache.get_or_render(self.channel_name, alert, self.render_template)
@@ -0,0 +1,239 @@
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.channels.base import NotificationChannel
+from app.models.alert import Alert
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+class CircuitState:
+    """States of a channel circuit breaker."""
+    CLOSED = "closed"        # calls flow normally
+    OPEN = "open"            # calls fail fast until the recovery timeout passes
+    HALF_OPEN = "half_open"  # a limited number of trial calls decide whether to close again
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, channel_name: str, retry_at: datetime):
+        super().__init__(f"Circuit open for channel {channel_name}")
+        self.channel_name = channel_name
+        self.retry_at = retry_at
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed millisecond bucket bounds."""
+
+    BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in self.BOUNDS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0,
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with latency and error accounting for one channel.
+
+    Calls slower than ``slow_call_seconds`` count as failures, so a provider that hangs
+    trips the breaker just like one that errors.
+    """
+
+    CONFIG_KEYS = ("failure_threshold", "recovery_timeout_seconds", "half_open_max_calls", "slow_call_seconds")
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout_seconds: float = 30,
+                 half_open_max_calls: int = 1, slow_call_seconds: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_seconds = recovery_timeout_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.slow_call_seconds = slow_call_seconds
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self._lock = threading.Lock()
+
+        self.latency = LatencyHistogram()
+        self.counters = {"calls": 0, "successes": 0, "errors": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+        self.last_error: Optional[str] = None
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError."""
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout_seconds:
+                    self.counters["rejected"] += 1
+                    raise CircuitOpenError(self.name, self.retry_at())
+                self.state = CircuitState.HALF_OPEN
+                self._half_open_in_flight = 0
+            if self.state == CircuitState.HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self.counters["rejected"] += 1
+                    raise CircuitOpenError(self.name, self.retry_at())
+                self._half_open_in_flight += 1
+            self.counters["calls"] += 1
+
+    def record(self, seconds: float, error: Optional[str] = None):
+        """Record a finished call's latency and outcome, moving the breaker state."""
+        slow = self.slow_call_seconds is not None and seconds > self.slow_call_seconds
+        with self._lock:
+            self.latency.observe(seconds)
+            if slow:
+                self.counters["slow_calls"] += 1
+            if error:
+                self.counters["errors"] += 1
+                self.last_error = error
+            if self.state == CircuitState.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+            if error or slow:
+                self.consecutive_failures += 1
+                if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                    self._open()
+            else:
+                self.counters["successes"] += 1
+                self.consecutive_failures = 0
+                self.state = CircuitState.CLOSED
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == CircuitState.OPEN and \
+                time.monotonic() - self.opened_at < self.recovery_timeout_seconds
+
+    def retry_at(self) -> datetime:
+        """Wall-clock time after which the breaker will admit a trial call."""
+        remaining = 0 if self.opened_at is None else \
+            max(0.0, self.recovery_timeout_seconds - (time.monotonic() - self.opened_at))
+        return datetime.utcnow() + timedelta(seconds=remaining)
+
+    def _open(self):
+        if self.state != CircuitState.OPEN:
+            self.counters["opened"] += 1
+            logger.warning(f"Circuit opened for channel {self.name} after {self.consecutive_failures} failures",
+                           extra={"channel": self.name, "last_error": self.last_error})
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "counters": dict(self.counters),
+                "last_error": self.last_error,
+                "latency": self.latency.snapshot()
+            }
+
+class CircuitBreakerRegistry:
+    """Process-wide breakers keyed by channel name, shared by every instance of a channel."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, **config) -> CircuitBreaker:
+        """The channel's breaker, created with ``config`` on first use.
+
+        Later callers share that breaker whatever config they pass; a conflicting
+        config is logged rather than silently dropped.
+        """
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name, **config)
+                return self._breakers[name]
+            breaker = self._breakers[name]
+        unknown = [key for key in config if key not in CircuitBreaker.CONFIG_KEYS]
+        if unknown:
+            raise TypeError(f"Unknown circuit breaker option(s): {', '.join(unknown)}")
+        conflicting = {key: value for key, value in config.items() if getattr(breaker, key) != value}
+        if conflicting:
+            current = {key: getattr(breaker, key) for key in conflicting}
+            logger.warning(f"Circuit breaker for channel {name} already exists with {current}; "
+                           f"ignoring conflicting config {conflicting}",
+                           extra={"channel": name})
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+    def open_channels(self) -> List[str]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return [name for name, breaker in breakers.items() if breaker.is_open()]
+
+def _result_error(result: Any) -> Optional[str]:
+    """Helper method to read a provider failure out of a channel result."""
+    if isinstance(result, list):
+        failed = [r for r in result if isinstance(r, dict) and r.get("status") == "failed"]
+        return f"{len(failed)} of {len(result)} sends failed" if result and len(failed) == len(result) else None
+    if isinstance(result, dict) and result.get("status") == "failed":
+        return result.get("reason") or "Channel reported failure"
+    return None
+
+class CircuitBreakerChannel(NotificationChannel):
+    """Wraps a channel so every provider call goes through its circuit breaker."""
+
+    def __init__(self, channel: NotificationChannel, breaker: CircuitBreaker):
+        self.channel = channel
+        self.breaker = breaker
+        self.channel_name = channel.channel_name
+
+    def __getattr__(self, name):
+        # Channel-specific attributes (config, smtp_server, ...) come from the wrapped channel
+        return getattr(self.channel, name)
+
+    @property
+    def display_name(self) -> str:
+        return self.channel.display_name
+
+    def _call(self, method, *args):
+        self.breaker.before_call()
+        started = time.monotonic()
+        try:
+            result = method(*args)
+        except Exception as e:
+            self.breaker.record(time.monotonic() - started, str(e) or e.__class__.__name__)
+            raise
+        self.breaker.record(time.monotonic() - started, _result_error(result))
+        return result
+
+    def send(self, alert: Alert, user: User) -> Dict[str, Any]:
+        return self._call(self.channel.send, alert, user)
+
+    def send_digest(self, alerts: List[Alert], user: User) -> Dict[str, Any]:
+        return self._call(self.channel.send_digest, alerts, user)
+
+    def send_many(self, alert: Alert, users: List[User]) -> List[Dict[str, Any]]:
+        return self._call(self.channel.send_many, alert, users)
+
+    def render_template(self, alert: Alert) -> Any:
+        return self.channel.render_template(alert)
+
+    def get_template(self, alert: Alert) -> Any:
+        return self.channel.get_template(alert)
+
+    def validate_config(self) -> bool:
+        return self.channel.validate_config()
+
+# Global circuit breaker registry instance
+circuit_breakers = CircuitBreakerRegistry()
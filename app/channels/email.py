@@ -1,14 +1,22 @@
-import smtplib
+import logging
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from app.channels.base import NotificationChannel
+from app.channels.smtp_pool import SMTPConnectionPool
+from app.channels.templates import severity_label
 from app.models.alert import Alert
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 class EmailChannel(NotificationChannel):
     """Email notification channel implementation (future scope)."""
-    
+
+    channel_name = "email"
+
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
         self.smtp_server = self.config.get("smtp_server", "smtp.gmail.com")
@@ -16,47 +24,152 @@ class EmailChannel(NotificationChannel):
         self.username = self.config.get("username")
         self.password = self.config.get("password")
         self.from_address = self.config.get("from_address", "alerts@company.com")
+        # Simulated by default; set "simulate": False to send through the SMTP pool
+        self.simulate = self.config.get("simulate", True)
+        self.pool_size = self.config.get("pool_size", 4)
+        self._pool: Optional[SMTPConnectionPool] = None
+        self._pool_lock = threading.Lock()
         super().__init__()
-    
+
     def send(self, alert: Alert, user: User) -> Dict[str, Any]:
         """Send email notification."""
         # For MVP, simulate email sending
         if not self.validate_config():
             return {"status": "skipped", "reason": "Email not configured"}
-        
-        # Create email content
-        subject = f"[{alert.severity.upper()}] {alert.title}"
-        
-        html_body = f"""
-        <html>
-            <body>
-                <h2>{alert.title}</h2>
-                <p><strong>Severity:</strong> {alert.severity}</p>
-                <p><strong>Message:</strong></p>
-                <p>{alert.message}</p>
-                <p><em>Sent at: {alert.created_at}</em></p>
-            </body>
-        </html>
-        """
-        
-        # In production, would actually send email
-        # For now, just simulate
-        print(f"[EMAIL] Would send '{subject}' to {user.name} ({getattr(user, 'email', 'no-email@example.com')})")
-        
+
+        subject, html_body = self.get_template(alert)
+        recipient = getattr(user, 'email', 'no-email@example.com')
+
+        if self.simulate:
+            logger.info("Email simulated", extra={"channel": "email", "alert_id": alert.id, "user_id": user.id})
+            status = "simulated"
+        else:
+            status = "sent" if self._send_actual_email(recipient, subject, html_body) else "failed"
+
         return {
             "channel": "email",
             "alert_id": alert.id,
             "user_id": user.id,
-            "recipient": getattr(user, 'email', 'no-email@example.com'),
+            "recipient": recipient,
             "subject": subject,
-            "status": "simulated"
+            "status": status
         }
-    
+
+    def send_many(self, alert: Alert, users: List[User]) -> List[Dict[str, Any]]:
+        """Send one alert to a batch of recipients, reusing pooled SMTP sessions."""
+        if self.simulate or not self.validate_config():
+            return [self.send(alert, user) for user in users]
+
+        subject, html_body = self.get_template(alert)
+
+        def send_one(user: User) -> Dict[str, Any]:
+            recipient = getattr(user, 'email', 'no-email@example.com')
+            sent = self._send_actual_email(recipient, subject, html_body)
+            return {
+                "channel": "email",
+                "alert_id": alert.id,
+                "user_id": user.id,
+                "recipient": recipient,
+                "subject": subject,
+                "status": "sent" if sent else "failed"
+            }
+
+        # One worker per pooled session keeps every session busy without oversubscribing
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            return list(executor.map(send_one, users))
+
+    def send_digest(self, alerts: List[Alert], user: User) -> Dict[str, Any]:
+        """Send one email summarizing several alerts."""
+        if not self.validate_config():
+            return {"status": "skipped", "reason": "Email not configured"}
+
+        subject, html_body = self.render_digest(alerts)
+        recipient = getattr(user, 'email', 'no-email@example.com')
+
+        if self.simulate:
+            logger.info("Email digest simulated",
+                        extra={"channel": "email", "alert_count": len(alerts), "user_id": user.id})
+            status = "simulated"
+        else:
+            status = "sent" if self._send_actual_email(recipient, subject, html_body) else "failed"
+
+        return {
+            "channel": "email",
+            "alert_ids": [alert.id for alert in alerts],
+            "user_id": user.id,
+            "recipient": recipient,
+            "subject": subject,
+            "status": status
+        }
+
+    def render_digest(self, alerts: List[Alert]):
+        """Render the subject and HTML body of a digest."""
+        subject = f"[DIGEST] {len(alerts)} alerts"
+        items = "".join(
+            f"<li><strong>[{severity_label(alert).upper()}] {alert.title}</strong><p>{alert.body}</p></li>"
+            for alert in alerts
+        )
+        html_body = f"""
+        <html>
+            <body>
+                <h2>You have {len(alerts)} active alerts</h2>
+                <ul>{items}</ul>
+            </body>
+        </html>
+        """
+        return subject, html_body
+
     def validate_config(self) -> bool:
         """Validate email configuration."""
         required_fields = ["username", "password"]
         return all(self.config.get(field) for field in required_fields)
-    
+
+    def get_stats(self) -> Dict[str, int]:
+        """SMTP pool counters (connections opened/closed, reconnects, messages sent); empty before the pool exists."""
+        pool = self._pool
+        return pool.get_stats() if pool else {}
+
+    def close(self) -> None:
+        """Close any pooled SMTP sessions."""
+        if self._pool:
+            self._pool.close()
+            self._pool = None
+
+    def render_template(self, alert: Alert):
+        """Render the subject and HTML body, which are the same for every recipient."""
+        severity = severity_label(alert)
+        subject = f"[{severity.upper()}] {alert.title}"
+
+        html_body = f"""
+        <html>
+            <body>
+                <h2>{alert.title}</h2>
+                <p><strong>Severity:</strong> {severity}</p>
+                <p><strong>Message:</strong></p>
+                <p>{alert.body}</p>
+                <p><em>Sent at: {alert.created_at}</em></p>
+            </body>
+        </html>
+        """
+        return subject, html_body
+
+    def _get_pool(self) -> SMTPConnectionPool:
+        """Lazily create the SMTP session pool for this channel."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = SMTPConnectionPool(
+                    host=self.smtp_server,
+                    port=self.smtp_port,
+                    username=self.username,
+                    password=self.password,
+                    use_tls=self.config.get("use_tls", True),
+                    max_size=self.pool_size,
+                    max_messages_per_session=self.config.get("max_messages_per_session", 100),
+                    max_idle_seconds=self.config.get("max_idle_seconds", 60),
+                    timeout=self.config.get("timeout", 30)
+                )
+            return self._pool
+
     def _send_actual_email(self, to_address: str, subject: str, body: str):
         """Helper method to send actual email (for production)."""
         try:
@@ -64,17 +177,14 @@ class EmailChannel(NotificationChannel):
             msg['Subject'] = subject
             msg['From'] = self.from_address
             msg['To'] = to_address
-            
+
             html_part = MIMEText(body, 'html')
             msg.attach(html_part)
-            
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.username, self.password)
-            server.send_message(msg)
-            server.quit()
-            
+
+            self._get_pool().send_message(msg)
+
             return True
         except Exception as e:
-            print(f"Email sending failed: {str(e)}")
-            return False
\ No newline at end of file
+            logger.error("Email sending failed", exc_info=True,
+                         extra={"channel": "email", "recipient": to_address, "error": str(e)})
+            return False
@@ -1,9 +1,15 @@
-from typing import List, Dict, Any
+import logging
+from typing import List, Dict, Any, Optional
 from enum import Enum
 from app.channels.base import NotificationChannel
+from app.channels.circuit_breaker import CircuitBreakerChannel, circuit_breakers
+from app.channels.rate_limit import PriorityDispatcher, TokenBucket
 from app.channels.in_app import InAppChannel
 from app.channels.email import EmailChannel
 from app.channels.sms import SMSChannel
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
 
 class ChannelType(Enum):
     """Supported notification channel types."""
@@ -19,15 +25,27 @@ class ChannelFactory:
         ChannelType.EMAIL: EmailChannel,
         ChannelType.SMS: SMSChannel
     }
+
+    _configured_channels: Optional[List[NotificationChannel]] = None
     
     @classmethod
     def create_channel(cls, channel_type: ChannelType, config: Dict[str, Any] = None) -> NotificationChannel:
-        """Create a notification channel instance."""
+        """Create a notification channel instance, wrapped in its channel's circuit breaker.
+
+        Breaker thresholds come from the ``circuit_breaker`` config key
+        (failure_threshold, recovery_timeout_seconds, half_open_max_calls, slow_call_seconds);
+        set it to ``False`` to get the bare channel.
+        """
         if channel_type not in cls._channel_registry:
             raise ValueError(f"Unknown channel type: {channel_type}")
         
         channel_class = cls._channel_registry[channel_type]
-        return channel_class(config or {})
+        config = config or {}
+        channel = channel_class(config)
+        breaker_config = config.get("circuit_breaker", {})
+        if breaker_config is False:
+            return channel
+        return CircuitBreakerChannel(channel, circuit_breakers.get(channel.channel_name, **breaker_config))
     
     @classmethod
     def create_channels_from_config(cls, channels_config: List[Dict[str, Any]]) -> List[NotificationChannel]:
@@ -42,10 +60,37 @@ class ChannelFactory:
                 channel = cls.create_channel(channel_type, channel_config)
                 channels.append(channel)
             except ValueError as e:
-                print(f"Warning: Skipping invalid channel type '{channel_type_str}': {e}")
+                logger.warning(f"Skipping invalid channel type '{channel_type_str}': {e}")
                 
         return channels
     
+    @classmethod
+    def create_rate_limiter(cls, rate_config: Optional[Dict[str, Any]]) -> Optional[TokenBucket]:
+        """Create a token bucket from ``{"per_second": 10, "burst": 20}``; None means unlimited."""
+        if not rate_config or not rate_config.get("per_second"):
+            return None
+        return TokenBucket(rate_config["per_second"], rate_config.get("burst"))
+
+    @classmethod
+    def create_dispatcher(cls, channel: NotificationChannel, concurrency: int = 4) -> PriorityDispatcher:
+        """Create the severity-ordered, rate-limited dispatcher for a channel.
+
+        The limit comes from the channel's ``rate_limit`` config key.
+        """
+        config = getattr(channel, "config", None) or {}
+        rate_limiter = cls.create_rate_limiter(config.get("rate_limit"))
+        return PriorityDispatcher(channel.channel_name, concurrency, rate_limiter)
+
+    @classmethod
+    def get_configured_channels(cls) -> List[NotificationChannel]:
+        """Process-wide channels built once from settings.NOTIFICATION_CHANNELS.
+
+        Shared so pooled provider connections outlive a single request or job.
+        """
+        if cls._configured_channels is None:
+            cls._configured_channels = cls.create_channels_from_config(settings.NOTIFICATION_CHANNELS)
+        return cls._configured_channels
+
     @classmethod
     def get_default_channels(cls) -> List[NotificationChannel]:
         """Get default channels for MVP (In-App only)."""
@@ -1,10 +1,16 @@
+import logging
 from typing import Dict, Any
 from app.channels.base import NotificationChannel
+from app.channels.templates import severity_label
 from app.models.alert import Alert
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 class InAppChannel(NotificationChannel):
     """In-App notification channel implementation."""
+
+    channel_name = "in_app"
     
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
@@ -15,22 +21,28 @@ class InAppChannel(NotificationChannel):
         # In MVP, this is just logging/simulation
         # In production, this would push to real-time notification system
         
-        notification_data = {
-            "channel": "in_app",
-            "alert_id": alert.id,
-            "user_id": user.id,
-            "title": alert.title,
-            "message": alert.message,
-            "severity": alert.severity,
-            "timestamp": alert.created_at.isoformat(),
-            "status": "delivered"
-        }
+        # Only the recipient differs between users; the rest is rendered once per alert
+        notification_data = dict(self.get_template(alert))
+        notification_data["user_id"] = user.id
+        notification_data["status"] = "delivered"
         
         # Simulate delivery
-        print(f"[IN-APP] Alert '{alert.title}' sent to user {user.name}")
+        logger.info("In-app notification delivered",
+                    extra={"channel": "in_app", "alert_id": alert.id, "user_id": user.id})
         
         return notification_data
 
+    def render_template(self, alert: Alert) -> Dict[str, Any]:
+        """Render the alert-invariant part of the in-app payload."""
+        return {
+            "channel": "in_app",
+            "alert_id": alert.id,
+            "title": alert.title,
+            "message": alert.body,
+            "severity": severity_label(alert),
+            "timestamp": alert.created_at.isoformat() if alert.created_at else None
+        }
+
     def validate_config(self) -> bool:
         """Validate channel configuration."""
         # In-App channel doesn't need special config for MVP
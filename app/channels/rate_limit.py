@@ -0,0 +1,167 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+from app.models.alert import Severity
+
+# Lower value is dispatched first
+SEVERITY_PRIORITY = {Severity.CRITICAL: 0, Severity.WARNING: 1, Severity.INFO: 2}
+PRIORITY_LABELS = {priority: severity.value for severity, priority in SEVERITY_PRIORITY.items()}
+
+def severity_priority(severity) -> int:
+    """Dispatch priority for a Severity enum member or its name/value string."""
+    if isinstance(severity, str):
+        severity = Severity.__members__.get(severity.upper(), Severity.INFO)
+    return SEVERITY_PRIORITY.get(severity, SEVERITY_PRIORITY[Severity.INFO])
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, holding at most ``burst``."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, stop: Optional[threading.Event] = None, tokens: int = 1) -> bool:
+        """Block until ``tokens`` are available; returns False if ``stop`` was set first.
+
+        Requests larger than the burst wait for a full bucket and leave it in debt, so
+        batches are throttled to the same long-run rate as single sends.
+        """
+        needed = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return True
+                wait = (needed - self._tokens) / self.rate
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+class PriorityDispatcher:
+    """Priority queue in front of a channel's rate limiter and worker threads.
+
+    Items are dispatched lowest priority value first (CRITICAL before WARNING before
+    INFO), FIFO within a priority. Each worker takes a token before running an item,
+    so the limiter only ever throttles work in priority order.
+    """
+
+    WAIT_SAMPLES = 1000
+
+    def __init__(self, name: str, concurrency: int = 4, rate_limiter: Optional[TokenBucket] = None):
+        self.name = name
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        self._waits = {priority: deque(maxlen=self.WAIT_SAMPLES) for priority in PRIORITY_LABELS}
+        self._depth = {priority: 0 for priority in PRIORITY_LABELS}  # queued messages per priority
+        self._dispatched = {priority: 0 for priority in PRIORITY_LABELS}
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._work, name=f"dispatch-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, priority: int, fn: Callable[[], Any], cost: int = 1) -> Future:
+        """Queue ``fn`` at ``priority``; the returned future resolves with its result.
+
+        ``cost`` is how many messages ``fn`` sends, i.e. how many tokens it takes.
+        """
+        future = Future()
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._seq), time.monotonic(), fn, future, cost))
+            self._depth[priority] = self._depth.get(priority, 0) + cost
+            self._cond.notify()
+        return future
+
+    def depth(self) -> int:
+        """Messages waiting in the queue."""
+        with self._cond:
+            return sum(self._depth.values())
+
+    def _work(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._heap and not self._stop.is_set():
+                    self._cond.wait(0.5)
+                if self._stop.is_set():
+                    return
+                # Reserve the head item; a token is taken before it leaves the queue
+                priority, _, enqueued_at, fn, future, cost = heapq.heappop(self._heap)
+                self._depth[priority] -= cost
+
+            if self.rate_limiter and not self.rate_limiter.acquire(self._stop, cost):
+                future.cancel()
+                return
+
+            started = time.monotonic()
+            self._waits.setdefault(priority, deque(maxlen=self.WAIT_SAMPLES)).append(started - enqueued_at)
+            self._dispatched[priority] = self._dispatched.get(priority, 0) + cost
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                future.set_exception(e)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and recent queue wait times per severity."""
+        with self._cond:
+            depth = dict(self._depth)
+        by_severity = {}
+        for priority, label in PRIORITY_LABELS.items():
+            waits = sorted(self._waits.get(priority, ()))
+            by_severity[label] = {
+                "queue_depth": depth.get(priority, 0),
+                "dispatched": self._dispatched.get(priority, 0),
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 2) if waits else 0,
+                "wait_p99_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000, 2) if waits else 0,
+                "wait_max_ms": round(waits[-1] * 1000, 2) if waits else 0
+            }
+        return {
+            "channel": self.name,
+            "concurrency": self.concurrency,
+            "rate_limit_per_second": self.rate_limiter.rate if self.rate_limiter else None,
+            "queue_depth": sum(depth.values()),
+            "by_severity": by_severity
+        }
@@ -1,16 +1,33 @@
-from typing import Dict, Any
+import base64
+import http.client
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
 from app.channels.base import NotificationChannel
+from app.channels.templates import severity_label
 from app.models.alert import Alert
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 class SMSChannel(NotificationChannel):
     """SMS notification channel implementation (future scope)."""
+
+    channel_name = "sms"
     
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
         self.api_key = self.config.get("api_key")
         self.api_secret = self.config.get("api_secret")
         self.from_number = self.config.get("from_number", "+1234567890")
+        # Without an api_url sends are simulated; with one they are POSTed to the provider
+        self.api_url = self.config.get("api_url")
+        self.timeout = self.config.get("timeout", 10)
+        self.concurrency = self.config.get("concurrency", 4)
+        self._local = threading.local()
         super().__init__()
     
     def send(self, alert: Alert, user: User) -> Dict[str, Any]:
@@ -19,22 +36,98 @@ class SMSChannel(NotificationChannel):
         if not self.validate_config():
             return {"status": "skipped", "reason": "SMS not configured"}
         
-        # Create SMS content (limited characters)
-        message = f"[{alert.severity}] {alert.title}: {alert.message[:100]}..."
+        # SMS content is identical for every recipient, so it is rendered once per alert
+        message = self.get_template(alert)
         
-        # In production, would use service like Twilio
-        print(f"[SMS] Would send to {user.name} ({getattr(user, 'phone', 'no-phone')}): {message}")
+        recipient = getattr(user, 'phone', 'no-phone')
+        if self.api_url:
+            status = "sent" if self._post_message(recipient, message) else "failed"
+        else:
+            logger.info("SMS simulated", extra={"channel": "sms", "alert_id": alert.id, "user_id": user.id})
+            status = "simulated"
         
         return {
             "channel": "sms",
             "alert_id": alert.id,
             "user_id": user.id,
-            "recipient": getattr(user, 'phone', 'no-phone'),
+            "recipient": recipient,
             "message": message,
-            "status": "simulated"
+            "status": status
         }
+
+    def send_many(self, alert: Alert, users: List[User]) -> List[Dict[str, Any]]:
+        """Send one alert to a batch of recipients, with concurrent provider requests."""
+        if not self.api_url or not self.validate_config() or len(users) < 2:
+            return [self.send(alert, user) for user in users]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return list(executor.map(lambda user: self.send(alert, user), users))
     
+    def send_digest(self, alerts: List[Alert], user: User) -> Dict[str, Any]:
+        """Send one SMS listing several alerts."""
+        if not self.validate_config():
+            return {"status": "skipped", "reason": "SMS not configured"}
+
+        message = self.render_digest(alerts)
+        recipient = getattr(user, 'phone', 'no-phone')
+        if self.api_url:
+            status = "sent" if self._post_message(recipient, message) else "failed"
+        else:
+            logger.info("SMS digest simulated",
+                        extra={"channel": "sms", "alert_count": len(alerts), "user_id": user.id})
+            status = "simulated"
+
+        return {
+            "channel": "sms",
+            "alert_ids": [alert.id for alert in alerts],
+            "user_id": user.id,
+            "recipient": recipient,
+            "message": message,
+            "status": status
+        }
+
+    def render_digest(self, alerts: List[Alert]) -> str:
+        """Render a digest SMS, truncated to a single 160-character segment."""
+        message = f"{len(alerts)} alerts: " + "; ".join(
+            f"[{severity_label(alert).upper()}] {alert.title}" for alert in alerts
+        )
+        return message if len(message) <= 160 else message[:157] + "..."
+
+    def render_template(self, alert: Alert) -> str:
+        """Render the SMS text (limited characters)."""
+        return f"[{severity_label(alert)}] {alert.title}: {alert.body[:100]}..."
+
     def validate_config(self) -> bool:
         """Validate SMS configuration."""
         required_fields = ["api_key", "api_secret"]
         return all(self.config.get(field) for field in required_fields)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        """Helper method to get this thread's keep-alive connection to the provider."""
+        conn: Optional[http.client.HTTPConnection] = getattr(self._local, "conn", None)
+        if conn is None:
+            url = urlsplit(self.api_url)
+            conn_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            conn = conn_class(url.hostname, url.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _post_message(self, to_number: str, body: str) -> bool:
+        """Helper method to POST one message to the provider API."""
+        credentials = base64.b64encode(f"{self.api_key}:{self.api_secret}".encode()).decode()
+        payload = json.dumps({"from": self.from_number, "to": to_number, "body": body})
+        headers = {"Content-Type": "application/json", "Authorization": f"Basic {credentials}"}
+        try:
+            conn = self._connection()
+            conn.request("POST", urlsplit(self.api_url).path or "/", payload, headers)
+            response = conn.getresponse()
+            response.read()
+            if 200 <= response.status < 300:
+                return True
+            logger.error("SMS provider rejected message",
+                         extra={"channel": "sms", "recipient": to_number, "status_code": response.status})
+            return False
+        except (http.client.HTTPException, OSError) as e:
+            # Drop the connection so the next send reconnects
+            self._local.conn = None
+            logger.error("SMS sending failed", extra={"channel": "sms", "recipient": to_number, "error": str(e)})
+            return False
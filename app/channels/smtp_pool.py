@@ -0,0 +1,164 @@
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from queue import LifoQueue, Empty
+from typing import Optional
+
+# Errors after which a pooled session is discarded and the send retried on a fresh one.
+# Not OSError as a whole: SMTPException subclasses it and covers rejected recipients.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+# Reply codes after which the server closes the transmission channel (RFC 5321 4.2.2)
+CONNECTION_CLOSING_CODES = (421,)
+
+def _session_broken(error: Exception) -> bool:
+    """Whether a session that raised ``error`` must be discarded rather than reused.
+
+    Refused recipients, senders and data leave the session usable (smtplib resets the
+    transaction before raising), as does any other SMTP reply that does not close the
+    channel. Disconnects, socket errors and anything unexpected discard it.
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code in CONNECTION_CLOSING_CODES
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return True
+
+class _PooledSession:
+    """An authenticated SMTP connection plus its reuse bookkeeping."""
+
+    __slots__ = ("smtp", "messages_sent", "last_used")
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+class SMTPConnectionPool:
+    """Thread-safe pool of persistent, authenticated SMTP sessions."""
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 use_tls: bool = True, max_size: int = 4, max_messages_per_session: int = 100,
+                 max_idle_seconds: float = 60.0, health_check_after_seconds: float = 10.0,
+                 timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_size = max_size
+        self.max_messages_per_session = max_messages_per_session
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_after_seconds = health_check_after_seconds
+        self.timeout = timeout
+
+        self._idle: LifoQueue = LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self.stats = {"connections_opened": 0, "connections_closed": 0, "reconnects": 0, "messages_sent": 0}
+
+    def send_message(self, msg: Message) -> None:
+        """Send a message on a pooled session, reconnecting once if the session died."""
+        try:
+            with self.session() as smtp:
+                smtp.send_message(msg)
+        except RECONNECT_ERRORS:
+            self._count("reconnects")
+            with self.session(fresh=True) as smtp:
+                smtp.send_message(msg)
+
+    @contextmanager
+    def session(self, fresh: bool = False):
+        """Borrow a healthy session; it is returned to the pool unless _session_broken() says otherwise."""
+        if self._closed:
+            raise RuntimeError("SMTP connection pool is closed")
+        self._slots.acquire()
+        pooled = None
+        try:
+            pooled = self._new_session() if fresh else self._checkout()
+            yield pooled.smtp
+            pooled.messages_sent += 1
+            pooled.last_used = time.monotonic()
+            self._count("messages_sent")
+            self._checkin(pooled)
+        except Exception as e:
+            if pooled and _session_broken(e):
+                self._discard(pooled)
+            elif pooled:
+                pooled.messages_sent += 1
+                pooled.last_used = time.monotonic()
+                self._checkin(pooled)
+            raise
+        finally:
+            self._slots.release()
+
+    def get_stats(self) -> dict:
+        """A consistent copy of the pool counters."""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def close(self) -> None:
+        """Close every idle session and refuse further checkouts."""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except Empty:
+                break
+
+    def _checkout(self) -> _PooledSession:
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                return self._new_session()
+            if self._is_reusable(pooled):
+                return pooled
+            self._discard(pooled)
+
+    def _checkin(self, pooled: _PooledSession) -> None:
+        if self._closed or pooled.messages_sent >= self.max_messages_per_session:
+            self._discard(pooled)
+        else:
+            self._idle.put(pooled)
+
+    def _is_reusable(self, pooled: _PooledSession) -> bool:
+        idle_for = time.monotonic() - pooled.last_used
+        if idle_for > self.max_idle_seconds:
+            return False
+        if idle_for > self.health_check_after_seconds:
+            try:
+                return pooled.smtp.noop()[0] == 250
+            except RECONNECT_ERRORS:
+                return False
+        return True
+
+    def _new_session(self) -> _PooledSession:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._count("connections_opened")
+        return _PooledSession(smtp)
+
+    def _count(self, name: str) -> None:
+        # Sessions are opened, sent on and discarded by many threads at once
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _discard(self, pooled: _PooledSession) -> None:
+        self._count("connections_closed")
+        try:
+            pooled.smtp.quit()
+        except Exception:
+            pooled.smtp.close()
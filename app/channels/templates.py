@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+from app.models.alert import Alert
+
+def alert_version(alert: Alert) -> Tuple[Hashable, ...]:
+    """Key identifying the content of an alert; changes whenever a rendered field changes."""
+    return (alert.id, alert.title, alert.body, alert.severity, alert.created_at)
+
+def severity_label(alert: Alert) -> str:
+    """Plain severity string for an alert whose severity may be an enum or a string."""
+    return str(getattr(alert.severity, "value", alert.severity))
+
+class MessageTemplateCache:
+    """LRU cache of the alert-invariant part of each channel's payload."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, channel_name: str, alert: Alert, render: Callable[[Alert], Any]) -> Any:
+        """Return the cached template for this channel and alert version, rendering it once."""
+        key = (channel_name,) + alert_version(alert)
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return template
+
+        template = render(alert)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return template
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# Shared by all channel instances so templates survive per-request channel construction
+template_cache = MessageTemplateCache()
@@ -0,0 +1,97 @@
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, plus any ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+class ChannelSamplingFilter(logging.Filter):
+    """Sample routine per-delivery records by channel; warnings and errors always pass.
+
+    Records opt in by setting ``channel`` in ``extra``. Kept records carry the rate they
+    were sampled at so counts can be scaled back up.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float] = None, default_rate: float = 1.0):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.default_rate = default_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        channel = getattr(record, "channel", None)
+        if channel is None or record.levelno >= logging.WARNING:
+            return True
+        rate = self.sample_rates.get(channel, self.default_rate)
+        if rate >= 1.0:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+class LoggingPipeline:
+    """Queue-based logging for the ``app`` logger tree.
+
+    Callers only filter and enqueue records; a listener thread formats and writes them,
+    so stdout I/O never runs on the request, sweep or dispatcher threads.
+    """
+
+    def __init__(self):
+        self.listener: Optional[QueueListener] = None
+        self.handler: Optional[QueueHandler] = None
+
+    def configure(self, level: str = "INFO", json_output: bool = True,
+                  sample_rates: Dict[str, float] = None, stream=None):
+        """Route the ``app`` loggers through the queue; call start() to begin writing."""
+        self.stop()
+        log_queue = queue.SimpleQueue()
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if json_output else
+                            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+        # Sampling runs before enqueueing, so dropped records cost only the filter call
+        self.handler = QueueHandler(log_queue)
+        self.handler.addFilter(ChannelSamplingFilter(sample_rates))
+
+        app_logger = logging.getLogger("app")
+        for handler in [h for h in app_logger.handlers if isinstance(h, QueueHandler)]:
+            app_logger.removeHandler(handler)
+        app_logger.addHandler(self.handler)
+        app_logger.setLevel(level)
+        app_logger.propagate = False
+
+        self.listener = QueueListener(log_queue, output, respect_handler_level=True)
+
+    def start(self):
+        if self.listener and not self.listener._thread:
+            self.listener.start()
+
+    def stop(self):
+        """Flush queued records and stop the listener thread."""
+        if self.listener and self.listener._thread:
+            self.listener.stop()
+
+# Global logging pipeline instance
+logging_pipeline = LoggingPipeline()
@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.settings import settings
+
+# Profile of the request being handled; worker threads and async DB calls inherit the context
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+class RequestProfile:
+    """Wall time, DB time, query count and rows fetched for one request."""
+
+    __slots__ = ("method", "route", "status", "started", "wall_seconds", "db_seconds", "queries", "rows")
+
+    def __init__(self, method: str):
+        self.method = method
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started = time.perf_counter()
+        self.wall_seconds = 0.0
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+
+    def server_timing(self) -> str:
+        """Server-Timing header value; browsers show it in the network panel."""
+        return (f"app;dur={self.wall_seconds * 1000:.1f}, "
+                f"db;dur={self.db_seconds * 1000:.1f}, "
+                f"queries;desc=\"{self.queries}\", rows;desc=\"{self.rows}\"")
+
+class RequestProfiler:
+    """Opt-in per-request profiler fed by SQLAlchemy cursor events.
+
+    A sampled request gets a RequestProfile in a context variable; cursor events on every
+    engine (primary, replicas and the async engines' sync cores) add to it. Finished profiles
+    go into a rolling window of the last ``window`` sampled requests, summarised per route.
+    Rows are what the driver reports: psycopg2 and asyncpg count rows returned by a SELECT,
+    sqlite3 only counts rows changed by DML.
+    """
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 1.0, window: int = 1000, top_n: int = 10):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self._lock = threading.Lock()
+        self._profiles: Deque[RequestProfile] = deque(maxlen=window)
+        self._installed = False
+        self.sampled = 0
+
+    def install(self):
+        """Listen to cursor events on all engines; a no-op once installed."""
+        if self._installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        self._installed = True
+
+    def start(self, method: str) -> Optional[RequestProfile]:
+        """Begin profiling a request if it is sampled; returns its profile or None."""
+        if not self.enabled or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return None
+        profile = RequestProfile(method)
+        _current_profile.set(profile)
+        return profile
+
+    def finish(self, profile: RequestProfile, route: str, status: int):
+        profile.wall_seconds = time.perf_counter() - profile.started
+        profile.route = route
+        profile.status = status
+        with self._lock:
+            self._profiles.append(profile)
+            self.sampled += 1
+
+    def reset(self):
+        with self._lock:
+            self._profiles.clear()
+            self.sampled = 0
+
+    def routes(self) -> List[dict]:
+        """Per-route aggregates over the profiles in the window."""
+        with self._lock:
+            profiles = list(self._profiles)
+        grouped: Dict[str, List[RequestProfile]] = {}
+        for profile in profiles:
+            grouped.setdefault(f"{profile.method} {profile.route}", []).append(profile)
+        routes = []
+        for route, items in grouped.items():
+            count = len(items)
+            routes.append({
+                "route": route,
+                "requests": count,
+                "avg_ms": round(sum(p.wall_seconds for p in items) * 1000 / count, 2),
+                "max_ms": round(max(p.wall_seconds for p in items) * 1000, 2),
+                "avg_db_ms": round(sum(p.db_seconds for p in items) * 1000 / count, 2),
+                "avg_queries": round(sum(p.queries for p in items) / count, 1),
+                "max_queries": max(p.queries for p in items),
+                "avg_rows": round(sum(p.rows for p in items) / count, 1),
+                "errors": sum(1 for p in items if p.status >= 500)
+            })
+        return routes
+
+    def snapshot(self, top_n: Optional[int] = None) -> dict:
+        """Top routes by average wall time and by average query count."""
+        top_n = top_n or self.top_n
+        routes = self.routes()
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "window": self._profiles.maxlen,
+            "profiled_requests": self.sampled,
+            "slowest": sorted(routes, key=lambda r: r["avg_ms"], reverse=True)[:top_n],
+            "most_queried": sorted(routes, key=lambda r: r["avg_queries"], reverse=True)[:top_n]
+        }
+
+def route_template(scope) -> str:
+    """The matched route's full path template, e.g. /api/v1/user/alerts/feed/{user_id}.
+
+    Routes of an included router may only know their path relative to its prefix, so the
+    prefix is taken from the request path, which ends in as many segments as the template.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "<unmatched>"
+    segments = scope["path"].rstrip("/").split("/")
+    depth = template.rstrip("/").count("/")
+    return "/".join(segments[:len(segments) - depth]) + template
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info["profiling_started"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = conn.info.pop("profiling_started", None)
+    if profile is None or started is None:
+        return
+    profile.db_seconds += time.perf_counter() - started
+    profile.queries += 1
+    if cursor.rowcount > 0:
+        profile.rows += cursor.rowcount
+
+# Global request profiler instance
+request_profiler = RequestProfiler(
+    enabled=settings.PROFILING_ENABLED,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    window=settings.PROFILING_WINDOW,
+    top_n=settings.PROFILING_TOP_N
+)
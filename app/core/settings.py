@@ -1,8 +1,81 @@
+from typing import Any, Dict, List
 from pydantic_settings import BaseSettings
 from app.core.config import config
 
 class Settings(BaseSettings):
     DATABASE_URL: str = config.DATABASE_URL
     REMINDER_INTERVAL_MINUTES: int = 120
+    DELIVERY_RETENTION_DAYS: int = 90
+    DELIVERY_ARCHIVE_DIR: str = "data/delivery_archive"
+    DELIVERY_ARCHIVE_CHUNK_SIZE: int = 50000
+
+    # Channel configs in ChannelFactory.create_channels_from_config format; a channel's
+    # config may set "rate_limit": {"per_second": 10, "burst": 20} to throttle its sends
+    NOTIFICATION_CHANNELS: List[Dict[str, Any]] = [{"type": "in_app"}]
+
+    # Transactional outbox: sweeps queue sends, background workers drain them
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_CHANNEL_CONCURRENCY: Dict[str, int] = {"in_app": 8, "email": 4, "sms": 4}
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 6
+    OUTBOX_BACKOFF_BASE_SECONDS: int = 30
+    OUTBOX_BACKOFF_MAX_SECONDS: int = 3600
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_RETENTION_DAYS: int = 7
+
+    # Digest mode (outbox only): coalesce a user's due alerts per channel into one message.
+    # A new alert pushes the digest out by DIGEST_WINDOW_MINUTES, but never later than
+    # DIGEST_MAX_WINDOW_MINUTES after the first alert it holds; bypass severities send at once.
+    DIGEST_ENABLED: bool = False
+    DIGEST_CHANNELS: List[str] = ["email", "sms"]
+    DIGEST_WINDOW_MINUTES: int = 15
+    DIGEST_MAX_WINDOW_MINUTES: int = 60
+    DIGEST_BYPASS_SEVERITIES: List[str] = ["critical"]
+
+    # Read replicas for analytics, feed and list routes. A replica is skipped while its lag
+    # exceeds REPLICA_MAX_LAG_SECONDS or it has not yet replayed the client's last write
+    DATABASE_REPLICA_URLS: List[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5.0
+
+    # Async engine used by the high-traffic user routes (asyncpg / aiosqlite)
+    ASYNC_DB_POOL_SIZE: int = 20
+    ASYNC_DB_MAX_OVERFLOW: int = 20
+
+    # In-process cache of the active alert set; it expires at the next alert start/expiry and
+    # on alert writes, and after MAX_AGE_SECONDS (0 disables) to pick up other processes' writes
+    ACTIVE_ALERT_CACHE_ENABLED: bool = True
+    ACTIVE_ALERT_CACHE_MAX_AGE_SECONDS: int = 60
+
+    # In-process user/team directory used by sweeps and audience resolution; kept current by
+    # the repositories and fully reloaded after MAX_AGE_SECONDS (0 disables)
+    USER_DIRECTORY_MAX_AGE_SECONDS: int = 300
+
+    # Bulk admin imports: valid rows are inserted IMPORT_CHUNK_SIZE per transaction; the
+    # report lists at most IMPORT_MAX_REPORTED_ERRORS row errors (all are counted)
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+
+    # Opt-in request profiling: wall time, DB time, query count and rows fetched go out as
+    # Server-Timing headers and into a rolling window of the last PROFILING_WINDOW profiled
+    # requests. PROFILING_SAMPLE_RATE below 1 profiles only that share of requests
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 1.0
+    PROFILING_WINDOW: int = 1000
+    PROFILING_TOP_N: int = 10
+
+    # Slow query log: every statement is timed; those taking SLOW_QUERY_THRESHOLD_MS or more are
+    # kept (normalized SQL, parameter types and a plan-only EXPLAIN) in a ring buffer of
+    # SLOW_QUERY_LOG_SIZE entries at /admin/system/slow-queries
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_LOG_SIZE: int = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+
+    # Queue-based logging for the app loggers; routine per-delivery channel logs are
+    # sampled at these rates (unlisted channels log everything), failures are never sampled
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_CHANNEL_SAMPLE_RATES: Dict[str, float] = {"in_app": 0.01, "email": 0.1, "sms": 0.1}
 
 settings = Settings()
@@ -0,0 +1,43 @@
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.settings import settings
+from app.db.replicas import last_write_at
+
+# Async drivers for the sync URLs in settings
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def to_async_url(url: str) -> str:
+    """The same database as a sync URL, addressed through its async driver."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+def create_async_session_factory(url: str, **info) -> async_sessionmaker:
+    """Async engine and session factory for a sync database URL.
+
+    Sessions keep loaded attributes after commit, since an expired attribute would need
+    implicit IO, which AsyncSession does not allow.
+    """
+    engine_options = {"pool_pre_ping": True}
+    if make_url(url).get_backend_name() != "sqlite":
+        engine_options.update(pool_size=settings.ASYNC_DB_POOL_SIZE, max_overflow=settings.ASYNC_DB_MAX_OVERFLOW)
+    async_engine = create_async_engine(to_async_url(url), **engine_options)
+    return async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False, info=info)
+
+AsyncSessionLocal = create_async_session_factory(settings.DATABASE_URL)
+async_engine = AsyncSessionLocal.kw["bind"]
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    """Async counterpart of get_read_db; lag checks never run on the event loop."""
+    from app.db.session import replica_router
+    replica = replica_router.choose(last_write_at(request.headers, request.cookies), blocking=False)
+    factory = replica.async_session_factory if replica else AsyncSessionLocal
+    async with factory() as db:
+        yield db
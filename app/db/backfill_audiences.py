@@ -0,0 +1,14 @@
+from app.db.session import SessionLocal
+from app.repositories.alert_repo import AlertRepository
+
+def backfill_audiences():
+    """Populate alert_audiences from the visibility JSON of every existing alert."""
+    db = SessionLocal()
+    try:
+        result = AlertRepository(db).backfill_audiences()
+    finally:
+        db.close()
+    print(f"Backfilled {result['audience_rows']} audience rows for {result['alerts']} alerts")
+
+if __name__ == "__main__":
+    backfill_audiences()
@@ -0,0 +1,54 @@
+import csv
+import enum
+import io
+import json
+from typing import Any, Dict, List
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.db.functions import dialect_name
+
+# Below this many rows a multi-row INSERT is as fast as COPY and needs no CSV encoding
+COPY_THRESHOLD = 1000
+
+def bulk_insert(db: Session, model, rows: List[Dict[str, Any]], copy_threshold: int = COPY_THRESHOLD):
+    """Insert many rows of ``model`` inside the session's transaction, without loading ORM objects.
+
+    Every row must carry the same keys, including any client-generated primary key. On
+    PostgreSQL large batches are streamed with COPY; everywhere else (and for small
+    batches) rows go through one executemany INSERT, which SQLAlchemy turns into
+    multi-row VALUES batches on drivers that support it. The INSERT targets the table,
+    not the mapper: ORM bulk inserts split the batch into one statement per run of rows
+    with the same None columns, and None here means NULL anyway.
+    """
+    if not rows:
+        return
+    if dialect_name(db) == "postgresql" and len(rows) >= copy_threshold and _copy_rows(db, model.__table__, rows):
+        return
+    db.execute(insert(model.__table__), rows)
+
+def _copy_rows(db: Session, table, rows: List[Dict[str, Any]]) -> bool:
+    """Helper method to stream rows with COPY ... FROM STDIN; returns False if the driver can't."""
+    cursor = db.connection().connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        return False
+
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[c]) for c in columns])
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{c}"' for c in columns)
+    cursor.copy_expert(f'COPY "{table.name}" ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+    return True
+
+def _copy_value(value: Any) -> Any:
+    """Helper method to encode one value for CSV COPY."""
+    if value is None:
+        return ""  # unquoted empty field is NULL
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy Enum columns store member names
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
@@ -1,6 +1,6 @@
 from app.db.base import Base
 from app.db.session import engine
-from app.models import alert, user, team, notification_delivery, user_alert_pref
+from app.models import alert, alert_audience, user, team, notification_delivery, notification_outbox, user_alert_pref
 
 def create_all_tables():
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,40 @@
+from datetime import date, datetime
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import Session
+
+def dialect_name(db: Session) -> str:
+    """Name of the SQL dialect the session is bound to (e.g. postgresql, sqlite)."""
+    return db.get_bind().dialect.name
+
+def seconds_between(db: Session, start, end):
+    """SQL expression for the number of seconds between two timestamp columns."""
+    if dialect_name(db) == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400.0
+    return func.extract("epoch", end - start)
+
+TRUNC_UNITS = ("hour", "day", "week")
+
+_SQLITE_TRUNC_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+def date_trunc(db: Session, unit: str, column):
+    """SQL expression truncating a timestamp column to an hour/day/week bucket."""
+    if unit not in TRUNC_UNITS:
+        raise ValueError(f"Unsupported time bucket: {unit}")
+    if dialect_name(db) == "sqlite":
+        if unit == "week":
+            # Monday-based weeks, matching PostgreSQL date_trunc('week', ...)
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime(_SQLITE_TRUNC_FORMATS[unit], column)
+    # Inline the unit so SELECT and GROUP BY render the identical expression
+    return func.date_trunc(literal_column(f"'{unit}'"), column)
+
+def as_datetime(value):
+    """Normalize a bucket value returned by date_trunc into a datetime."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, datetime.min.time())
+    return value
@@ -0,0 +1,150 @@
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Write responses carry the commit time; clients echo it back (header or cookie) on reads
+LAST_WRITE_HEADER = "X-Last-Write-At"
+LAST_WRITE_COOKIE = "last_write_at"
+
+# Lag of a PostgreSQL standby: 0 when every received WAL record is replayed, otherwise the
+# age of the last replayed transaction. A server that is not in recovery has no lag.
+_PG_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+def is_replica_session(db: Session) -> bool:
+    """Whether the session reads from a replica (and so must not write or fill shared caches)."""
+    return bool(db.info.get("replica"))
+
+class Replica:
+    """One read replica: its session factory plus the last measured replication lag."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.engine = create_engine(url, pool_pre_ping=True)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine,
+                                            info={"replica": name})
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None  # wall clock, comparable with client write times
+        self.healthy = False
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._async_session_factory = None
+
+    @property
+    def async_session_factory(self):
+        """AsyncSession factory for this replica, created on first use."""
+        if self._async_session_factory is None:
+            from app.db.async_session import create_async_session_factory
+            self._async_session_factory = create_async_session_factory(self.url, replica=self.name)
+        return self._async_session_factory
+
+    def is_stale(self, interval_seconds: float) -> bool:
+        return self.checked_at is None or time.time() - self.checked_at >= interval_seconds
+
+    def measuring(self) -> bool:
+        return self._lock.locked()
+
+    def caught_up_to(self) -> Optional[float]:
+        """Wall-clock time up to which every primary commit is visible on this replica."""
+        if not self.healthy or self.checked_at is None:
+            return None
+        return self.checked_at - self.lag_seconds
+
+    def refresh(self, interval_seconds: float):
+        """Re-measure lag if the last measurement is older than ``interval_seconds``."""
+        if not self.is_stale(interval_seconds):
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # another request is measuring it
+        try:
+            started = time.time()
+            with self.engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    lag = float(connection.execute(_PG_LAG_SQL).scalar() or 0)
+                else:
+                    connection.execute(text("SELECT 1"))
+                    lag = 0.0
+            self.lag_seconds, self.checked_at, self.healthy, self.last_error = lag, started, True, None
+        except Exception as e:
+            if self.healthy:
+                logger.warning(f"Read replica {self.name} unavailable: {e}", extra={"replica": self.name})
+            self.lag_seconds, self.checked_at, self.healthy, self.last_error = None, time.time(), False, str(e)
+        finally:
+            self._lock.release()
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag_seconds, 3) if self.lag_seconds is not None else None,
+            "checked_at": self.checked_at,
+            "last_error": self.last_error
+        }
+
+class ReplicaRouter:
+    """Chooses a read replica for read-only requests, falling back to the primary.
+
+    A replica is used only while its measured lag is within ``max_lag_seconds`` and, for a
+    client that recently wrote, only once it has replayed past that client's write time.
+    """
+
+    def __init__(self, urls: List[str], max_lag_seconds: float = 5.0, check_interval_seconds: float = 5.0):
+        self.replicas = [Replica(f"replica-{i}", url) for i, url in enumerate(urls)]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._next = itertools.count()
+        self.stats = {"replica_reads": 0, "primary_fallbacks": 0, "read_your_writes": 0}
+
+    def choose(self, last_write_at: Optional[float] = None, blocking: bool = True) -> Optional[Replica]:
+        """A replica fit to serve this read, or None to use the primary.
+
+        With ``blocking=False`` (async callers) stale lag measurements are refreshed on a
+        background thread and the last measurement is used meanwhile.
+        """
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        waiting_on_write = False
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if blocking:
+                replica.refresh(self.check_interval_seconds)
+            elif replica.is_stale(self.check_interval_seconds) and not replica.measuring():
+                threading.Thread(target=replica.refresh, args=(self.check_interval_seconds,), daemon=True).start()
+            caught_up_to = replica.caught_up_to()
+            if caught_up_to is None or replica.lag_seconds > self.max_lag_seconds:
+                continue
+            if last_write_at is not None and caught_up_to < last_write_at:
+                waiting_on_write = True
+                continue
+            self.stats["replica_reads"] += 1
+            return replica
+        self.stats["read_your_writes" if waiting_on_write else "primary_fallbacks"] += 1
+        return None
+
+    def status(self) -> dict:
+        return {
+            "max_lag_seconds": self.max_lag_seconds,
+            "replicas": [replica.status() for replica in self.replicas],
+            **self.stats
+        }
+
+def last_write_at(headers, cookies) -> Optional[float]:
+    """Client's last write time (epoch seconds) from the request header or cookie, if any."""
+    value = headers.get(LAST_WRITE_HEADER) or cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
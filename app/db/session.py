@@ -1,13 +1,36 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.settings import settings
+from app.db.replicas import ReplicaRouter, last_write_at
+from app.db.slow_queries import slow_query_log
 
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas for read-only routes; empty DATABASE_REPLICA_URLS sends everything to the primary
+replica_router = ReplicaRouter(
+    settings.DATABASE_REPLICA_URLS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS
+)
+
+# Times statements on every engine, including replicas and the async engines
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.install()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request):
+    """Session for read-only routes: a replica caught up with this client's writes, else the primary."""
+    replica = replica_router.choose(last_write_at(request.headers, request.cookies))
+    db = replica.session_factory() if replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
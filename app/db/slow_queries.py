@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Plan-only EXPLAIN per dialect; neither executes the statement
+_EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN (ANALYZE off) ", "sqlite": "EXPLAIN QUERY PLAN "}
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+# Parameter lists longer than this are summarised by count and types
+_MAX_SHAPE_ITEMS = 20
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|\?|(?<!:):\w+")
+_IN_LIST = re.compile(r"\b(IN\s*)\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """The statement with literals and placeholders as ``?``, IN and VALUES lists collapsed.
+
+    Statements that differ only in values or in the length of an expanded IN list
+    normalize to the same text.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub(r"\1(...)", sql)
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = _VALUES_LIST.sub("(...), ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def _type_name(value) -> str:
+    return "null" if value is None else type(value).__name__
+
+def parameter_shape(parameters, executemany: bool = False) -> Any:
+    """Names and types of the bound parameters, never their values."""
+    if executemany:
+        rows = list(parameters or [])
+        return {"executemany": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        if len(parameters) > _MAX_SHAPE_ITEMS:
+            return {"count": len(parameters), "types": sorted({_type_name(v) for v in parameters.values()})}
+        return {name: _type_name(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if len(parameters) > _MAX_SHAPE_ITEMS:
+            return {"count": len(parameters), "types": sorted({_type_name(v) for v in parameters})}
+        return [_type_name(value) for value in parameters]
+    return None
+
+class SlowQueryLog:
+    """Ring buffer of statements slower than ``threshold_ms``, fed by SQLAlchemy cursor events.
+
+    Every statement on every engine is timed; a slow one is kept with its normalized SQL,
+    its parameter shape and, if ``explain`` is on, a plan from a plan-only EXPLAIN run on the
+    same connection (inside a savepoint on PostgreSQL, so a failed EXPLAIN cannot abort the
+    caller's transaction). Each distinct statement is explained once while it is remembered.
+    """
+
+    def __init__(self, threshold_ms: float = 200, capacity: int = 200, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._entries: Deque[dict] = deque(maxlen=capacity)
+        self._plans: "OrderedDict[str, Tuple[Optional[List[str]], Optional[str]]]" = OrderedDict()
+        self._installed = False
+        self.recorded = 0
+
+    def install(self):
+        """Listen to cursor events on all engines; a no-op once installed."""
+        if self._installed:
+            return
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        self._installed = True
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["slow_query_started"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("slow_query_started", None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= self.threshold_ms:
+            try:
+                self.record(conn, statement, parameters, executemany, duration_ms)
+            except Exception as e:
+                logger.warning(f"Could not record slow query: {e}")
+
+    def record(self, conn, statement: str, parameters, executemany: bool, duration_ms: float):
+        sql = normalize_sql(statement)
+        fingerprint = hashlib.sha1(sql.encode()).hexdigest()[:16]
+        plan, plan_error = self._get_plan(conn, fingerprint, statement, parameters, executemany)
+        url = conn.engine.url
+        entry = {
+            "fingerprint": fingerprint,
+            "sql": sql,
+            "duration_ms": round(duration_ms, 2),
+            "parameters": parameter_shape(parameters, executemany),
+            "database": f"{url.get_backend_name()}://{url.host or ''}/{url.database or ''}",
+            "recorded_at": datetime.utcnow().isoformat(),
+            "plan": plan,
+            "plan_error": plan_error
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        logger.warning(f"Slow query ({duration_ms:.0f} ms, fingerprint {fingerprint}): {sql[:500]}")
+
+    def _get_plan(self, conn, fingerprint: str, statement: str, parameters,
+                  executemany: bool) -> Tuple[Optional[List[str]], Optional[str]]:
+        """Helper method to return the cached plan for a statement, explaining it on first sight."""
+        if not self.explain:
+            return None, None
+        with self._lock:
+            if fingerprint in self._plans:
+                self._plans.move_to_end(fingerprint)
+                return self._plans[fingerprint]
+        plan = _explain(conn, statement, parameters, executemany)
+        with self._lock:
+            self._plans[fingerprint] = plan
+            while len(self._plans) > self._entries.maxlen:
+                self._plans.popitem(last=False)
+        return plan
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+            self.recorded = 0
+
+    def snapshot(self, limit: Optional[int] = None) -> dict:
+        """Recent slow queries, newest first, plus per-statement totals over the buffer."""
+        with self._lock:
+            entries = list(self._entries)
+        statements: Dict[str, dict] = {}
+        for entry in entries:
+            summary = statements.setdefault(entry["fingerprint"], {
+                "fingerprint": entry["fingerprint"], "sql": entry["sql"], "count": 0,
+                "total_ms": 0.0, "max_ms": 0.0
+            })
+            summary["count"] += 1
+            summary["total_ms"] = round(summary["total_ms"] + entry["duration_ms"], 2)
+            summary["max_ms"] = max(summary["max_ms"], entry["duration_ms"])
+        entries.reverse()
+        return {
+            "threshold_ms": self.threshold_ms,
+            "capacity": self._entries.maxlen,
+            "recorded": self.recorded,
+            "statements": sorted(statements.values(), key=lambda s: s["total_ms"], reverse=True),
+            "queries": entries[:limit] if limit else entries
+        }
+
+def _explain(conn, statement: str, parameters, executemany: bool) -> Tuple[Optional[List[str]], Optional[str]]:
+    """Helper method to run a plan-only EXPLAIN of the statement on the caller's connection.
+
+    Runs on a raw DBAPI cursor, so it is neither timed nor profiled itself.
+    """
+    prefix = _EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None:
+        return None, f"EXPLAIN is not supported on {conn.dialect.name}"
+    if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return None, "Statement cannot be explained"
+    if executemany:
+        parameters = parameters[0] if parameters else None
+    savepoint = conn.dialect.name == "postgresql"
+    cursor = conn.connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception as e:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return None, str(e).strip()
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        # PostgreSQL returns one plan line per row; SQLite's detail is the last column
+        return [str(row[-1]) for row in rows], None
+    except Exception as e:
+        return None, str(e).strip()
+    finally:
+        cursor.close()
+
+# Global slow query log instance
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    capacity=settings.SLOW_QUERY_LOG_SIZE,
+    explain=settings.SLOW_QUERY_EXPLAIN
+)
@@ -1,21 +1,35 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
-from app.api.v1.admin import admin_alert_routes, admin_user_routes, admin_team_routes, admin_analytics_routes, admin_system_routes
+from app.api.v1.admin import admin_alert_routes, admin_user_routes, admin_team_routes, admin_analytics_routes, admin_system_routes, admin_import_routes
 from app.api.v1.user import user_alert_routes, user_notification_routes
 from app.core.config import config
+from app.core.logging_config import logging_pipeline
+from app.core.profiling import request_profiler, route_template
+from app.core.settings import settings
+from app.db.async_session import async_engine
+from app.db.replicas import LAST_WRITE_COOKIE, LAST_WRITE_HEADER
 from app.services.scheduler_service import scheduler_service
+from app.services.outbox_worker import outbox_worker
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler to manage scheduler."""
     # Startup
+    logging_pipeline.configure(settings.LOG_LEVEL, settings.LOG_JSON, settings.LOG_CHANNEL_SAMPLE_RATES)
+    logging_pipeline.start()
     scheduler_service.initialize()
     scheduler_service.start()
+    if settings.OUTBOX_ENABLED:
+        outbox_worker.start()
     yield
     # Shutdown
+    outbox_worker.stop()
     scheduler_service.stop()
+    await async_engine.dispose()
+    logging_pipeline.stop()
 
 app = FastAPI(
     title="Alerting & Notification Platform",
@@ -31,12 +45,41 @@ app = FastAPI(
     },
 )
 
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+@app.middleware("http")
+async def stamp_last_write(request: Request, call_next):
+    """Tell clients when their write committed so their next reads skip replicas that lag behind it."""
+    response = await call_next(request)
+    if settings.DATABASE_REPLICA_URLS and request.method in WRITE_METHODS and response.status_code < 400:
+        written_at = f"{time.time():.3f}"
+        response.headers[LAST_WRITE_HEADER] = written_at
+        response.set_cookie(LAST_WRITE_COOKIE, written_at, max_age=int(settings.REPLICA_MAX_LAG_SECONDS) + 60,
+                            httponly=True, samesite="lax")
+    return response
+
+# Cursor event hooks are only attached when profiling is on
+if request_profiler.enabled:
+    request_profiler.install()
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Profile sampled requests: Server-Timing headers plus per-route stats for the admin view."""
+    profile = request_profiler.start(request.method)
+    if profile is None:
+        return await call_next(request)
+    response = await call_next(request)
+    request_profiler.finish(profile, route_template(request.scope), response.status_code)
+    response.headers["Server-Timing"] = profile.server_timing()
+    return response
+
 # Include Admin API routers
 app.include_router(admin_alert_routes.router, prefix="/api/v1/admin", tags=["Admin - Alerts"])
 app.include_router(admin_user_routes.router, prefix="/api/v1/admin", tags=["Admin - Users"])
 app.include_router(admin_team_routes.router, prefix="/api/v1/admin", tags=["Admin - Teams"])
 app.include_router(admin_analytics_routes.router, prefix="/api/v1/admin", tags=["Admin - Analytics"])
 app.include_router(admin_system_routes.router, prefix="/api/v1/admin", tags=["Admin - System"])
+app.include_router(admin_import_routes.router, prefix="/api/v1/admin", tags=["Admin - Import"])
 
 # Include User API routers
 app.include_router(user_alert_routes.router, prefix="/api/v1/user", tags=["User - Alerts"])
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, ForeignKey, Index, String, Uuid
+import uuid
+from app.db.base import Base
+
+class AudienceKind:
+    """Kinds of alert audience rows."""
+    ORG = "org"    # everyone; target_id is NULL
+    TEAM = "team"  # members of team target_id
+    USER = "user"  # user target_id
+
+class AlertAudience(Base):
+    """Normalized form of Alert.visibility, one row per audience an alert is visible to."""
+    __tablename__ = "alert_audiences"
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    alert_id = Column(Uuid(as_uuid=True), ForeignKey("alerts.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    target_id = Column(Uuid(as_uuid=True), nullable=True)
+
+    __table_args__ = (
+        # Feed lookups filter on (kind, target_id) and only need alert_id back
+        Index("ix_alert_audiences_target", "kind", "target_id", "alert_id"),
+    )
@@ -0,0 +1,32 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Index, Uuid
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+class OutboxStatus:
+    """Lifecycle states of an outbox entry."""
+    PENDING = "pending"
+    SENT = "sent"
+    SKIPPED = "skipped"  # channel not configured; nothing to retry
+    DEAD = "dead"        # retries exhausted
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Not a foreign key: delivery rows are archived out of the hot table while outbox rows are purged separately
+    delivery_id = Column(Uuid(as_uuid=True), nullable=False, index=True)
+    alert_id = Column(Uuid(as_uuid=True), nullable=False)
+    user_id = Column(Uuid(as_uuid=True), nullable=False)
+    channel = Column(String, nullable=False)  # e.g. in_app/email/sms
+    priority = Column(Integer, nullable=False, default=2)  # 0 = critical, 1 = warning, 2 = info
+    digest = Column(Boolean, nullable=False, default=False)  # held for the user's next digest on this channel
+    status = Column(String, nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_due", "channel", "status", "priority", "next_attempt_at"),
+    )
@@ -1,13 +1,12 @@
-from sqlalchemy import Column, Date, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Uuid
 import uuid
 from app.db.base import Base
 
 class UserAlertPreference(Base):
     __tablename__ = "user_alert_preferences"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    alert_id = Column(UUID(as_uuid=True), ForeignKey("alerts.id"), nullable=False)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    alert_id = Column(Uuid(as_uuid=True), ForeignKey("alerts.id"), nullable=False)
     snoozed_date = Column(Date, nullable=True)  # If snoozed, store date
     last_delivered_at = Column(DateTime, nullable=True)
 
@@ -0,0 +1,99 @@
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.core.settings import settings
+from app.models.alert import Alert
+
+class ActiveAlertCache:
+    """Process-wide snapshot of the active alert set.
+
+    An entry stays valid until the earliest upcoming start_time or expiry_time of any
+    unarchived alert, so it expires exactly when the set would change on its own. Alert
+    writes through AlertRepository invalidate it. ``max_age_seconds`` (0 for none) bounds
+    how long writes made by other processes can go unseen.
+
+    ``version`` changes whenever the active set may have changed (invalidation, a passed
+    boundary or max age), so derived caches can key on it. Cached alerts are detached from
+    any session and shared between callers; treat them as read-only.
+    """
+
+    def __init__(self, max_age_seconds: float = 0, enabled: bool = True):
+        self.max_age_seconds = max_age_seconds
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._alerts: Optional[Tuple[Alert, ...]] = None
+        self._built_at: Optional[datetime] = None
+        self._valid_until: Optional[datetime] = None
+        self._loaded_monotonic = 0.0
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            self._expire(datetime.utcnow())
+            return self._version
+
+    def get(self, now: datetime) -> Optional[List[Alert]]:
+        """Cached active alerts at ``now``, or None when they must be loaded."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._expire(now)
+            if self._alerts is None or now < self._built_at:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(self._alerts)
+
+    def begin_load(self) -> int:
+        """Version to pass to store(); a load that races an invalidation is then discarded."""
+        with self._lock:
+            return self._version
+
+    def store(self, version: int, alerts: List[Alert], now: datetime, valid_until: Optional[datetime]):
+        """Cache ``alerts`` as the active set from ``now`` until ``valid_until`` (None: no boundary)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._alerts = tuple(alerts)
+            self._built_at = now
+            self._valid_until = valid_until
+            self._loaded_monotonic = time.monotonic()
+
+    def invalidate(self):
+        """Drop the cached set after an alert write."""
+        with self._lock:
+            self._alerts = None
+            self._version += 1
+            self.invalidations += 1
+
+    def _expire(self, now: datetime):
+        """Helper method to drop the entry once a start/expiry boundary or the max age has passed."""
+        if self._alerts is None:
+            return
+        boundary_passed = self._valid_until is not None and now >= self._valid_until
+        too_old = self.max_age_seconds and time.monotonic() - self._loaded_monotonic >= self.max_age_seconds
+        if boundary_passed or too_old:
+            self._alerts = None
+            self._version += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "cached_alerts": len(self._alerts) if self._alerts is not None else None,
+                "valid_until": self._valid_until,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
+
+# Global active alert cache instance
+active_alert_cache = ActiveAlertCache(settings.ACTIVE_ALERT_CACHE_MAX_AGE_SECONDS, settings.ACTIVE_ALERT_CACHE_ENABLED)
@@ -1,6 +1,13 @@
+import uuid
+from sqlalchemy import func, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
+from app.db.bulk import bulk_insert
+from app.db.replicas import is_replica_session
 from app.models.alert import Alert
+from app.models.alert_audience import AlertAudience, AudienceKind
+from app.repositories.alert_cache import active_alert_cache
 
 class AlertRepository:
     def __init__(self, db: Session):
@@ -9,27 +16,72 @@ class AlertRepository:
     def create_alert(self, alert_data: dict) -> Alert:
         alert = Alert(**alert_data)
         self.db.add(alert)
+        self.db.flush()
+        self._replace_audiences(alert.id, alert.visibility)
         self.db.commit()
+        active_alert_cache.invalidate()
         self.db.refresh(alert)
         return alert
 
+    def create_alerts_bulk(self, rows: list):
+        """Insert many alerts (rows carry every column, including id) and their audience rows in one transaction."""
+        bulk_insert(self.db, Alert, rows)
+        bulk_insert(self.db, AlertAudience, [dict(audience, id=uuid.uuid4()) for row in rows
+                                             for audience in self.audience_rows(row["id"], row["visibility"])])
+        self.db.commit()
+        active_alert_cache.invalidate()
+
     def get_alert_by_id(self, alert_id: str):
         return self.db.query(Alert).filter(Alert.id == alert_id).first()
 
-    def get_active_alerts(self, now: datetime = None):
-        """Fetch alerts that are active (not archived, within start/expiry)."""
-        now = now or datetime.utcnow()
-        return self.db.query(Alert).filter(
+    def get_alerts_by_ids(self, alert_ids):
+        return self.db.query(Alert).filter(Alert.id.in_(list(alert_ids))).all()
+
+    @staticmethod
+    def active_condition(now: datetime):
+        """SQL condition matching alerts that are active at ``now``."""
+        return and_(
             Alert.is_archived == False,
             Alert.start_time <= now,
             (Alert.expiry_time == None) | (Alert.expiry_time > now)
-        ).all()
+        )
+
+    def get_active_alerts(self, now: datetime = None):
+        """Fetch alerts that are active (not archived, within start/expiry).
+
+        Served from the process-wide active alert cache when possible; the returned alerts
+        are then shared and detached from this session, so callers must not modify them.
+        """
+        now = now or datetime.utcnow()
+        cached = active_alert_cache.get(now)
+        if cached is not None:
+            return cached
+
+        version = active_alert_cache.begin_load()
+        alerts = self.db.query(Alert).filter(self.active_condition(now)).all()
+        valid_until = self.get_next_active_boundary(now)
+        for alert in alerts:
+            self.db.expunge(alert)
+        if not is_replica_session(self.db):
+            # A lagging replica could re-cache a set that a primary write just invalidated
+            active_alert_cache.store(version, alerts, now, valid_until)
+        return alerts
+
+    def get_next_active_boundary(self, now: datetime):
+        """Earliest start_time or expiry_time after ``now`` among unarchived alerts, or None."""
+        next_start, next_expiry = self.db.query(
+            func.min(Alert.start_time).filter(Alert.start_time > now),
+            func.min(Alert.expiry_time).filter(Alert.expiry_time > now)
+        ).filter(Alert.is_archived == False).one()
+        boundaries = [b for b in (next_start, next_expiry) if b is not None]
+        return min(boundaries) if boundaries else None
 
     def archive_alert(self, alert_id: str):
         alert = self.get_alert_by_id(alert_id)
         if alert:
             alert.is_archived = True
             self.db.commit()
+            active_alert_cache.invalidate()
             self.db.refresh(alert)
         return alert
 
@@ -39,9 +91,87 @@ class AlertRepository:
             for key, value in update_data.items():
                 if hasattr(alert, key):
                     setattr(alert, key, value)
+            if "visibility" in update_data:
+                self._replace_audiences(alert.id, alert.visibility)
             self.db.commit()
+            active_alert_cache.invalidate()
             self.db.refresh(alert)
         return alert
 
+    @classmethod
+    def active_alerts_for_user_stmt(cls, user_id, team_id=None, now: datetime = None):
+        """SELECT of the active alerts visible to one user, through the alert_audiences index."""
+        now = now or datetime.utcnow()
+        audiences = [AlertAudience.kind == AudienceKind.ORG,
+                     and_(AlertAudience.kind == AudienceKind.USER, AlertAudience.target_id == user_id)]
+        if team_id is not None:
+            audiences.append(and_(AlertAudience.kind == AudienceKind.TEAM, AlertAudience.target_id == team_id))
+        visible = select(AlertAudience.alert_id).where(or_(*audiences))
+        return select(Alert).where(Alert.id.in_(visible), cls.active_condition(now)).order_by(Alert.start_time.desc())
+
+    def get_active_alerts_for_user(self, user_id, team_id=None, now: datetime = None):
+        """Active alerts visible to one user, found through the alert_audiences index."""
+        return self.db.scalars(self.active_alerts_for_user_stmt(user_id, team_id, now)).all()
+
+    @staticmethod
+    def audience_rows(alert_id, visibility: dict) -> list:
+        """alert_audiences rows for a visibility blob; org-wide alerts need only the org row."""
+        if not visibility or visibility.get("org", True):
+            return [{"alert_id": alert_id, "kind": AudienceKind.ORG, "target_id": None}]
+        rows, seen = [], set()
+        for kind, key in ((AudienceKind.TEAM, "teams"), (AudienceKind.USER, "users")):
+            for target in visibility.get(key) or []:
+                try:
+                    target_id = target if isinstance(target, uuid.UUID) else uuid.UUID(str(target))
+                except ValueError:
+                    continue  # unparseable ids never matched anyone under the JSON rules either
+                if (kind, target_id) not in seen:
+                    seen.add((kind, target_id))
+                    rows.append({"alert_id": alert_id, "kind": kind, "target_id": target_id})
+        return rows
+
+    def _replace_audiences(self, alert_id, visibility: dict):
+        """Helper method to rewrite an alert's audience rows inside the current transaction."""
+        self.db.query(AlertAudience).filter(AlertAudience.alert_id == alert_id).delete(synchronize_session=False)
+        bulk_insert(self.db, AlertAudience, [dict(row, id=uuid.uuid4()) for row in self.audience_rows(alert_id, visibility)])
+
+    def backfill_audiences(self, batch_size: int = 5000) -> dict:
+        """Rebuild alert_audiences from every alert's visibility JSON in one transaction."""
+        self.db.query(AlertAudience).delete(synchronize_session=False)
+        alerts = rows = 0
+        batch = []
+        for alert_id, visibility in self.db.query(Alert.id, Alert.visibility).yield_per(batch_size):
+            alerts += 1
+            batch.extend(dict(row, id=uuid.uuid4()) for row in self.audience_rows(alert_id, visibility))
+            if len(batch) >= batch_size:
+                bulk_insert(self.db, AlertAudience, batch)
+                rows += len(batch)
+                batch = []
+        bulk_insert(self.db, AlertAudience, batch)
+        rows += len(batch)
+        self.db.commit()
+        return {"alerts": alerts, "audience_rows": rows}
+
     def get_all_alerts(self):
         return self.db.query(Alert).all()
+
+    def get_alert_summary(self, now: datetime, created_since: datetime):
+        """Single scan of alerts: (severity, total, active, created_since) rows per severity."""
+        return self.db.query(
+            Alert.severity,
+            func.count(Alert.id),
+            func.count(Alert.id).filter(self.active_condition(now)),
+            func.count(Alert.id).filter(Alert.created_at >= created_since)
+        ).group_by(Alert.severity).all()
+
+class AsyncAlertRepository:
+    """AsyncSession reads used by the async user routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_alert_by_id(self, alert_id):
+        return await self.db.get(Alert, alert_id)
+
+    async def get_active_alerts_for_user(self, user_id, team_id=None, now: datetime = None):
+        return (await self.db.scalars(AlertRepository.active_alerts_for_user_stmt(user_id, team_id, now))).all()
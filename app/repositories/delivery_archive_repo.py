@@ -0,0 +1,448 @@
+import os
+import re
+import threading
+import zipfile
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
+
+SEGMENT_PATTERN = re.compile(r"^deliveries-(\d{4})-(\d{2})\.npz$")
+
+# Columns stored per segment; timestamps are kept as datetime64[us] (NaT when unread)
+SEGMENT_COLUMNS = ("id", "alert_id", "user_id", "channel", "delivered_at", "read_at", "severity", "team_id")
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def next_month(value: datetime) -> datetime:
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+class SegmentSummary:
+    """Per-segment aggregates, so unwindowed analytics never decompress the row columns.
+
+    Built chunk by chunk while a segment is written and stored in the same file under
+    ``summary.*`` keys. Counts are [delivered, read]; alert and team entries add the
+    total, fastest and slowest seconds to read, and alerts their first/last delivery.
+    """
+
+    def __init__(self):
+        self.severity: Dict[str, List[int]] = {}
+        self.users: Dict[str, List[int]] = {}
+        self.alerts: Dict[str, list] = {}
+        self.alert_users: Dict[str, set] = {}
+        self.teams: Dict[str, list] = {}
+        self.team_users: Dict[str, set] = {}
+
+    def add(self, columns: Dict[str, np.ndarray]):
+        """Fold one chunk of segment columns into the aggregates."""
+        is_read = ~np.isnat(columns["read_at"])
+        delivered_us = columns["delivered_at"].astype(np.int64)
+        read_seconds = np.where(is_read, (columns["read_at"] - columns["delivered_at"]) / np.timedelta64(1, "s"), 0.0)
+
+        for key, counts in _group_counts(columns["severity"], is_read).items():
+            _add_counts(self.severity.setdefault(key, [0, 0]), counts)
+        for key, counts in _group_counts(columns["user_id"], is_read).items():
+            _add_counts(self.users.setdefault(key, [0, 0]), counts)
+
+        alerts, inverse = np.unique(columns["alert_id"], return_inverse=True)
+        stats = _group_read_stats(inverse, len(alerts), is_read, read_seconds)
+        first = np.full(len(alerts), np.iinfo(np.int64).max)
+        last = np.full(len(alerts), np.iinfo(np.int64).min)
+        np.minimum.at(first, inverse, delivered_us)
+        np.maximum.at(last, inverse, delivered_us)
+        for index, alert_id in enumerate(alerts.tolist()):
+            entry = self.alerts.setdefault(alert_id, [0, 0, 0.0, None, None, None, None])
+            _merge_read_stats(entry, stats[index])
+            entry[5] = int(first[index]) if entry[5] is None else min(entry[5], int(first[index]))
+            entry[6] = int(last[index]) if entry[6] is None else max(entry[6], int(last[index]))
+        _add_pairs(self.alert_users, columns["alert_id"], columns["user_id"])
+
+        has_team = columns["team_id"] != ""
+        teams, inverse = np.unique(columns["team_id"][has_team], return_inverse=True)
+        stats = _group_read_stats(inverse, len(teams), is_read[has_team], read_seconds[has_team])
+        for index, team_id in enumerate(teams.tolist()):
+            _merge_read_stats(self.teams.setdefault(team_id, [0, 0, 0.0, None, None]), stats[index])
+        _add_pairs(self.team_users, columns["team_id"][has_team], columns["user_id"][has_team])
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {}
+        for name in ("severity", "users"):
+            counts = getattr(self, name)
+            arrays[f"summary.{name}.key"] = np.array(list(counts), dtype="U36")
+            arrays[f"summary.{name}.counts"] = np.array(list(counts.values()), dtype=np.int64).reshape(-1, 2)
+        for name, width in (("alerts", 7), ("teams", 5)):
+            entries = getattr(self, name)
+            arrays[f"summary.{name}.key"] = np.array(list(entries), dtype="U36")
+            arrays[f"summary.{name}.stats"] = np.array(
+                [[np.nan if value is None else value for value in entry] for entry in entries.values()],
+                dtype=np.float64).reshape(-1, width)
+        for name in ("alert_users", "team_users"):
+            pairs = [(key, member) for key, members in getattr(self, name).items() for member in members]
+            arrays[f"summary.{name}.key"] = np.array([pair[0] for pair in pairs], dtype="U36")
+            arrays[f"summary.{name}.member"] = np.array([pair[1] for pair in pairs], dtype="U36")
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "SegmentSummary":
+        summary = cls()
+        for name in ("severity", "users"):
+            keys, counts = arrays[f"summary.{name}.key"], arrays[f"summary.{name}.counts"]
+            setattr(summary, name, {key: [int(d), int(r)] for key, (d, r) in zip(keys.tolist(), counts.tolist())})
+        for name in ("alerts", "teams"):
+            keys, stats = arrays[f"summary.{name}.key"], arrays[f"summary.{name}.stats"]
+            setattr(summary, name, {
+                key: [int(row[0]), int(row[1]), row[2]] + [None if np.isnan(v) else v for v in row[3:]]
+                for key, row in zip(keys.tolist(), stats.tolist())
+            })
+        for name in ("alert_users", "team_users"):
+            pairs = {}
+            for key, member in zip(arrays[f"summary.{name}.key"].tolist(), arrays[f"summary.{name}.member"].tolist()):
+                pairs.setdefault(key, set()).add(member)
+            setattr(summary, name, pairs)
+        # Timestamps were stored as float microseconds
+        for entry in summary.alerts.values():
+            entry[5], entry[6] = (int(entry[5]) if entry[5] is not None else None,
+                                  int(entry[6]) if entry[6] is not None else None)
+        return summary
+
+def _group_counts(keys: np.ndarray, is_read: np.ndarray) -> Dict[str, Tuple[int, int]]:
+    unique, inverse = np.unique(keys, return_inverse=True)
+    delivered = np.bincount(inverse, minlength=len(unique))
+    read = np.bincount(inverse, weights=is_read, minlength=len(unique))
+    return {key: (int(d), int(r)) for key, d, r in zip(unique.tolist(), delivered, read)}
+
+def _group_read_stats(inverse: np.ndarray, size: int, is_read: np.ndarray, read_seconds: np.ndarray) -> list:
+    """Per group (delivered, read, total/fastest/slowest seconds to read; None without reads)."""
+    delivered = np.bincount(inverse, minlength=size)
+    read = np.bincount(inverse, weights=is_read, minlength=size)
+    total = np.bincount(inverse, weights=read_seconds, minlength=size)
+    fastest = np.full(size, np.inf)
+    slowest = np.full(size, -np.inf)
+    np.minimum.at(fastest, inverse[is_read], read_seconds[is_read])
+    np.maximum.at(slowest, inverse[is_read], read_seconds[is_read])
+    return [(int(delivered[i]), int(read[i]), float(total[i]),
+             float(fastest[i]) if read[i] else None, float(slowest[i]) if read[i] else None) for i in range(size)]
+
+def _add_counts(entry: List[int], counts: Tuple[int, int]):
+    entry[0] += counts[0]
+    entry[1] += counts[1]
+
+def _merge_read_stats(entry: list, stats: tuple):
+    """Helper method to fold (delivered, read, total, fastest, slowest) into an alert or team entry."""
+    delivered, read, total, fastest, slowest = stats
+    entry[0] += delivered
+    entry[1] += read
+    entry[2] += total
+    if fastest is not None:
+        entry[3] = fastest if entry[3] is None else min(entry[3], fastest)
+        entry[4] = slowest if entry[4] is None else max(entry[4], slowest)
+
+def _add_pairs(pairs: Dict[str, set], keys: np.ndarray, members: np.ndarray):
+    if not len(keys):
+        return
+    unique = np.unique(np.rec.fromarrays([keys, members]))
+    for key, member in unique.tolist():
+        pairs.setdefault(key, set()).add(member)
+
+# Summaries by segment path, reused while the file's size and mtime are unchanged
+_summary_cache: Dict[str, Tuple[Tuple[int, int], SegmentSummary]] = {}
+_summary_cache_lock = threading.Lock()
+
+def _write_member(segment: zipfile.ZipFile, name: str, values: np.ndarray):
+    with segment.open(f"{name}.npy", "w", force_zip64=True) as fh:
+        np.lib.format.write_array(fh, values, allow_pickle=False)
+
+def _part_keys(files: List[str], column: str) -> List[str]:
+    """Keys holding one column's chunks, in write order; older segments store it whole."""
+    if column in files:
+        return [column]
+    parts = [name for name in files if name.startswith(f"{column}.") and name[len(column) + 1:].isdigit()]
+    return sorted(parts, key=lambda name: int(name[len(column) + 1:]))
+
+class DeliveryArchiveRepository:
+    """Monthly, compressed columnar segment files holding archived notification deliveries."""
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+
+    def segment_path(self, month: datetime) -> str:
+        return os.path.join(self.archive_dir, f"deliveries-{month.year:04d}-{month.month:02d}.npz")
+
+    def list_segments(self) -> List[datetime]:
+        """Months that have an archived segment, oldest first."""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        months = []
+        for name in os.listdir(self.archive_dir):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def segments_for_range(self, start: datetime, end: datetime) -> List[datetime]:
+        """Archived months overlapping [start, end)."""
+        return [m for m in self.list_segments() if m < end and next_month(m) > start]
+
+    def write_segment(self, month: datetime, chunks: Iterable[List[Tuple]]) -> int:
+        """Write (or merge into) the segment for a month; returns the number of rows written.
+
+        Rows are tuples ordered as SEGMENT_COLUMNS and arrive in chunks; each chunk is
+        stored as its own set of column arrays as soon as it is read, so memory stays bounded
+        by one chunk plus the segment's SegmentSummary, which is written last. Existing segment
+        rows with the same id as a new row are replaced, so re-running an interrupted archive
+        pass is safe. Nothing is written for zero rows.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = self.segment_path(month)
+        tmp_path = f"{path}.tmp"
+        existing_ids = self.load_segment(month, ("id",))["id"] if os.path.exists(path) else None
+        superseded = np.zeros(len(existing_ids), dtype=bool) if existing_ids is not None else None
+
+        summary = SegmentSummary()
+        written = 0
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as segment:
+            for part, rows in enumerate(chunk for chunk in chunks if chunk):
+                columns = self._to_columns(rows)
+                if existing_ids is not None:
+                    superseded |= np.isin(existing_ids, columns["id"])
+                self._write_part(segment, part, columns)
+                summary.add(columns)
+                written += len(rows)
+            if written and existing_ids is not None:
+                self._copy_kept_parts(month, segment, summary, written_parts=part + 1, keep=~superseded)
+            if written:
+                for name, values in summary.to_arrays().items():
+                    _write_member(segment, name, values)
+
+        if not written:
+            os.remove(tmp_path)
+            return 0
+        os.replace(tmp_path, path)
+        return written
+
+    def _copy_kept_parts(self, month: datetime, segment: zipfile.ZipFile, summary: SegmentSummary,
+                         written_parts: int, keep: np.ndarray):
+        """Helper method to append the existing segment's rows that were not replaced."""
+        offset = 0
+        with np.load(self.segment_path(month)) as existing:
+            for index, part in enumerate(_part_keys(existing.files, "id")):
+                size = len(existing[part])
+                part_keep = keep[offset:offset + size]
+                offset += size
+                if part_keep.any():
+                    suffix = part[len("id"):]
+                    columns = {name: existing[name + suffix][part_keep] for name in SEGMENT_COLUMNS}
+                    self._write_part(segment, written_parts + index, columns)
+                    summary.add(columns)
+
+    @staticmethod
+    def _write_part(segment: zipfile.ZipFile, part: int, columns: Dict[str, np.ndarray]):
+        for name in SEGMENT_COLUMNS:
+            _write_member(segment, f"{name}.{part}", columns[name])
+
+    def load_segment(self, month: datetime, columns: Tuple[str, ...] = SEGMENT_COLUMNS) -> Dict[str, np.ndarray]:
+        """Load selected columns of a segment; other columns are never decompressed."""
+        with np.load(self.segment_path(month)) as segment:
+            return {
+                name: np.concatenate([segment[key] for key in _part_keys(segment.files, name)])
+                for name in columns
+            }
+
+    def get_summary(self, month: datetime) -> SegmentSummary:
+        """The segment's aggregates; segments written before summaries existed are summarised once per process."""
+        path = self.segment_path(month)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with _summary_cache_lock:
+            cached = _summary_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        with np.load(path) as segment:
+            if "summary.severity.key" in segment.files:
+                summary = SegmentSummary.from_arrays(segment)
+            else:
+                summary = SegmentSummary()
+                for part in _part_keys(segment.files, "id"):
+                    suffix = part[len("id"):]
+                    summary.add({name: segment[name + suffix] for name in SEGMENT_COLUMNS})
+        with _summary_cache_lock:
+            _summary_cache[path] = (signature, summary)
+        return summary
+
+    def _summaries(self) -> Iterator[SegmentSummary]:
+        for month in self.list_segments():
+            yield self.get_summary(month)
+
+    def _scan(self, columns: Tuple[str, ...], month: datetime, start: datetime = None,
+              end: datetime = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Helper method to yield the selected columns of one segment, part by part, limited to [start, end)."""
+        needed = tuple(columns) + (("delivered_at",) if "delivered_at" not in columns else ())
+        with np.load(self.segment_path(month)) as segment:
+            for part in _part_keys(segment.files, "id"):
+                suffix = part[len("id"):]
+                values = {name: segment[name + suffix] for name in needed}
+                mask = np.ones(len(values["delivered_at"]), dtype=bool)
+                if start:
+                    mask &= values["delivered_at"] >= np.datetime64(start, "us")
+                if end:
+                    mask &= values["delivered_at"] < np.datetime64(end, "us")
+                yield {name: array[mask] for name, array in values.items()}
+
+    def get_delivery_totals(self) -> Tuple[int, int]:
+        """Archived (delivered, read) counts."""
+        delivered = read = 0
+        for summary in self._summaries():
+            for counts in summary.severity.values():
+                delivered += counts[0]
+                read += counts[1]
+        return delivered, read
+
+    def get_severity_counts(self) -> Dict[str, List[int]]:
+        """Archived [delivered, read] counts per severity value."""
+        counts: Dict[str, List[int]] = {}
+        for summary in self._summaries():
+            for severity, entry in summary.severity.items():
+                _add_counts(counts.setdefault(severity, [0, 0]), entry)
+        return counts
+
+    def get_alert_summary(self, alert_id) -> dict:
+        """Archived delivery metrics of one alert: counts, users reached, seconds to read and delivery span."""
+        result = {"delivered": 0, "read": 0, "users": set(), "read_seconds": 0.0,
+                  "fastest_read_seconds": None, "slowest_read_seconds": None,
+                  "first_delivered": None, "last_delivered": None}
+        entry = [0, 0, 0.0, None, None]
+        first = last = None
+        for summary in self._summaries():
+            alert = summary.alerts.get(str(alert_id))
+            if alert is None:
+                continue
+            _merge_read_stats(entry, tuple(alert[:5]))
+            first = alert[5] if first is None else min(first, alert[5])
+            last = alert[6] if last is None else max(last, alert[6])
+            result["users"] |= summary.alert_users.get(str(alert_id), set())
+        result.update(delivered=entry[0], read=entry[1], read_seconds=entry[2],
+                      fastest_read_seconds=entry[3], slowest_read_seconds=entry[4])
+        if first is not None:
+            result["first_delivered"] = np.datetime64(first, "us").item()
+            result["last_delivered"] = np.datetime64(last, "us").item()
+        return result
+
+    def get_user_delivery_counts(self) -> Dict[str, List[int]]:
+        """Archived [delivered, read] counts per user id."""
+        counts: Dict[str, List[int]] = {}
+        for summary in self._summaries():
+            for user_id, entry in summary.users.items():
+                _add_counts(counts.setdefault(user_id, [0, 0]), entry)
+        return counts
+
+    def get_team_delivery_stats(self, start: datetime = None, end: datetime = None, team_id: str = None) -> Dict[str, dict]:
+        """Archived per-team users reached, delivered/read counts and total seconds to read.
+
+        Months wholly inside the window are read from their summaries; only a month the
+        window cuts through is scanned. Teams are those the users belonged to when their
+        deliveries were archived.
+        """
+        stats: Dict[str, dict] = {}
+
+        def entry_for(team: str) -> dict:
+            return stats.setdefault(team, {"users": set(), "delivered": 0, "read": 0, "read_seconds": 0.0})
+
+        for month in self.segments_for_range(start or datetime.min, end or datetime.max):
+            if (start is None or start <= month) and (end is None or next_month(month) <= end):
+                summary = self.get_summary(month)
+                teams = [str(team_id)] if team_id else list(summary.teams)
+                for team in teams:
+                    if team in summary.teams:
+                        delivered, read, read_seconds = summary.teams[team][:3]
+                        entry = entry_for(team)
+                        entry["users"] |= summary.team_users.get(team, set())
+                        entry["delivered"] += delivered
+                        entry["read"] += read
+                        entry["read_seconds"] += read_seconds
+                continue
+            for segment in self._scan(("team_id", "user_id", "delivered_at", "read_at"), month, start, end):
+                mask = segment["team_id"] != ""
+                if team_id:
+                    mask &= segment["team_id"] == str(team_id)
+                for team in np.unique(segment["team_id"][mask]):
+                    team_mask = mask & (segment["team_id"] == team)
+                    read_at = segment["read_at"][team_mask]
+                    is_read = ~np.isnat(read_at)
+                    seconds = (read_at[is_read] - segment["delivered_at"][team_mask][is_read]) / np.timedelta64(1, "s")
+                    entry = entry_for(str(team))
+                    entry["users"].update(segment["user_id"][team_mask].tolist())
+                    entry["delivered"] += int(team_mask.sum())
+                    entry["read"] += int(is_read.sum())
+                    entry["read_seconds"] += float(seconds.sum())
+        return stats
+
+    def get_delivery_trend(self, start: datetime, end: datetime, granularity: str = "day",
+                           severity: str = None, team_id: str = None, group_by: str = None):
+        """Archived counterpart of DeliveryRepository.get_delivery_trend.
+
+        Only segments overlapping the range are opened. Returns
+        (bucket_start, dimension, delivered, read) rows.
+        """
+        needed = ["delivered_at", "read_at"]
+        if severity or group_by == "severity":
+            needed.append("severity")
+        if team_id or group_by == "team":
+            needed.append("team_id")
+
+        counts: Dict[Tuple, List[int]] = {}
+        start64 = np.datetime64(start, "us")
+        end64 = np.datetime64(end, "us")
+        for month in self.segments_for_range(start, end):
+            segment = self.load_segment(month, tuple(needed))
+            delivered_at = segment["delivered_at"]
+            mask = (delivered_at >= start64) & (delivered_at < end64)
+            if severity:
+                mask &= segment["severity"] == severity
+            if team_id:
+                mask &= segment["team_id"] == str(team_id)
+            if not mask.any():
+                continue
+
+            buckets = self._truncate(delivered_at[mask], granularity)
+            is_read = ~np.isnat(segment["read_at"][mask])
+            dimensions = segment[group_by if group_by == "severity" else "team_id"][mask] if group_by else None
+
+            keys = buckets if dimensions is None else np.rec.fromarrays([buckets, dimensions])
+            unique, inverse = np.unique(keys, return_inverse=True)
+            delivered = np.bincount(inverse)
+            read = np.bincount(inverse, weights=is_read)
+            for key, delivered_count, read_count in zip(unique, delivered, read):
+                bucket, dimension = (key, None) if dimensions is None else (key[0], key[1] or None)
+                entry = counts.setdefault((bucket.astype("datetime64[us]").item(), dimension), [0, 0])
+                entry[0] += int(delivered_count)
+                entry[1] += int(read_count)
+
+        return [(bucket, dimension, c[0], c[1]) for (bucket, dimension), c in counts.items()]
+
+    @staticmethod
+    def _truncate(values: np.ndarray, granularity: str) -> np.ndarray:
+        if granularity == "hour":
+            return values.astype("datetime64[h]")
+        days = values.astype("datetime64[D]")
+        if granularity == "week":
+            # 1970-01-01 was a Thursday; shift so weeks start on Monday
+            return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+        return days
+
+    @staticmethod
+    def _to_columns(rows: List[Tuple]) -> Dict[str, np.ndarray]:
+        fields = list(zip(*rows)) if rows else [()] * len(SEGMENT_COLUMNS)
+        data = dict(zip(SEGMENT_COLUMNS, fields))
+        return {
+            "id": np.array([str(v) for v in data["id"]], dtype="U36"),
+            "alert_id": np.array([str(v) for v in data["alert_id"]], dtype="U36"),
+            "user_id": np.array([str(v) for v in data["user_id"]], dtype="U36"),
+            "channel": np.array(data["channel"], dtype="U16"),
+            "delivered_at": np.array(data["delivered_at"], dtype="datetime64[us]"),
+            "read_at": np.array(data["read_at"], dtype="datetime64[us]"),
+            "severity": np.array([getattr(v, "value", v) or "" for v in data["severity"]], dtype="U16"),
+            "team_id": np.array([str(v) if v else "" for v in data["team_id"]], dtype="U36"),
+        }
@@ -1,23 +1,120 @@
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
+from app.db.bulk import bulk_insert
+from app.db.functions import seconds_between, date_trunc, as_datetime
+from app.models.alert import Alert, Severity
 from app.models.notification_delivery import NotificationDelivery
+from app.models.notification_outbox import NotificationOutbox, OutboxStatus
+from app.models.team import Team
+from app.models.user import User
 
 class DeliveryRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_delivery(self, alert_id: str, user_id: str, channel: str = "in_app") -> NotificationDelivery:
+    def create_delivery(self, alert_id: str, user_id: str, channel: str = "in_app",
+                        outbox_channels: List[str] = None, priority: int = 2,
+                        digest_send_at: Dict[str, datetime] = None) -> NotificationDelivery:
+        """Log a delivery; with ``outbox_channels``, queue one outbox entry per channel in the same transaction.
+
+        Channels in ``digest_send_at`` are held for the user's digest: the new entry and the
+        user's already-held entries on that channel are all scheduled for the given time.
+        """
+        digest_send_at = digest_send_at or {}
         delivery = NotificationDelivery(
+            id=uuid.uuid4(),
             alert_id=alert_id,
             user_id=user_id,
             channel=channel,
             delivered_at=datetime.utcnow()
         )
         self.db.add(delivery)
+        for outbox_channel in outbox_channels or []:
+            send_at = digest_send_at.get(outbox_channel)
+            if send_at:
+                self._reschedule_digests({(user_id, outbox_channel): send_at})
+            self.db.add(NotificationOutbox(
+                delivery_id=delivery.id,
+                alert_id=alert_id,
+                user_id=user_id,
+                channel=outbox_channel,
+                priority=priority,
+                digest=send_at is not None,
+                next_attempt_at=send_at or delivery.delivered_at
+            ))
         self.db.commit()
         self.db.refresh(delivery)
         return delivery
 
+    def create_deliveries_bulk(self, rows: Iterable[Tuple], return_ids: bool = False, queue_outbox: bool = False,
+                               priority: int = 2, digest_send_at: Dict[Tuple, datetime] = None,
+                               commit: bool = True) -> Optional[List[uuid.UUID]]:
+        """Log many deliveries in one statement (COPY or multi-row INSERT on PostgreSQL).
+
+        ``rows`` are (alert_id, user_id, channel, delivered_at) tuples; ids are generated
+        client-side and returned only when ``return_ids`` is set. With ``queue_outbox``,
+        each delivery also gets an outbox entry on its channel in the same transaction;
+        pairs in ``digest_send_at`` (keyed by (user_id, channel)) are held for that user's
+        digest, and the user's already-held entries move to the same send time.
+        """
+        digest_send_at = digest_send_at or {}
+        deliveries, outbox = [], []
+        for alert_id, user_id, channel, delivered_at in rows:
+            delivery_id = uuid.uuid4()
+            deliveries.append({
+                "id": delivery_id, "alert_id": alert_id, "user_id": user_id,
+                "channel": channel, "delivered_at": delivered_at, "read_at": None
+            })
+            if queue_outbox:
+                send_at = digest_send_at.get((user_id, channel))
+                outbox.append({
+                    "id": uuid.uuid4(), "delivery_id": delivery_id, "alert_id": alert_id, "user_id": user_id,
+                    "channel": channel, "priority": priority, "digest": send_at is not None,
+                    "status": OutboxStatus.PENDING, "attempts": 0, "next_attempt_at": send_at or delivered_at,
+                    "last_error": None, "created_at": delivered_at, "sent_at": None
+                })
+
+        self._reschedule_digests(digest_send_at)
+        bulk_insert(self.db, NotificationDelivery, deliveries)
+        bulk_insert(self.db, NotificationOutbox, outbox)
+        if commit:
+            self.db.commit()
+        return [row["id"] for row in deliveries] if return_ids else None
+
+    def get_digest_held_since(self, user_ids: List[str], channel: str) -> Dict[str, datetime]:
+        """Oldest still-held digest entry on a channel per user."""
+        if not user_ids:
+            return {}
+        rows = self.db.query(NotificationOutbox.user_id, func.min(NotificationOutbox.created_at)).filter(
+            NotificationOutbox.user_id.in_(user_ids),
+            NotificationOutbox.channel == channel,
+            NotificationOutbox.digest == True,
+            NotificationOutbox.status == OutboxStatus.PENDING,
+            NotificationOutbox.attempts == 0
+        ).group_by(NotificationOutbox.user_id).all()
+        return dict(rows)
+
+    def _reschedule_digests(self, digest_send_at: Dict[Tuple, datetime]):
+        """Helper method to move users' held digest entries to their new send times.
+
+        Users sharing a send time on a channel are moved with one UPDATE.
+        """
+        by_time: Dict[Tuple, List] = {}
+        for (user_id, channel), send_at in digest_send_at.items():
+            by_time.setdefault((channel, send_at), []).append(user_id)
+        for (channel, send_at), user_ids in by_time.items():
+            self.db.query(NotificationOutbox).filter(
+                NotificationOutbox.user_id.in_(user_ids),
+                NotificationOutbox.channel == channel,
+                NotificationOutbox.digest == True,
+                NotificationOutbox.status == OutboxStatus.PENDING,
+                NotificationOutbox.attempts == 0
+            ).update({NotificationOutbox.next_attempt_at: send_at}, synchronize_session=False)
+
     def mark_read(self, delivery_id: str):
         delivery = self.db.query(NotificationDelivery).filter(NotificationDelivery.id == delivery_id).first()
         if delivery:
@@ -35,6 +132,19 @@ class DeliveryRepository:
     def get_alert_deliveries(self, alert_id: str):
         return self.db.query(NotificationDelivery).filter(NotificationDelivery.alert_id == alert_id).all()
 
+    def get_user_deliveries_for_alerts(self, user_id, alert_ids) -> Dict:
+        """One user's deliveries of the given alerts, grouped by alert id."""
+        grouped = {alert_id: [] for alert_id in alert_ids}
+        if not grouped:
+            return grouped
+        deliveries = self.db.query(NotificationDelivery).filter(
+            NotificationDelivery.user_id == user_id,
+            NotificationDelivery.alert_id.in_(list(grouped))
+        ).all()
+        for delivery in deliveries:
+            grouped[delivery.alert_id].append(delivery)
+        return grouped
+
     def get_unread_deliveries(self, user_id: str):
         return self.db.query(NotificationDelivery).filter(
             NotificationDelivery.user_id == user_id,
@@ -43,3 +153,174 @@ class DeliveryRepository:
     
     def get_all_deliveries(self):
         return self.db.query(NotificationDelivery).all()
+
+    def get_user_delivery_counts(self):
+        """Aggregate delivered/read counts per user in a single grouped query."""
+        return self.db.query(
+            NotificationDelivery.user_id,
+            func.count(NotificationDelivery.id),
+            func.count(NotificationDelivery.read_at)
+        ).group_by(NotificationDelivery.user_id).all()
+
+    def get_team_delivery_stats(self, start: datetime = None, end: datetime = None, team_id: str = None):
+        """Grouped delivery metrics per team, optionally limited to a delivered_at window.
+
+        Returns (team_id, team_name, users_reached, delivered, read, avg_seconds_to_read)
+        rows; teams without deliveries in the window are included with zero counts.
+        """
+        delivery_join = [NotificationDelivery.user_id == User.id]
+        if start:
+            delivery_join.append(NotificationDelivery.delivered_at >= start)
+        if end:
+            delivery_join.append(NotificationDelivery.delivered_at < end)
+
+        query = self.db.query(
+            Team.id,
+            Team.name,
+            func.count(func.distinct(NotificationDelivery.user_id)),
+            func.count(NotificationDelivery.id),
+            func.count(NotificationDelivery.read_at),
+            func.avg(seconds_between(self.db, NotificationDelivery.delivered_at, NotificationDelivery.read_at))
+        ).outerjoin(User, User.team_id == Team.id) \
+         .outerjoin(NotificationDelivery, and_(*delivery_join))
+
+        if team_id:
+            query = query.filter(Team.id == team_id)
+        return query.group_by(Team.id, Team.name).order_by(Team.name).all()
+
+    def get_team_delivery_users(self, start: datetime = None, end: datetime = None, team_id: str = None):
+        """Distinct (team_id, user_id) pairs with a delivery in the window."""
+        query = self.db.query(User.team_id, NotificationDelivery.user_id) \
+            .join(User, NotificationDelivery.user_id == User.id) \
+            .filter(User.team_id.isnot(None))
+        if start:
+            query = query.filter(NotificationDelivery.delivered_at >= start)
+        if end:
+            query = query.filter(NotificationDelivery.delivered_at < end)
+        if team_id:
+            query = query.filter(User.team_id == team_id)
+        return query.distinct().all()
+
+    def get_delivery_trend(self, start: datetime, end: datetime, granularity: str = "day",
+                           severity: Severity = None, team_id: str = None, group_by: str = None):
+        """Delivered/read counts per time bucket in one bounded GROUP BY query.
+
+        Returns (bucket_start, dimension, delivered, read) rows; ``dimension`` is the
+        alert severity or user team id when ``group_by`` is set, otherwise None.
+        """
+        bucket = date_trunc(self.db, granularity, NotificationDelivery.delivered_at).label("bucket")
+        dimension = None
+        if group_by == "severity":
+            dimension = Alert.severity
+        elif group_by == "team":
+            dimension = User.team_id
+
+        columns = [bucket, func.count(NotificationDelivery.id), func.count(NotificationDelivery.read_at)]
+        if dimension is not None:
+            columns.insert(1, dimension)
+        query = self.db.query(*columns).filter(
+            NotificationDelivery.delivered_at >= start,
+            NotificationDelivery.delivered_at < end
+        )
+
+        if severity or group_by == "severity":
+            query = query.join(Alert, Alert.id == NotificationDelivery.alert_id)
+            if severity:
+                query = query.filter(Alert.severity == severity)
+        if team_id or group_by == "team":
+            query = query.join(User, User.id == NotificationDelivery.user_id)
+            if team_id:
+                query = query.filter(User.team_id == team_id)
+
+        group_columns = [bucket] if dimension is None else [bucket, dimension]
+        rows = query.group_by(*group_columns).all()
+        if dimension is None:
+            return [(as_datetime(row[0]), None, row[1], row[2]) for row in rows]
+        return [(as_datetime(row[0]), row[1], row[2], row[3]) for row in rows]
+
+    def get_oldest_delivered_at(self):
+        return self.db.query(func.min(NotificationDelivery.delivered_at)).scalar()
+
+    def get_deliveries_for_archive(self, start: datetime, end: datetime, batch_size: int = 50000):
+        """Stream deliveries in [start, end) with their alert severity and user team denormalized."""
+        return self.db.query(
+            NotificationDelivery.id,
+            NotificationDelivery.alert_id,
+            NotificationDelivery.user_id,
+            NotificationDelivery.channel,
+            NotificationDelivery.delivered_at,
+            NotificationDelivery.read_at,
+            Alert.severity,
+            User.team_id
+        ).outerjoin(Alert, Alert.id == NotificationDelivery.alert_id) \
+         .outerjoin(User, User.id == NotificationDelivery.user_id) \
+         .filter(
+            NotificationDelivery.delivered_at >= start,
+            NotificationDelivery.delivered_at < end
+        ).yield_per(batch_size)
+
+    def delete_deliveries_between(self, start: datetime, end: datetime) -> int:
+        deleted = self.db.query(NotificationDelivery).filter(
+            NotificationDelivery.delivered_at >= start,
+            NotificationDelivery.delivered_at < end
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+    def get_delivery_summary(self, delivered_since: datetime):
+        """Single scan of deliveries: (total, read, delivered_since) counts."""
+        return self.db.query(
+            func.count(NotificationDelivery.id),
+            func.count(NotificationDelivery.read_at),
+            func.count(NotificationDelivery.id).filter(NotificationDelivery.delivered_at >= delivered_since)
+        ).one()
+
+class AsyncDeliveryRepository:
+    """AsyncSession reads and read-marking used by the async user routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_deliveries(self, user_id):
+        return (await self.db.scalars(
+            select(NotificationDelivery).where(NotificationDelivery.user_id == user_id)
+        )).all()
+
+    async def get_unread_deliveries(self, user_id):
+        return (await self.db.scalars(
+            select(NotificationDelivery).where(NotificationDelivery.user_id == user_id,
+                                               NotificationDelivery.read_at == None)
+        )).all()
+
+    async def get_user_deliveries_for_alerts(self, user_id, alert_ids) -> Dict:
+        """One user's deliveries of the given alerts, grouped by alert id."""
+        grouped = {alert_id: [] for alert_id in alert_ids}
+        if not grouped:
+            return grouped
+        deliveries = await self.db.scalars(select(NotificationDelivery).where(
+            NotificationDelivery.user_id == user_id,
+            NotificationDelivery.alert_id.in_(list(grouped))
+        ))
+        for delivery in deliveries:
+            grouped[delivery.alert_id].append(delivery)
+        return grouped
+
+    async def mark_read(self, delivery_id):
+        delivery = await self.db.get(NotificationDelivery, delivery_id)
+        if delivery:
+            delivery.read_at = datetime.utcnow()
+            await self.db.commit()
+        return delivery
+
+    async def mark_latest_read(self, user_id, alert_id):
+        """Mark the user's most recent delivery of the alert as read, if it is unread."""
+        latest = (await self.db.scalars(
+            select(NotificationDelivery)
+            .where(NotificationDelivery.user_id == user_id, NotificationDelivery.alert_id == alert_id)
+            .order_by(NotificationDelivery.delivered_at.desc())
+            .limit(1)
+        )).first()
+        if latest and not latest.read_at:
+            latest.read_at = datetime.utcnow()
+            await self.db.commit()
+        return latest
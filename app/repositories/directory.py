@@ -0,0 +1,172 @@
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from app.core.settings import settings
+from app.models.team import Team
+from app.models.user import User
+
+class DirectoryUser:
+    """Read-only user record with the fields sweeps and channels use, without ORM state."""
+
+    __slots__ = ("id", "name", "team_id")
+
+    def __init__(self, id: uuid.UUID, name: str, team_id: Optional[uuid.UUID]):
+        self.id = id
+        self.name = name
+        self.team_id = team_id
+
+    def __repr__(self) -> str:
+        return f"DirectoryUser(id={self.id}, name={self.name!r}, team_id={self.team_id})"
+
+def _as_uuid(value) -> Optional[uuid.UUID]:
+    """Helper method to parse an id that may be a UUID or a string; None if it is neither."""
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+class UserDirectory:
+    """Process-wide snapshot of users and teams for sweeps and audience resolution.
+
+    Loaded with one column-only query per table, then kept current by the user and team
+    repositories, which apply each committed write. ``version`` increases on every change
+    or reload. ``max_age_seconds`` (0 for none) forces a full reload so writes made by
+    other processes are picked up.
+    """
+
+    def __init__(self, max_age_seconds: float = 0):
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._users: Dict[uuid.UUID, DirectoryUser] = {}
+        self._team_members: Dict[uuid.UUID, Dict[uuid.UUID, DirectoryUser]] = {}
+        self._team_names: Dict[uuid.UUID, str] = {}
+        self._loaded_monotonic: Optional[float] = None
+        self._version = 0
+        self.reloads = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def needs_load(self) -> bool:
+        """True if the directory has never been loaded or is older than max_age_seconds."""
+        return self._loaded_monotonic is None or bool(
+            self.max_age_seconds and time.monotonic() - self._loaded_monotonic >= self.max_age_seconds)
+
+    def ensure_loaded(self, db: Session):
+        """Load the directory if needs_load()."""
+        with self._lock:
+            if self.needs_load():
+                self._load(db)
+
+    def reload(self, db: Session):
+        with self._lock:
+            self._load(db)
+
+    def _load(self, db: Session):
+        """Helper method to rebuild every index; runs under the lock so concurrent writes apply after it."""
+        self._users = {}
+        self._team_members = {}
+        for user_id, name, team_id in db.query(User.id, User.name, User.team_id):
+            self._index_user(DirectoryUser(user_id, name, team_id))
+        self._team_names = {team_id: name for team_id, name in db.query(Team.id, Team.name)}
+        self._loaded_monotonic = time.monotonic()
+        self._version += 1
+        self.reloads += 1
+
+    def _index_user(self, user: DirectoryUser):
+        self._users[user.id] = user
+        if user.team_id is not None:
+            self._team_members.setdefault(user.team_id, {})[user.id] = user
+
+    def _unindex_user(self, user_id: uuid.UUID):
+        user = self._users.pop(user_id, None)
+        if user is not None and user.team_id is not None:
+            members = self._team_members.get(user.team_id)
+            if members is not None:
+                members.pop(user_id, None)
+                if not members:
+                    del self._team_members[user.team_id]
+
+    # Reads
+
+    def users(self) -> List[DirectoryUser]:
+        with self._lock:
+            return list(self._users.values())
+
+    def get_user(self, user_id) -> Optional[DirectoryUser]:
+        return self._users.get(_as_uuid(user_id))
+
+    def get_users(self, user_ids: Iterable) -> List[DirectoryUser]:
+        with self._lock:
+            found = (self._users.get(_as_uuid(user_id)) for user_id in user_ids)
+            return [user for user in found if user is not None]
+
+    def get_team_members(self, team_id) -> List[DirectoryUser]:
+        with self._lock:
+            return list(self._team_members.get(_as_uuid(team_id), {}).values())
+
+    def get_team_name(self, team_id) -> Optional[str]:
+        return self._team_names.get(_as_uuid(team_id))
+
+    def resolve_audience(self, visibility: Optional[dict]) -> List[DirectoryUser]:
+        """Users an alert with this visibility reaches; same rules as get_users_for_alert."""
+        if not visibility or visibility.get("org", True):
+            return self.users()
+        audience: Dict[uuid.UUID, DirectoryUser] = {}
+        with self._lock:
+            for team_id in visibility.get("teams", []):
+                audience.update(self._team_members.get(_as_uuid(team_id), {}))
+            for user_id in visibility.get("users", []):
+                user = self._users.get(_as_uuid(user_id))
+                if user is not None:
+                    audience[user.id] = user
+        return list(audience.values())
+
+    # Incremental updates, called by the repositories after a successful commit
+
+    def put_user(self, user_id, name: str, team_id=None):
+        with self._lock:
+            if self._loaded_monotonic is None:
+                return
+            self._unindex_user(_as_uuid(user_id))
+            self._index_user(DirectoryUser(_as_uuid(user_id), name, _as_uuid(team_id)))
+            self._version += 1
+
+    def remove_user(self, user_id):
+        with self._lock:
+            if self._loaded_monotonic is None:
+                return
+            self._unindex_user(_as_uuid(user_id))
+            self._version += 1
+
+    def put_team(self, team_id, name: str):
+        with self._lock:
+            if self._loaded_monotonic is None:
+                return
+            self._team_names[_as_uuid(team_id)] = name
+            self._version += 1
+
+    def remove_team(self, team_id):
+        with self._lock:
+            if self._loaded_monotonic is None:
+                return
+            self._team_names.pop(_as_uuid(team_id), None)
+            self._version += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self._loaded_monotonic is not None,
+                "users": len(self._users),
+                "teams": len(self._team_names),
+                "version": self._version,
+                "reloads": self.reloads
+            }
+
+# Global user directory instance
+user_directory = UserDirectory(settings.USER_DIRECTORY_MAX_AGE_SECONDS)
@@ -0,0 +1,83 @@
+from collections import namedtuple
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from app.models.notification_outbox import NotificationOutbox, OutboxStatus
+
+# Detached snapshot of a claimed row, safe to hand to worker threads
+ClaimedEntry = namedtuple("ClaimedEntry", ["id", "alert_id", "user_id", "attempts", "priority", "digest"])
+
+class OutboxRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def claim_due(self, channel: str, limit: int, lease_seconds: int = 300) -> List[ClaimedEntry]:
+        """Claim due entries for a channel, most urgent severity first.
+
+        Claimed rows are leased by pushing next_attempt_at forward, so concurrent workers
+        skip them and a crashed worker's rows become due again once the lease expires.
+        """
+        now = datetime.utcnow()
+        entries = self.db.query(NotificationOutbox).filter(
+            NotificationOutbox.channel == channel,
+            NotificationOutbox.status == OutboxStatus.PENDING,
+            NotificationOutbox.next_attempt_at <= now
+        ).order_by(NotificationOutbox.priority, NotificationOutbox.next_attempt_at) \
+         .limit(limit) \
+         .with_for_update(skip_locked=True) \
+         .all()
+
+        claimed = []
+        for entry in entries:
+            entry.attempts += 1
+            entry.next_attempt_at = now + timedelta(seconds=lease_seconds)
+            claimed.append(ClaimedEntry(entry.id, entry.alert_id, entry.user_id, entry.attempts, entry.priority,
+                                        entry.digest))
+        self.db.commit()
+        return claimed
+
+    def apply_outcomes(self, outcomes: List[Dict[str, Any]]):
+        """Bulk-update claimed entries by id.
+
+        Each outcome carries ``id`` plus the columns to set (status, last_error,
+        sent_at or next_attempt_at).
+        """
+        if outcomes:
+            self.db.execute(update(NotificationOutbox), outcomes)
+
+    def commit(self):
+        self.db.commit()
+
+    def get_status_counts(self):
+        """(channel, status, count) rows across the outbox."""
+        return self.db.query(
+            NotificationOutbox.channel,
+            NotificationOutbox.status,
+            func.count(NotificationOutbox.id)
+        ).group_by(NotificationOutbox.channel, NotificationOutbox.status).all()
+
+    def get_dead_entries(self, limit: int = 100):
+        return self.db.query(NotificationOutbox).filter(
+            NotificationOutbox.status == OutboxStatus.DEAD
+        ).order_by(NotificationOutbox.created_at.desc()).limit(limit).all()
+
+    def requeue(self, entry_id: str):
+        """Move a dead-lettered entry back to pending with a fresh retry budget."""
+        entry = self.db.query(NotificationOutbox).filter(NotificationOutbox.id == entry_id).first()
+        if entry:
+            entry.status = OutboxStatus.PENDING
+            entry.attempts = 0
+            entry.next_attempt_at = datetime.utcnow()
+            self.db.commit()
+            self.db.refresh(entry)
+        return entry
+
+    def purge_finished(self, before: datetime) -> int:
+        """Delete sent/skipped entries older than ``before``."""
+        deleted = self.db.query(NotificationOutbox).filter(
+            NotificationOutbox.status.in_([OutboxStatus.SENT, OutboxStatus.SKIPPED]),
+            NotificationOutbox.created_at < before
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
@@ -1,5 +1,8 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, date
+from app.models.user import User
 from app.models.user_alert_pref import UserAlertPreference
 
 class UserPreferenceRepository:
@@ -84,3 +87,102 @@ class UserPreferenceRepository:
     
     def get_all_preferences(self):
         return self.db.query(UserAlertPreference).all()
+
+    def get_preferences_for_alerts(self, alert_ids, user_id=None):
+        """Preferences for the given alerts keyed by (alert_id, user_id), optionally for one user."""
+        if not alert_ids:
+            return {}
+        query = self.db.query(UserAlertPreference).filter(UserAlertPreference.alert_id.in_(alert_ids))
+        if user_id is not None:
+            query = query.filter(UserAlertPreference.user_id == user_id)
+        prefs = query.all()
+        return {(pref.alert_id, pref.user_id): pref for pref in prefs}
+
+    def set_last_delivered(self, alert_id: str, user_ids, existing: dict = None, delivered_at: datetime = None):
+        """Set last_delivered_at for many users of one alert in a single commit.
+
+        ``existing`` is a get_preferences_for_alerts() result; users without an entry get a new preference.
+        """
+        delivered_at = delivered_at or datetime.utcnow()
+        existing = existing if existing is not None else self.get_preferences_for_alerts([alert_id])
+        for user_id in user_ids:
+            pref = existing.get((alert_id, user_id))
+            if pref:
+                pref.last_delivered_at = delivered_at
+            else:
+                pref = UserAlertPreference(user_id=user_id, alert_id=alert_id, last_delivered_at=delivered_at)
+                self.db.add(pref)
+                existing[(alert_id, user_id)] = pref
+        self.db.commit()
+
+    def get_team_snooze_counts(self, start_date: date = None, end_date: date = None, team_id: str = None):
+        """Grouped (team_id, tracked_pairs, snoozed_pairs) rows, snoozes limited to [start_date, end_date)."""
+        snoozed = UserAlertPreference.snoozed_date != None
+        if start_date:
+            snoozed = snoozed & (UserAlertPreference.snoozed_date >= start_date)
+        if end_date:
+            snoozed = snoozed & (UserAlertPreference.snoozed_date < end_date)
+
+        query = self.db.query(
+            User.team_id,
+            func.count(UserAlertPreference.id),
+            func.count(UserAlertPreference.id).filter(snoozed)
+        ).join(User, User.id == UserAlertPreference.user_id).filter(User.team_id != None)
+
+        if team_id:
+            query = query.filter(User.team_id == team_id)
+        return query.group_by(User.team_id).all()
+
+    def get_snooze_counts_by_alert(self, today: date):
+        """Single scan of snoozed preferences: (alert_id, snoozes, snoozed_today) rows."""
+        return self.db.query(
+            UserAlertPreference.alert_id,
+            func.count(UserAlertPreference.id),
+            func.count(UserAlertPreference.id).filter(UserAlertPreference.snoozed_date == today)
+        ).filter(UserAlertPreference.snoozed_date != None) \
+         .group_by(UserAlertPreference.alert_id).all()
+
+class AsyncUserPreferenceRepository:
+    """AsyncSession reads and read/snooze writes used by the async user routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_pref(self, user_id, alert_id):
+        return (await self.db.scalars(
+            select(UserAlertPreference).filter_by(user_id=user_id, alert_id=alert_id).limit(1)
+        )).first()
+
+    async def get_preferences_for_alerts(self, alert_ids, user_id=None):
+        """Preferences for the given alerts keyed by (alert_id, user_id), optionally for one user."""
+        if not alert_ids:
+            return {}
+        query = select(UserAlertPreference).where(UserAlertPreference.alert_id.in_(alert_ids))
+        if user_id is not None:
+            query = query.where(UserAlertPreference.user_id == user_id)
+        return {(pref.alert_id, pref.user_id): pref for pref in await self.db.scalars(query)}
+
+    async def _get_or_add(self, user_id, alert_id) -> UserAlertPreference:
+        """Helper method to load a preference, adding a new one to the session if missing."""
+        pref = await self.get_user_pref(user_id, alert_id)
+        if not pref:
+            pref = UserAlertPreference(user_id=user_id, alert_id=alert_id)
+            self.db.add(pref)
+        return pref
+
+    async def snooze_alert_today(self, user_id, alert_id):
+        pref = await self._get_or_add(user_id, alert_id)
+        pref.snoozed_date = date.today()
+        await self.db.commit()
+        return pref
+
+    async def mark_as_read(self, user_id, alert_id):
+        pref = await self._get_or_add(user_id, alert_id)
+        pref.snoozed_date = None  # clear snooze
+        await self.db.commit()
+        return pref
+
+    async def mark_as_unread(self, user_id, alert_id):
+        pref = await self._get_or_add(user_id, alert_id)
+        await self.db.commit()
+        return pref
@@ -1,5 +1,8 @@
+from typing import Any, Dict, List
 from sqlalchemy.orm import Session
+from app.db.bulk import bulk_insert
 from app.models.team import Team
+from app.repositories.directory import user_directory
 
 class TeamRepository:
     def __init__(self, db: Session):
@@ -10,8 +13,20 @@ class TeamRepository:
         self.db.add(team)
         self.db.commit()
         self.db.refresh(team)
+        user_directory.put_team(team.id, team.name)
         return team
 
+    def create_teams_bulk(self, rows: List[Dict[str, Any]]):
+        """Insert many teams (rows carry id and name) in one transaction."""
+        bulk_insert(self.db, Team, rows)
+        self.db.commit()
+        for row in rows:
+            user_directory.put_team(row["id"], row["name"])
+
+    def get_team_ids_by_name(self) -> Dict[str, Any]:
+        """Every team's id keyed by name, from one column-only query."""
+        return {name: team_id for team_id, name in self.db.query(Team.id, Team.name)}
+
     def get_team_by_id(self, team_id: str):
         return self.db.query(Team).filter(Team.id == team_id).first()
 
@@ -26,11 +41,14 @@ class TeamRepository:
                     setattr(team, key, value)
             self.db.commit()
             self.db.refresh(team)
+            user_directory.put_team(team.id, team.name)
         return team
 
     def delete_team(self, team_id: str):
         team = self.get_team_by_id(team_id)
         if team:
+            deleted_id = team.id
             self.db.delete(team)
             self.db.commit()
+            user_directory.remove_team(deleted_id)
         return team
@@ -1,5 +1,21 @@
+from typing import Any, Dict, List
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.db.bulk import bulk_insert
+from app.db.replicas import is_replica_session
 from app.models.user import User
+from app.repositories.directory import UserDirectory, user_directory
+
+def load_directory_from_primary(reload: bool = False):
+    """Load the user directory, if it needs it (or always with ``reload``), through a fresh primary session."""
+    from app.db.session import SessionLocal
+    with SessionLocal() as primary:
+        if reload:
+            user_directory.reload(primary)
+        else:
+            user_directory.ensure_loaded(primary)
 
 class UserRepository:
     def __init__(self, db: Session):
@@ -10,17 +26,46 @@ class UserRepository:
         self.db.add(user)
         self.db.commit()
         self.db.refresh(user)
+        user_directory.put_user(user.id, user.name, user.team_id)
         return user
 
+    def create_users_bulk(self, rows: List[Dict[str, Any]]):
+        """Insert many users (rows carry id, name, team_id) in one transaction."""
+        bulk_insert(self.db, User, rows)
+        self.db.commit()
+        for row in rows:
+            user_directory.put_user(row["id"], row["name"], row["team_id"])
+
     def get_user_by_id(self, user_id: str):
         return self.db.query(User).filter(User.id == user_id).first()
 
     def get_user(self, user_id: str):
         return self.get_user_by_id(user_id)
 
+    def get_users_by_ids(self, user_ids):
+        return self.db.query(User).filter(User.id.in_(list(user_ids))).all()
+
+    def get_directory(self, reload: bool = False) -> UserDirectory:
+        """Process-wide user/team directory, loaded through this session when needed.
+
+        ``reload`` forces a fresh load, so writes made by other processes are seen now
+        rather than after the directory's max age.
+        """
+        if is_replica_session(self.db):
+            # Load from the primary so a lagging replica cannot undo writes already applied
+            load_directory_from_primary(reload)
+        elif reload:
+            user_directory.reload(self.db)
+        else:
+            user_directory.ensure_loaded(self.db)
+        return user_directory
+
     def get_all_users(self):
         return self.db.query(User).all()
 
+    def count_users(self) -> int:
+        return self.db.query(func.count(User.id)).scalar()
+
     def get_users_by_team(self, team_id: str):
         return self.db.query(User).filter(User.team_id == team_id).all()
 
@@ -32,11 +77,29 @@ class UserRepository:
                     setattr(user, key, value)
             self.db.commit()
             self.db.refresh(user)
+            user_directory.put_user(user.id, user.name, user.team_id)
         return user
 
     def delete_user(self, user_id: str):
         user = self.get_user_by_id(user_id)
         if user:
+            deleted_id = user.id
             self.db.delete(user)
             self.db.commit()
+            user_directory.remove_user(deleted_id)
         return user
+
+class AsyncUserRepository:
+    """AsyncSession reads used by the async user routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user(self, user_id):
+        return await self.db.get(User, user_id)
+
+    async def get_directory(self) -> UserDirectory:
+        """Process-wide user/team directory; a needed (re)load runs off the event loop."""
+        if user_directory.needs_load():
+            await run_in_threadpool(load_directory_from_primary)
+        return user_directory
@@ -44,7 +44,7 @@ class AlertService:
         
         for alert in alerts:
             # Apply filters
-            if severity and alert.severity.lower() != severity.lower():
+            if severity and alert.severity.value != severity.lower():
                 continue
                 
             # Status filter
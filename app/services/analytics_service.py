@@ -1,46 +1,50 @@
 # app/services/analytics_service.py
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, date, timezone
 from typing import Dict, List, Any
 from collections import defaultdict
+from app.models.alert import Severity
+from app.services.engagement_engine import EngagementEngine
 
 class AnalyticsService:
     """Service for generating analytics and metrics for the alerting platform."""
 
-    def __init__(self, alert_repo, delivery_repo, preference_repo, user_repo):
+    def __init__(self, alert_repo, delivery_repo, preference_repo, user_repo, archive_repo=None):
         self.alert_repo = alert_repo
         self.delivery_repo = delivery_repo
         self.preference_repo = preference_repo
         self.user_repo = user_repo
+        self.archive_repo = archive_repo
 
     def get_dashboard_analytics(self) -> Dict[str, Any]:
         """Get comprehensive dashboard analytics as specified in PRD."""
-        all_alerts = self.alert_repo.get_all_alerts()
-        all_deliveries = self.delivery_repo.get_all_deliveries()
-        all_users = self.user_repo.get_all_users()
-        
-        # Basic counts
-        total_alerts = len(all_alerts)
-        total_users = len(all_users)
-        active_alerts = len(self.alert_repo.get_active_alerts())
-        
+        now = datetime.utcnow()
+        recent_days = 7
+        recent_since = now - timedelta(days=recent_days)
+
+        # One aggregate pass per table; every section below is derived from these
+        alert_rows = self.alert_repo.get_alert_summary(now, recent_since)
+        total_delivered, total_read, recent_deliveries = self.delivery_repo.get_delivery_summary(recent_since)
+        snooze_rows = self.preference_repo.get_snooze_counts_by_alert(now.date())
+        total_users = self.user_repo.count_users()
+        if self._archive_overlaps():
+            archived_delivered, archived_read = self.archive_repo.get_delivery_totals()
+            total_delivered += archived_delivered
+            total_read += archived_read
+
+        # Basic counts and severity breakdown
+        severity_counts = {"Info": 0, "Warning": 0, "Critical": 0}
+        total_alerts = active_alerts = recent_alerts = 0
+        for severity, total, active, created_recently in alert_rows:
+            label = severity.value.title() if severity else "Info"
+            if label in severity_counts:
+                severity_counts[label] += total
+            total_alerts += total
+            active_alerts += active
+            recent_alerts += created_recently
+
         # Delivery metrics
-        total_delivered = len(all_deliveries)
-        total_read = len([d for d in all_deliveries if d.read_at is not None])
         read_rate = (total_read / total_delivered * 100) if total_delivered > 0 else 0
         
-        # Severity breakdown
-        severity_counts = {"Info": 0, "Warning": 0, "Critical": 0}
-        for alert in all_alerts:
-            severity = alert.severity.title() if alert.severity else "Info"
-            if severity in severity_counts:
-                severity_counts[severity] += 1
-        
-        # Snooze analytics
-        snooze_data = self._get_snooze_analytics()
-        
-        # Recent activity (last 7 days)
-        recent_activity = self._get_recent_activity(7)
-        
         return {
             "overview": {
                 "total_alerts_created": total_alerts,
@@ -51,9 +55,9 @@ class AnalyticsService:
                 "read_rate_percentage": round(read_rate, 2)
             },
             "severity_breakdown": severity_counts,
-            "snooze_metrics": snooze_data,
-            "recent_activity": recent_activity,
-            "generated_at": datetime.utcnow()
+            "snooze_metrics": self._get_snooze_analytics(snooze_rows),
+            "recent_activity": self._get_recent_activity(recent_days, recent_alerts, recent_deliveries),
+            "generated_at": now
         }
 
     def get_alert_analytics(self, alert_id: str) -> Dict[str, Any]:
@@ -63,11 +67,12 @@ class AnalyticsService:
             return None
             
         deliveries = self.delivery_repo.get_alert_deliveries(alert_id)
+        archived = self._get_archived_alert_summary(alert_id)
         
         # Calculate metrics
-        total_delivered = len(deliveries)
-        total_read = len([d for d in deliveries if d.read_at is not None])
-        unique_users = len(set(d.user_id for d in deliveries))
+        total_delivered = len(deliveries) + archived["delivered"]
+        total_read = len([d for d in deliveries if d.read_at is not None]) + archived["read"]
+        unique_users = len(set(str(d.user_id) for d in deliveries) | archived["users"])
         
         # Get snooze count for this alert
         snooze_count = self._get_alert_snooze_count(alert_id)
@@ -113,9 +118,18 @@ class AnalyticsService:
             if delivery.read_at:
                 time_to_read = (delivery.read_at - delivery.delivered_at).total_seconds() / 60  # minutes
                 read_times.append(time_to_read)
+
+        # Archived deliveries only contribute their aggregates
+        archived = self._get_archived_alert_summary(alert_id)
+        read_count = len(read_times) + archived["read"]
+        total_read_minutes = sum(read_times) + archived["read_seconds"] / 60
+        if archived["read"]:
+            read_times += [archived["fastest_read_seconds"] / 60, archived["slowest_read_seconds"] / 60]
+        if archived["delivered"]:
+            delivery_times += [archived["first_delivered"], archived["last_delivered"]]
         
         # Calculate averages
-        avg_time_to_read = sum(read_times) / len(read_times) if read_times else 0
+        avg_time_to_read = total_read_minutes / read_count if read_count else 0
         
         return {
             "alert_id": alert_id,
@@ -123,7 +137,7 @@ class AnalyticsService:
                 "average_time_to_read_minutes": round(avg_time_to_read, 2),
                 "fastest_read_minutes": round(min(read_times), 2) if read_times else 0,
                 "slowest_read_minutes": round(max(read_times), 2) if read_times else 0,
-                "total_deliveries": len(deliveries),
+                "total_deliveries": len(deliveries) + archived["delivered"],
                 "delivery_success_rate": 100.0  # Assuming all deliveries succeed for MVP
             },
             "timeline": {
@@ -165,48 +179,86 @@ class AnalyticsService:
             "checked_at": now
         }
 
-    def get_trend_analytics(self, days: int = 7) -> Dict[str, Any]:
-        """Get trending analytics over specified time period."""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
-        all_deliveries = self.delivery_repo.get_all_deliveries()
-        period_deliveries = [d for d in all_deliveries if d.delivered_at >= start_date]
-        
-        # Group by day
-        daily_stats = defaultdict(lambda: {"delivered": 0, "read": 0})
-        
-        for delivery in period_deliveries:
-            day = delivery.delivered_at.date()
-            daily_stats[day]["delivered"] += 1
-            if delivery.read_at:
-                daily_stats[day]["read"] += 1
-        
-        # Convert to sorted list
-        trend_data = []
-        current_date = start_date.date()
-        while current_date <= end_date.date():
-            stats = daily_stats[current_date]
-            trend_data.append({
-                "date": current_date.isoformat(),
-                "delivered": stats["delivered"],
-                "read": stats["read"],
-                "read_rate": (stats["read"] / stats["delivered"] * 100) if stats["delivered"] > 0 else 0
-            })
-            current_date += timedelta(days=1)
-        
-        return {
-            "period": f"{days} days",
+    TREND_GRANULARITIES = {
+        "hour": timedelta(hours=1),
+        "day": timedelta(days=1),
+        "week": timedelta(weeks=1),
+    }
+    MAX_TREND_BUCKETS = 10000
+
+    def get_trend_analytics(self, days: int = 7, start: datetime = None, end: datetime = None,
+                            granularity: str = "day", severity: str = None, team_id: str = None,
+                            group_by: str = None) -> Dict[str, Any]:
+        """Get trending analytics over an arbitrary range at hour/day/week granularity."""
+        if granularity not in self.TREND_GRANULARITIES:
+            raise ValueError(f"Invalid granularity '{granularity}', expected one of: hour, day, week")
+        if group_by not in (None, "severity", "team"):
+            raise ValueError(f"Invalid group_by '{group_by}', expected one of: severity, team")
+
+        end_date = self._as_naive_utc(end) or datetime.utcnow()
+        start_date = self._as_naive_utc(start) or end_date - timedelta(days=days)
+        if start_date >= end_date:
+            raise ValueError("start must be before end")
+
+        step = self.TREND_GRANULARITIES[granularity]
+        first_bucket = self._truncate(start_date, granularity)
+        if (end_date - first_bucket) / step > self.MAX_TREND_BUCKETS:
+            raise ValueError(f"Range too large for '{granularity}' granularity (max {self.MAX_TREND_BUCKETS} buckets)")
+
+        severity_filter = self._parse_severity(severity) if severity else None
+        rows = self.delivery_repo.get_delivery_trend(
+            start_date, end_date, granularity, severity_filter, team_id, group_by
+        )
+        # Archived months are only opened when the requested range reaches them
+        if self.archive_repo and self.archive_repo.segments_for_range(start_date, end_date):
+            rows += self.archive_repo.get_delivery_trend(
+                start_date, end_date, granularity,
+                severity_filter.value if severity_filter else None, team_id, group_by
+            )
+
+        # Totals per bucket, plus per-dimension series when a breakdown was requested
+        totals = defaultdict(lambda: {"delivered": 0, "read": 0})
+        series = defaultdict(lambda: defaultdict(lambda: {"delivered": 0, "read": 0}))
+        for bucket, dimension, delivered, read in rows:
+            totals[bucket]["delivered"] += delivered
+            totals[bucket]["read"] += read
+            if group_by:
+                key = dimension.value if isinstance(dimension, Severity) else str(dimension)
+                series[key][bucket]["delivered"] += delivered
+                series[key][bucket]["read"] += read
+
+        buckets = []
+        current = first_bucket
+        while current < end_date:
+            buckets.append(current)
+            current += step
+
+        trend_data = [self._trend_point(bucket, totals[bucket], granularity) for bucket in buckets]
+        period_days = max((end_date - start_date).total_seconds() / 86400, 1)
+        total_delivered = sum(d["delivered"] for d in trend_data)
+        total_read = sum(d["read"] for d in trend_data)
+
+        result = {
+            "period": f"{days} days" if start is None and end is None else f"{round(period_days, 2)} days",
+            "granularity": granularity,
             "start_date": start_date.date().isoformat(),
             "end_date": end_date.date().isoformat(),
+            "filters": {"severity": severity, "team_id": team_id},
             "trends": trend_data,
             "summary": {
-                "total_delivered": sum(d["delivered"] for d in trend_data),
-                "total_read": sum(d["read"] for d in trend_data),
-                "average_daily_delivered": round(sum(d["delivered"] for d in trend_data) / len(trend_data), 2),
-                "average_daily_read": round(sum(d["read"] for d in trend_data) / len(trend_data), 2)
+                "total_delivered": total_delivered,
+                "total_read": total_read,
+                "average_daily_delivered": round(total_delivered / period_days, 2),
+                "average_daily_read": round(total_read / period_days, 2)
             }
         }
+        if group_by:
+            result["group_by"] = group_by
+            result["breakdown"] = {
+                key: [self._trend_point(bucket, stats[bucket], granularity) for bucket in buckets]
+                for key, stats in series.items()
+            }
+        return result
 
     def get_severity_breakdown(self) -> Dict[str, Any]:
         """Get detailed breakdown by severity as required by PRD."""
@@ -220,20 +272,28 @@ class AnalyticsService:
         }
         
         # Count alerts by severity
+        severity_by_alert = {}
         for alert in all_alerts:
-            severity = alert.severity.title() if alert.severity else "Info"
+            severity = alert.severity.value.title() if alert.severity else "Info"
+            severity_by_alert[alert.id] = severity
             if severity in severity_stats:
                 severity_stats[severity]["alerts"] += 1
         
         # Count deliveries and reads by alert severity
         for delivery in all_deliveries:
-            alert = self.alert_repo.get_alert_by_id(delivery.alert_id)
-            if alert:
-                severity = alert.severity.title() if alert.severity else "Info"
+            severity = severity_by_alert.get(delivery.alert_id)
+            if severity in severity_stats:
+                severity_stats[severity]["deliveries"] += 1
+                if delivery.read_at:
+                    severity_stats[severity]["read"] += 1
+
+        # Archived deliveries keep the severity their alert had when they were archived
+        if self._archive_overlaps():
+            for value, (delivered, read) in self.archive_repo.get_severity_counts().items():
+                severity = (value or "info").title()
                 if severity in severity_stats:
-                    severity_stats[severity]["deliveries"] += 1
-                    if delivery.read_at:
-                        severity_stats[severity]["read"] += 1
+                    severity_stats[severity]["deliveries"] += delivered
+                    severity_stats[severity]["read"] += read
         
         # Calculate read rates
         for severity in severity_stats:
@@ -251,55 +311,169 @@ class AnalyticsService:
 
     def get_engagement_summary(self) -> Dict[str, Any]:
         """Get user engagement summary."""
-        all_users = self.user_repo.get_all_users()
-        all_deliveries = self.delivery_repo.get_all_deliveries()
-        all_prefs = self.preference_repo.get_all_preferences()
-        
-        # User engagement metrics
-        user_stats = defaultdict(lambda: {"delivered": 0, "read": 0, "snoozed": 0})
-        
-        for delivery in all_deliveries:
-            user_stats[delivery.user_id]["delivered"] += 1
-            if delivery.read_at:
-                user_stats[delivery.user_id]["read"] += 1
-        
-        for pref in all_prefs:
-            if pref.snoozed_date:
-                user_stats[pref.user_id]["snoozed"] += 1
-        
-        # Calculate engagement tiers
-        highly_engaged = sum(1 for stats in user_stats.values() if stats["read"] / max(stats["delivered"], 1) > 0.8)
-        moderately_engaged = sum(1 for stats in user_stats.values() if 0.4 <= stats["read"] / max(stats["delivered"], 1) <= 0.8)
-        low_engaged = sum(1 for stats in user_stats.values() if stats["read"] / max(stats["delivered"], 1) < 0.4)
-        
+        total_users = self.user_repo.count_users()
+
+        # Per-user delivered/read counts straight from a grouped query
+        counts = self.delivery_repo.get_user_delivery_counts()
+        if self._archive_overlaps():
+            merged = self.archive_repo.get_user_delivery_counts()
+            for user_id, delivered, read in counts:
+                entry = merged.setdefault(str(user_id), [0, 0])
+                entry[0] += delivered
+                entry[1] += read
+            counts = [(user_id, delivered, read) for user_id, (delivered, read) in merged.items()]
+        engine = EngagementEngine.from_counts(counts)
+        tiers = engine.tier_counts()
+
         return {
-            "total_users": len(all_users),
-            "engaged_users": len(user_stats),  # Users who received at least one alert
+            "total_users": total_users,
+            "engaged_users": len(engine),  # Users who received at least one alert
             "engagement_tiers": {
-                "highly_engaged": highly_engaged,  # >80% read rate
-                "moderately_engaged": moderately_engaged,  # 40-80% read rate  
-                "low_engaged": low_engaged  # <40% read rate
+                "highly_engaged": tiers["highly_engaged"],  # >80% read rate
+                "moderately_engaged": tiers["moderately_engaged"],  # 40-80% read rate
+                "low_engaged": tiers["low_engaged"]  # <40% read rate
             },
             "overall_metrics": {
-                "avg_deliveries_per_user": round(len(all_deliveries) / len(all_users), 2) if all_users else 0,
-                "avg_read_rate": round(sum(stats["read"] / max(stats["delivered"], 1) for stats in user_stats.values()) / len(user_stats) * 100, 2) if user_stats else 0
+                "avg_deliveries_per_user": round(engine.total_delivered() / total_users, 2) if total_users else 0,
+                "avg_read_rate": engine.avg_read_rate()
             }
         }
 
-    def _get_snooze_analytics(self) -> Dict[str, Any]:
-        """Helper method to get snooze analytics."""
-        all_prefs = self.preference_repo.get_all_preferences()
-        
+    def get_team_analytics(self, start: datetime = None, end: datetime = None) -> Dict[str, Any]:
+        """Get read rate, snooze rate and time-to-read broken down by team."""
+        start, end = self._as_naive_utc(start), self._as_naive_utc(end)
+        teams = self._build_team_stats(start, end)
+        return {
+            "window": {"start": start, "end": end},
+            "teams": teams,
+            "total_teams": len(teams),
+            "generated_at": datetime.utcnow()
+        }
+
+    def get_single_team_analytics(self, team_id: str, start: datetime = None, end: datetime = None) -> Dict[str, Any]:
+        """Get engagement analytics for a single team."""
+        start, end = self._as_naive_utc(start), self._as_naive_utc(end)
+        teams = self._build_team_stats(start, end, team_id)
+        if not teams:
+            return None
+        return {
+            "window": {"start": start, "end": end},
+            **teams[0],
+            "generated_at": datetime.utcnow()
+        }
+
+    def _build_team_stats(self, start: datetime = None, end: datetime = None, team_id: str = None) -> List[Dict[str, Any]]:
+        """Helper method to merge grouped delivery and snooze rows per team.
+
+        Both halves use the window [start, end): deliveries by delivered_at, snoozes by
+        the days that overlap it (the day of start up to, not including, the day of end
+        when end is midnight).
+        """
+        delivery_rows = self.delivery_repo.get_team_delivery_stats(start, end, team_id)
+        snooze_rows = self.preference_repo.get_team_snooze_counts(
+            start.date() if start else None,
+            (end - timedelta(microseconds=1)).date() + timedelta(days=1) if end else None,
+            team_id
+        )
+        snoozes = {row[0]: (row[1], row[2]) for row in snooze_rows}
+        if self._archive_overlaps(start, end):
+            delivery_rows = self._merge_archived_team_stats(delivery_rows, start, end, team_id)
+
+        teams = []
+        for row_team_id, team_name, users_reached, delivered, read, avg_seconds in delivery_rows:
+            tracked, snoozed = snoozes.get(row_team_id, (0, 0))
+            teams.append({
+                "team_id": row_team_id,
+                "team_name": team_name,
+                "users_reached": users_reached,
+                "total_delivered": delivered,
+                "total_read": read,
+                "read_rate_percentage": round(read / delivered * 100, 2) if delivered else 0,
+                "snooze_count": snoozed,
+                "snooze_rate_percentage": round(snoozed / tracked * 100, 2) if tracked else 0,
+                "avg_time_to_read_minutes": round(float(avg_seconds) / 60, 2) if avg_seconds is not None else 0
+            })
+        return teams
+
+    def _merge_archived_team_stats(self, delivery_rows, start: datetime = None, end: datetime = None,
+                                   team_id: str = None) -> List[tuple]:
+        """Helper method to add archived deliveries to the hot per-team rows.
+
+        Users reached are unioned from distinct (team, user) pairs on both sides, and the
+        time to read is re-averaged over all read deliveries.
+        """
+        archived = self.archive_repo.get_team_delivery_stats(start, end, team_id)
+        hot_users = defaultdict(set)
+        for row_team_id, user_id in self.delivery_repo.get_team_delivery_users(start, end, team_id):
+            hot_users[str(row_team_id)].add(str(user_id))
+
+        merged = []
+        for row_team_id, team_name, users_reached, delivered, read, avg_seconds in delivery_rows:
+            stats = archived.get(str(row_team_id))
+            if stats:
+                read_seconds = float(avg_seconds or 0) * read + stats["read_seconds"]
+                users_reached = len(hot_users[str(row_team_id)] | stats["users"])
+                delivered += stats["delivered"]
+                read += stats["read"]
+                avg_seconds = read_seconds / read if read else None
+            merged.append((row_team_id, team_name, users_reached, delivered, read, avg_seconds))
+        return merged
+
+    def _archive_overlaps(self, start: datetime = None, end: datetime = None) -> bool:
+        """Helper method to check whether any archived month falls in the (optional) window."""
+        if not self.archive_repo:
+            return False
+        return bool(self.archive_repo.segments_for_range(start or datetime.min, end or datetime.max))
+
+    def _get_archived_alert_summary(self, alert_id: str) -> Dict[str, Any]:
+        """Helper method to return one alert's archived delivery metrics (empty without an archive)."""
+        if self._archive_overlaps():
+            return self.archive_repo.get_alert_summary(alert_id)
+        return {"delivered": 0, "read": 0, "users": set(), "read_seconds": 0.0}
+
+    @staticmethod
+    def _as_naive_utc(value: datetime) -> datetime:
+        """Helper method to convert an offset-aware timestamp to naive UTC like the rest of the schema."""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def _truncate(value: datetime, granularity: str) -> datetime:
+        """Helper method to floor a timestamp to the start of its trend bucket."""
+        if granularity == "hour":
+            return value.replace(minute=0, second=0, microsecond=0)
+        day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+        if granularity == "week":
+            return day - timedelta(days=day.weekday())
+        return day
+
+    @staticmethod
+    def _trend_point(bucket: datetime, stats: Dict[str, int], granularity: str) -> Dict[str, Any]:
+        """Helper method to format a single trend bucket."""
+        return {
+            "date": bucket.isoformat() if granularity == "hour" else bucket.date().isoformat(),
+            "delivered": stats["delivered"],
+            "read": stats["read"],
+            "read_rate": (stats["read"] / stats["delivered"] * 100) if stats["delivered"] > 0 else 0
+        }
+
+    @staticmethod
+    def _parse_severity(severity: str) -> Severity:
+        """Helper method to accept severity by name or value in any case."""
+        try:
+            return Severity[severity.upper()]
+        except KeyError:
+            raise ValueError(f"Invalid severity '{severity}', expected one of: info, warning, critical")
+
+    def _get_snooze_analytics(self, snooze_rows) -> Dict[str, Any]:
+        """Helper method to get snooze analytics from per-alert snooze counts."""
+        alert_snoozes = {alert_id: count for alert_id, count, _ in snooze_rows}
+
         # Count snoozes
-        total_snoozes = sum(1 for pref in all_prefs if pref.snoozed_date)
-        today_snoozes = sum(1 for pref in all_prefs if pref.snoozed_date == date.today())
-        
-        # Snoozes by alert
-        alert_snoozes = defaultdict(int)
-        for pref in all_prefs:
-            if pref.snoozed_date:
-                alert_snoozes[pref.alert_id] += 1
-        
+        total_snoozes = sum(alert_snoozes.values())
+        today_snoozes = sum(today for _, _, today in snooze_rows)
+
         # Most snoozed alert
         most_snoozed = max(alert_snoozes.items(), key=lambda x: x[1]) if alert_snoozes else (None, 0)
         
@@ -308,7 +482,7 @@ class AnalyticsService:
             "active_snoozes_today": today_snoozes,
             "most_snoozed_alert_id": most_snoozed[0],
             "most_snoozed_count": most_snoozed[1],
-            "snoozes_per_alert": dict(alert_snoozes)
+            "snoozes_per_alert": alert_snoozes
         }
 
     def _get_alert_snooze_count(self, alert_id: str) -> int:
@@ -316,20 +490,11 @@ class AnalyticsService:
         all_prefs = self.preference_repo.get_all_preferences()
         return sum(1 for pref in all_prefs if pref.alert_id == alert_id and pref.snoozed_date)
 
-    def _get_recent_activity(self, days: int) -> Dict[str, Any]:
+    def _get_recent_activity(self, days: int, new_alerts: int, recent_deliveries: int) -> Dict[str, Any]:
         """Helper method to get recent activity."""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        
-        all_deliveries = self.delivery_repo.get_all_deliveries()
-        recent_deliveries = [d for d in all_deliveries if d.delivered_at >= start_date]
-        
-        all_alerts = self.alert_repo.get_all_alerts()
-        recent_alerts = [a for a in all_alerts if a.created_at >= start_date]
-        
         return {
             "period_days": days,
-            "new_alerts": len(recent_alerts),
-            "total_deliveries": len(recent_deliveries),
-            "daily_average_deliveries": round(len(recent_deliveries) / days, 2)
-        }
\ No newline at end of file
+            "new_alerts": new_alerts,
+            "total_deliveries": recent_deliveries,
+            "daily_average_deliveries": round(recent_deliveries / days, 2)
+        }
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from app.core.settings import settings
+from app.models.alert import Alert
+
+class DigestPolicy:
+    """Decides which outbox sends are held for a digest and when the digest goes out."""
+
+    def __init__(self, enabled: bool = False, channels: Iterable[str] = (), window_minutes: int = 15,
+                 max_window_minutes: int = 60, bypass_severities: Iterable[str] = ("critical",)):
+        self.enabled = enabled
+        self.channels = set(channels)
+        self.window = timedelta(minutes=window_minutes)
+        self.max_window = timedelta(minutes=max(max_window_minutes, window_minutes))
+        self.bypass_severities = {s.lower() for s in bypass_severities}
+
+    @classmethod
+    def from_settings(cls) -> "DigestPolicy":
+        return cls(
+            enabled=settings.DIGEST_ENABLED,
+            channels=settings.DIGEST_CHANNELS,
+            window_minutes=settings.DIGEST_WINDOW_MINUTES,
+            max_window_minutes=settings.DIGEST_MAX_WINDOW_MINUTES,
+            bypass_severities=settings.DIGEST_BYPASS_SEVERITIES
+        )
+
+    def digest_channels(self, alert: Alert, channel_names: Iterable[str]) -> List[str]:
+        """Channels on which this alert should wait for a digest instead of sending now."""
+        if not self.enabled:
+            return []
+        severity = str(getattr(alert.severity, "value", alert.severity)).lower()
+        if severity in self.bypass_severities:
+            return []
+        return [name for name in channel_names if name in self.channels]
+
+    def send_at(self, now: datetime, first_held_at: Optional[datetime] = None) -> datetime:
+        """When a digest that gains an alert at ``now`` should be sent.
+
+        Each new alert slides the digest out by one window, capped at the max window
+        after the oldest alert it already holds.
+        """
+        send_at = now + self.window
+        if first_held_at:
+            send_at = min(send_at, first_held_at + self.max_window)
+        return max(send_at, now)
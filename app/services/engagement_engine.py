@@ -0,0 +1,51 @@
+# app/services/engagement_engine.py
+from typing import Dict, Iterable, List, Tuple, Any
+import numpy as np
+
+HIGH_ENGAGEMENT_THRESHOLD = 0.8
+LOW_ENGAGEMENT_THRESHOLD = 0.4
+
+class EngagementEngine:
+    """Array-backed per-user engagement metrics indexed by a dense user ordinal."""
+
+    def __init__(self, user_ids: List[Any], delivered: np.ndarray, read: np.ndarray):
+        self.user_ids = user_ids
+        self.delivered = delivered
+        self.read = read
+
+    @classmethod
+    def from_counts(cls, rows: Iterable[Tuple[Any, int, int]]) -> "EngagementEngine":
+        """Build the engine from (user_id, delivered, read) aggregate rows."""
+        rows = list(rows)
+        count = len(rows)
+        user_ids = [row[0] for row in rows]
+        delivered = np.fromiter((row[1] for row in rows), dtype=np.int64, count=count)
+        read = np.fromiter((row[2] for row in rows), dtype=np.int64, count=count)
+        return cls(user_ids, delivered, read)
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def read_rates(self) -> np.ndarray:
+        """Read ratio per user; users without deliveries count as 0."""
+        return self.read / np.maximum(self.delivered, 1)
+
+    def tier_counts(self) -> Dict[str, int]:
+        """Bucket users into engagement tiers by read ratio."""
+        rates = self.read_rates()
+        highly = int(np.count_nonzero(rates > HIGH_ENGAGEMENT_THRESHOLD))
+        low = int(np.count_nonzero(rates < LOW_ENGAGEMENT_THRESHOLD))
+        return {
+            "highly_engaged": highly,
+            "moderately_engaged": len(rates) - highly - low,
+            "low_engaged": low
+        }
+
+    def total_delivered(self) -> int:
+        return int(self.delivered.sum())
+
+    def avg_read_rate(self) -> float:
+        """Mean per-user read ratio as a percentage."""
+        if not len(self):
+            return 0
+        return round(float(self.read_rates().mean()) * 100, 2)
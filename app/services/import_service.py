@@ -0,0 +1,313 @@
+import csv
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from app.core.settings import settings
+from app.models.alert import DeliveryType, Severity
+from app.repositories.alert_repo import AlertRepository
+from app.repositories.team_repo import TeamRepository
+from app.repositories.user_repo import UserRepository
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# CSV cells hold one value; list columns (teams, users, delivery_types) separate items with "|"
+CSV_LIST_SEPARATOR = "|"
+
+def read_records(text: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, record) from an NDJSON or CSV stream, one record at a time.
+
+    A line that does not parse is yielded as a ValueError so the importer can report it
+    and carry on. CSV records are dicts keyed by the header row, with every value a string.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            if None in record:
+                yield reader.line_num, ValueError("Row has more fields than the header")
+            else:
+                yield reader.line_num, record
+        return
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"Invalid JSON: {e}")
+            continue
+        yield number, record if isinstance(record, dict) else ValueError("Each line must be a JSON object")
+
+class ImportReport:
+    """Counts and per-row errors for one import; only the first ``max_errors`` errors are kept."""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def fail(self, row: int, message: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+class BulkImportService:
+    """Validates streamed team, user and alert records and inserts them in chunked transactions.
+
+    Team names are resolved to ids from one query up front, user ids from the in-process
+    directory, so validation costs no per-row queries. Each chunk of valid rows is one
+    bulk insert and one commit; if a chunk fails (a row that raced a concurrent write, say)
+    its rows are retried one at a time so only the offending rows are reported.
+    """
+
+    def __init__(self, team_repo: TeamRepository, user_repo: UserRepository, alert_repo: AlertRepository,
+                 chunk_size: int = settings.IMPORT_CHUNK_SIZE, max_errors: int = settings.IMPORT_MAX_REPORTED_ERRORS):
+        self.team_repo = team_repo
+        self.user_repo = user_repo
+        self.alert_repo = alert_repo
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self._team_ids: Optional[Dict[str, uuid.UUID]] = None
+
+    def import_teams(self, records: Iterable[Tuple[int, Any]]) -> ImportReport:
+        """Create teams from records with a ``name``; names already taken are row errors."""
+        team_ids = self._get_team_ids()
+
+        def validate(record: dict) -> dict:
+            name = _text(record, "name")
+            if name in team_ids:
+                raise ValueError(f"Team '{name}' already exists")
+            row = {"id": uuid.uuid4(), "name": name}
+            team_ids[name] = row["id"]
+            return row
+
+        return self._import(records, validate, self.team_repo.create_teams_bulk, "teams")
+
+    def import_users(self, records: Iterable[Tuple[int, Any]]) -> ImportReport:
+        """Create users from records with a ``name`` and optionally a ``team`` (name) or ``team_id``."""
+        self._get_team_ids()
+
+        def validate(record: dict) -> dict:
+            team_id = None
+            if _blank(record.get("team")) is not None:
+                team_id = self._resolve_team(record["team"])
+            elif _blank(record.get("team_id")) is not None:
+                team_id = self._resolve_team(record["team_id"])
+            return {"id": uuid.uuid4(), "name": _text(record, "name"), "team_id": team_id}
+
+        return self._import(records, validate, self.user_repo.create_users_bulk, "users")
+
+    def import_alerts(self, records: Iterable[Tuple[int, Any]]) -> ImportReport:
+        """Create alerts with the same defaults as AlertService.create_alert.
+
+        Visibility comes from a ``visibility`` object or from flat ``org``, ``teams`` and
+        ``users`` fields; teams may be given by name or id, users by id.
+        """
+        directory = self.user_repo.get_directory()
+        self._get_team_ids()
+
+        def validate(record: dict) -> dict:
+            now = datetime.utcnow()
+            start_time = _datetime(record.get("start_time")) or now
+            expiry_time = _datetime(record.get("expiry_time"))
+            if expiry_time is not None and expiry_time <= start_time:
+                raise ValueError("expiry_time must be after start_time")
+            reminder_freq_minutes = _int(record.get("reminder_freq_minutes"), 120)
+            if reminder_freq_minutes < 1:
+                raise ValueError("reminder_freq_minutes must be positive")
+            return {
+                "id": uuid.uuid4(),
+                "title": _text(record, "title"),
+                "body": _text(record, "body"),
+                "severity": _severity(record.get("severity")),
+                "delivery_types": _delivery_types(record.get("delivery_types")),
+                "reminder_enabled": _bool(record.get("reminder_enabled"), True),
+                "reminder_freq_minutes": reminder_freq_minutes,
+                "start_time": start_time,
+                "expiry_time": expiry_time,
+                "is_archived": False,
+                "visibility": self._visibility(record, directory),
+                "created_at": now
+            }
+
+        return self._import(records, validate, self.alert_repo.create_alerts_bulk, "alerts")
+
+    def _import(self, records: Iterable[Tuple[int, Any]], validate: Callable[[dict], dict],
+                insert: Callable[[List[dict]], None], kind: str) -> ImportReport:
+        """Helper method to validate records and insert the valid rows chunk by chunk."""
+        report = ImportReport(self.max_errors)
+        chunk: List[Tuple[int, dict]] = []
+        for number, record in records:
+            report.rows += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                chunk.append((number, validate(record)))
+            except ValueError as e:
+                report.fail(number, str(e))
+                continue
+            if len(chunk) >= self.chunk_size:
+                self._insert_chunk(chunk, insert, report)
+                chunk = []
+        if chunk:
+            self._insert_chunk(chunk, insert, report)
+        logger.info(f"Imported {report.created} {kind} ({report.failed} failed rows of {report.rows})")
+        return report
+
+    def _insert_chunk(self, chunk: List[Tuple[int, dict]], insert: Callable[[List[dict]], None],
+                      report: ImportReport):
+        """Helper method to insert one chunk in a transaction, retrying row by row if it fails."""
+        report.chunks += 1
+        db = self.team_repo.db
+        try:
+            insert([row for _, row in chunk])
+            report.created += len(chunk)
+            return
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Import chunk of {len(chunk)} rows failed, retrying rows one at a time: {getattr(e, 'orig', None) or e}")
+        for number, row in chunk:
+            try:
+                insert([row])
+                report.created += 1
+            except Exception as e:
+                db.rollback()
+                report.fail(number, str(getattr(e, "orig", None) or e).strip())
+
+    def _get_team_ids(self) -> Dict[str, uuid.UUID]:
+        """Helper method to load team ids by name once per import."""
+        if self._team_ids is None:
+            self._team_ids = self.team_repo.get_team_ids_by_name()
+        return self._team_ids
+
+    def _resolve_team(self, value) -> uuid.UUID:
+        """Helper method to resolve a team name or id to a known team id."""
+        team_ids = self._get_team_ids()
+        value = str(value).strip()
+        if value in team_ids:
+            return team_ids[value]
+        team_id = _uuid(value)
+        if team_id is not None and team_id in team_ids.values():
+            return team_id
+        raise ValueError(f"Unknown team '{value}'")
+
+    def _visibility(self, record: dict, directory) -> dict:
+        """Helper method to build a validated visibility dict with team and user ids as strings."""
+        visibility = record.get("visibility")
+        if isinstance(visibility, str) and visibility.strip():
+            try:
+                visibility = json.loads(visibility)
+            except ValueError:
+                raise ValueError("visibility must be a JSON object")
+        if not visibility:
+            visibility = {key: record.get(key) for key in ("org", "teams", "users")}
+        if not isinstance(visibility, dict):
+            raise ValueError("visibility must be an object")
+        teams = [str(self._resolve_team(team)) for team in _list(visibility.get("teams"))]
+        users = []
+        for value in _list(visibility.get("users")):
+            user = directory.get_user(value)
+            user_id = _uuid(value)
+            if user is None and user_id is not None:
+                # Users created by another process since the directory was loaded
+                user = self.user_repo.get_user(user_id)
+            if user is None:
+                raise ValueError(f"Unknown user '{value}'")
+            users.append(str(user.id))
+        return {"org": _bool(visibility.get("org"), not teams and not users), "teams": teams, "users": users}
+
+# Field parsers; CSV gives every value as a string, where an empty cell means "not given"
+
+def _blank(value):
+    return None if value is None or (isinstance(value, str) and not value.strip()) else value
+
+def _text(record: dict, field: str) -> str:
+    value = _blank(record.get(field))
+    if value is None:
+        raise ValueError(f"{field} is required")
+    return str(value).strip()
+
+def _bool(value, default: bool) -> bool:
+    value = _blank(value)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes", "y"):
+        return True
+    if text in ("false", "0", "no", "n"):
+        return False
+    raise ValueError(f"Invalid boolean '{value}'")
+
+def _int(value, default: int) -> int:
+    value = _blank(value)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid integer '{value}'")
+
+def _uuid(value) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+def _datetime(value) -> Optional[datetime]:
+    """ISO 8601 timestamp; offsets are converted to naive UTC like the rest of the schema."""
+    value = _blank(value)
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid datetime '{value}'")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _list(value) -> List[str]:
+    value = _blank(value)
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value]
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+    raise ValueError(f"Expected a list, got '{value}'")
+
+def _severity(value) -> Severity:
+    value = _blank(value)
+    if value is None:
+        return Severity.INFO
+    text = str(value).strip()
+    for severity in Severity:
+        if text.lower() in (severity.value, severity.name.lower()):
+            return severity
+    raise ValueError(f"Invalid severity '{value}'")
+
+def _delivery_types(value) -> List[str]:
+    types = _list(value) or [DeliveryType.IN_APP.value]
+    valid = {delivery_type.value for delivery_type in DeliveryType}
+    for delivery_type in types:
+        if delivery_type not in valid:
+            raise ValueError(f"Invalid delivery type '{delivery_type}'")
+    return types
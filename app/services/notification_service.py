@@ -1,51 +1,86 @@
+import logging
 from typing import List
 from datetime import datetime, timedelta, date
-from app.models.alert import Alert
+from app.models.alert import Alert, DeliveryType
 from app.models.user import User
 from app.models.user_alert_pref import UserAlertPreference
 from app.channels.base import NotificationChannel
+from app.channels.rate_limit import severity_priority
+from app.core.settings import settings
+from app.services.digest_policy import DigestPolicy
+
+logger = logging.getLogger(__name__)
 
 class NotificationService:
     """Service that fetches alerts, checks user prefs, and dispatches via channels."""
 
     DEFAULT_REMINDER_INTERVAL_HOURS = 2  # default reminder frequency
 
-    def __init__(self, delivery_repo, pref_repo, alert_repo, user_repo, channels: List[NotificationChannel] = None):
+    def __init__(self, delivery_repo, pref_repo, alert_repo, user_repo, channels: List[NotificationChannel] = None,
+                 use_outbox: bool = None, digest_policy: DigestPolicy = None, route_by_delivery_types: bool = True):
         self.delivery_repo = delivery_repo
         self.pref_repo = pref_repo
         self.alert_repo = alert_repo
         self.user_repo = user_repo
         self.channels = channels or self._get_default_channels()
+        # With the outbox, deliver() only queues sends; the outbox worker calls the channels
+        self.use_outbox = settings.OUTBOX_ENABLED if use_outbox is None else use_outbox
+        self.digest_policy = digest_policy or DigestPolicy.from_settings()
+        # Explicit channel overrides (admin tooling) send through every given channel
+        self.route_by_delivery_types = route_by_delivery_types
 
     def trigger_reminders(self) -> dict:
         """Trigger reminders for all active alerts and eligible users"""
         alerts = self.alert_repo.get_active_alerts()
-        users = self.user_repo.get_all_users()
+        # Reloaded per sweep: users deleted or moved by another process must not be targeted
+        directory = self.user_repo.get_directory(reload=True)
+        users = directory.users()
+        prefs = self.pref_repo.get_preferences_for_alerts([alert.id for alert in alerts])
         
         delivered_count = 0
         skipped_count = 0
-        
+        failed_alerts = 0
+
+        # Decide every recipient before writing, so no alert or user is reloaded mid-sweep
+        planned = []
         for alert in alerts:
-            eligible_users = self.get_users_for_alert(alert, users)
-            for user in eligible_users:
-                if self.should_deliver(alert, user):
-                    self.deliver(alert, user)
-                    delivered_count += 1
-                else:
-                    skipped_count += 1
+            eligible_users = directory.resolve_audience(alert.visibility)
+            due_users = self.get_due_users(alert, eligible_users, prefs)
+            skipped_count += len(eligible_users) - len(due_users)
+            if due_users:
+                planned.append((alert, due_users))
+
+        # Each alert commits on its own; a failed batch is rolled back without stopping the sweep
+        for alert, due_users in planned:
+            try:
+                self.deliver_many(alert, due_users, prefs)
+            except Exception as e:
+                self.delivery_repo.db.rollback()
+                failed_alerts += 1
+                logger.error(f"Reminder delivery failed for alert {alert.id} ({len(due_users)} users): {str(e)}")
+                continue
+            delivered_count += len(due_users)
         
         return {
             "message": "Reminders triggered successfully",
             "alerts_processed": len(alerts),
             "users_processed": len(users),
             "delivered": delivered_count,
-            "skipped": skipped_count
+            "skipped": skipped_count,
+            "failed_alerts": failed_alerts
         }
 
     def should_deliver(self, alert: Alert, user: User) -> bool:
         """Check if alert should be delivered based on snooze, read/unread, and reminder frequency."""
         pref: UserAlertPreference = self.pref_repo.get_user_alert_preference(user.id, alert.id)
+        return self._is_due(alert, pref)
 
+    def get_due_users(self, alert: Alert, users: List[User], prefs: dict) -> List[User]:
+        """Users due a delivery of the alert, given preferences from get_preferences_for_alerts()."""
+        return [user for user in users if self._is_due(alert, prefs.get((alert.id, user.id)))]
+
+    def _is_due(self, alert: Alert, pref: UserAlertPreference) -> bool:
+        """Helper method to apply the snooze and reminder-interval rules to a loaded preference."""
         # 1. Check if user has snoozed today
         if pref and pref.snoozed_date == date.today():
             return False
@@ -61,47 +96,92 @@ class NotificationService:
 
         return True
 
-    def deliver(self, alert: Alert, user: User) -> dict:
-        """Send the alert via all enabled channels and update delivery log & preferences."""
-        delivery_results = []
-        
-        for channel in self.channels:
-            try:
-                result = channel.send(alert, user)
-                delivery_results.append({
-                    "channel": channel.__class__.__name__,
-                    "success": True,
-                    "result": result
-                })
-            except Exception as e:
-                delivery_results.append({
-                    "channel": channel.__class__.__name__,
-                    "success": False,
-                    "error": str(e)
-                })
-
-        # Log delivery
-        delivery_log = self.delivery_repo.create_delivery(alert.id, user.id)
+    def get_channels_for_alert(self, alert: Alert) -> List[NotificationChannel]:
+        """Channels named in the alert's delivery_types.
+
+        Falls back to in-app when none of them is configured, so every alert still
+        produces a delivery the user can read.
+        """
+        if not self.route_by_delivery_types:
+            return self.channels
+        requested = set(alert.delivery_types or [DeliveryType.IN_APP.value])
+        routed = [channel for channel in self.channels if channel.channel_name in requested]
+        if routed:
+            return routed
+        in_app = [channel for channel in self.channels if channel.channel_name == DeliveryType.IN_APP.value]
+        return in_app or self.channels[:1]
 
-        # Update user preference
-        pref: UserAlertPreference = self.pref_repo.get_user_alert_preference(user.id, alert.id)
-        if pref:
-            pref.last_delivered_at = datetime.utcnow()
-            self.pref_repo.update_preference(pref)
-        else:
-            self.pref_repo.create_preference(
-                user_id=user.id,
-                alert_id=alert.id,
-                last_delivered_at=datetime.utcnow()
-            )
+    def deliver(self, alert: Alert, user: User) -> dict:
+        """Send the alert via its channels and update delivery log & preferences."""
+        result = self.deliver_many(alert, [user])
+        delivery_ids = result["deliveries"].get(user.id, [])
+        channels = []
+        for entry in result["channels"]:
+            entry = dict(entry)
+            results = entry.pop("results", None)
+            if results is not None:
+                entry["result"] = results[0]
+            channels.append(entry)
         
         return {
             "message": f"Alert {alert.id} delivered to user {user.id}",
-            "delivery_id": delivery_log.id,
-            "channels": delivery_results,
+            "delivery_id": delivery_ids[0] if delivery_ids else None,
+            "delivery_ids": delivery_ids,
+            "channels": channels,
             "delivered_at": datetime.utcnow()
         }
 
+    def deliver_many(self, alert: Alert, users: List[User], prefs: dict = None) -> dict:
+        """Deliver one alert to many users, one batch per routed channel.
+
+        Records one delivery row per user per channel actually used, all written with a
+        single bulk insert and committed together with the preference updates. With the
+        outbox, each delivery row gets its outbox entry in the same transaction and the
+        worker sends them in batches; otherwise each channel's send_many is called directly.
+        """
+        alert_id = alert.id
+        user_ids = [user.id for user in users]
+        channels = self.get_channels_for_alert(alert)
+        now = datetime.utcnow()
+        rows = [(alert_id, user_id, channel.channel_name, now) for channel in channels for user_id in user_ids]
+        channel_results = []
+
+        if self.use_outbox:
+            digest_channels = self.digest_policy.digest_channels(alert, [c.channel_name for c in channels])
+            digest_send_at = self._get_digest_schedule(user_ids, digest_channels, now)
+            delivery_ids = self.delivery_repo.create_deliveries_bulk(
+                rows, return_ids=True, queue_outbox=True, priority=severity_priority(alert.severity),
+                digest_send_at=digest_send_at, commit=False
+            )
+            for channel in channels:
+                status = "digest" if channel.channel_name in digest_channels else "queued"
+                channel_results.append({"channel": channel.display_name, "success": True, "status": status})
+        else:
+            for channel in channels:
+                try:
+                    results = channel.send_many(alert, users)
+                    channel_results.append({"channel": channel.display_name, "success": True, "results": results})
+                except Exception as e:
+                    channel_results.append({"channel": channel.display_name, "success": False, "error": str(e)})
+            delivery_ids = self.delivery_repo.create_deliveries_bulk(rows, return_ids=True, commit=False)
+
+        # Update user preferences; commits the deliveries in the same transaction
+        self.pref_repo.set_last_delivered(alert_id, user_ids, prefs, delivered_at=now)
+
+        deliveries = {user_id: [] for user_id in user_ids}
+        for (_, user_id, _, _), delivery_id in zip(rows, delivery_ids):
+            deliveries[user_id].append(delivery_id)
+        return {"alert_id": alert_id, "channels": channel_results, "deliveries": deliveries}
+
+    def _get_digest_schedule(self, user_ids: List, channel_names: List[str], now: datetime) -> dict:
+        """Helper method to get the digest send time per (user_id, channel) for held channels."""
+        schedule = {}
+        for channel_name in channel_names:
+            held_since = self.delivery_repo.get_digest_held_since(user_ids, channel_name)
+            for user_id in user_ids:
+                schedule[(user_id, channel_name)] = self.digest_policy.send_at(now, held_since.get(user_id))
+        return schedule
+
     def get_users_for_alert(self, alert: Alert, users: List[User]) -> List[User]:
         """Determine which users should receive the alert based on visibility."""
         if not alert.visibility:
@@ -160,6 +240,6 @@ class NotificationService:
         }
 
     def _get_default_channels(self):
-        """Default channel (MVP: in-app)."""
-        from app.channels.in_app import InAppChannel
-        return [InAppChannel()]
\ No newline at end of file
+        """Channels configured in settings.NOTIFICATION_CHANNELS (in-app by default)."""
+        from app.channels.factory import ChannelFactory
+        return ChannelFactory.get_configured_channels()
\ No newline at end of file
@@ -0,0 +1,290 @@
+import logging
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, Dict, Any, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.channels.base import NotificationChannel
+from app.channels.circuit_breaker import CircuitOpenError
+from app.channels.factory import ChannelFactory
+from app.channels.rate_limit import PriorityDispatcher
+from app.core.settings import settings
+from app.db.session import SessionLocal
+from app.models.notification_outbox import OutboxStatus
+from app.repositories.alert_repo import AlertRepository
+from app.repositories.outbox_repo import ClaimedEntry, OutboxRepository
+from app.repositories.user_repo import UserRepository
+
+logger = logging.getLogger(__name__)
+
+# Send outcome for calls rejected by an open circuit; the entry is rescheduled, not retried
+DEFERRED = "deferred"
+MISSING_OUTCOME = (OutboxStatus.SKIPPED, "Alert or user no longer exists", None)
+
+class OutboxWorker:
+    """Drains the notification outbox through one severity-ordered, rate-limited dispatcher per channel.
+
+    A feeder thread per channel keeps the channel's in-memory priority queue topped up from
+    the outbox (claiming the most urgent rows first) and writes outcomes back as sends finish.
+    """
+
+    LEASE_SECONDS = 300
+
+    def __init__(self, session_factory: Callable[[], Session], channels: List[NotificationChannel],
+                 concurrency: Dict[str, int] = None, batch_size: int = 100, max_attempts: int = 6,
+                 backoff_base_seconds: int = 30, backoff_max_seconds: int = 3600,
+                 poll_interval_seconds: float = 1.0):
+        self.session_factory = session_factory
+        self.channels = {channel.channel_name: channel for channel in channels}
+        self.concurrency = concurrency or {}
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.dispatchers: Dict[str, PriorityDispatcher] = {
+            name: ChannelFactory.create_dispatcher(channel, self.concurrency.get(name, 4))
+            for name, channel in self.channels.items()
+        }
+
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.stats = {name: {"sent": 0, "retried": 0, "dead": 0, "skipped": 0, "deferred": 0} for name in self.channels}
+
+    def start(self):
+        """Start each channel's dispatcher and feeder thread."""
+        if self._threads:
+            return
+        self._stop.clear()
+        for name in self.channels:
+            self.dispatchers[name].start()
+            thread = threading.Thread(target=self._run_channel, args=(name,), name=f"outbox-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Outbox worker started for channels: {list(self.channels)}")
+
+    def stop(self, timeout: float = 10.0):
+        """Signal feeders to stop, letting them record in-flight sends, then stop dispatchers."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        for dispatcher in self.dispatchers.values():
+            dispatcher.stop(timeout)
+        self._threads = []
+        logger.info("Outbox worker stopped")
+
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def drain_channel(self, channel_name: str) -> int:
+        """Process one batch of due entries synchronously; returns how many were claimed.
+
+        Intended for maintenance and scripts; the running worker uses the feeder loop.
+        """
+        dispatcher = self.dispatchers[channel_name]
+        dispatcher.start()
+        in_flight = self._claim_and_submit(channel_name, self.batch_size)
+        wait(in_flight)
+        self._record_finished(channel_name, in_flight)
+        return sum(len(entries) for entries in in_flight.values())
+
+    def _run_channel(self, channel_name: str):
+        dispatcher = self.dispatchers[channel_name]
+        target = self._queue_target(channel_name)
+        in_flight: Dict[Future, List[ClaimedEntry]] = {}
+        while not self._stop.is_set():
+            try:
+                claimed = 0
+                room = target - dispatcher.depth()
+                # While the channel's circuit is open, leave due rows in the outbox
+                if room > 0 and not self._circuit_open(channel_name):
+                    submitted = self._claim_and_submit(channel_name, room)
+                    in_flight.update(submitted)
+                    claimed = len(submitted)
+                # Keep claiming while there is backlog; otherwise wait for sends or the next poll
+                if in_flight:
+                    done, _ = wait(in_flight, timeout=0 if claimed else self.poll_interval_seconds,
+                                   return_when=FIRST_COMPLETED)
+                    self._record_finished(channel_name, {f: in_flight.pop(f) for f in done})
+                elif not claimed:
+                    self._stop.wait(self.poll_interval_seconds)
+            except Exception as e:
+                logger.error(f"Outbox dispatcher for {channel_name} failed: {str(e)}")
+                self._stop.wait(self.poll_interval_seconds)
+
+        # Claimed rows still queued keep their lease and are retried after it expires
+        done = {f: entries for f, entries in in_flight.items() if f.done() and not f.cancelled()}
+        if done:
+            self._record_finished(channel_name, done)
+
+    def _circuit_open(self, channel_name: str) -> bool:
+        breaker = getattr(self.channels[channel_name], "breaker", None)
+        return breaker is not None and breaker.is_open()
+
+    def _queue_target(self, channel_name: str) -> int:
+        """How many claimed entries to keep queued in memory for a channel.
+
+        Rate-limited channels hold no more than they can send within half a lease, so
+        queued rows are never re-claimed by another worker before they go out.
+        """
+        dispatcher = self.dispatchers[channel_name]
+        target = self.batch_size
+        if dispatcher.rate_limiter:
+            target = min(target, int(dispatcher.rate_limiter.rate * self.LEASE_SECONDS / 2))
+        return max(target, dispatcher.concurrency)
+
+    def _claim_and_submit(self, channel_name: str, limit: int) -> Dict[Future, List[ClaimedEntry]]:
+        """Claim up to ``limit`` due entries and queue their sends on the channel dispatcher.
+
+        Held digest entries are coalesced into one send_digest per user; other entries are
+        batched per alert into send_many calls, sized so every dispatcher thread gets work.
+        """
+        db = self.session_factory()
+        try:
+            entries = OutboxRepository(db).claim_due(channel_name, limit, self.LEASE_SECONDS)
+            if not entries:
+                return {}
+            # Loaded after the claim commit and never re-committed, so they stay usable once detached
+            alerts = {a.id: a for a in AlertRepository(db).get_alerts_by_ids({e.alert_id for e in entries})}
+            user_repo = UserRepository(db)
+            user_ids = {e.user_id for e in entries}
+            users = {u.id: u for u in user_repo.get_directory().get_users(user_ids)}
+            if len(users) < len(user_ids):
+                # Users created by another process since the directory was loaded
+                users.update({u.id: u for u in user_repo.get_users_by_ids(user_ids - users.keys())})
+        finally:
+            db.close()
+
+        groups: Dict[Any, List[ClaimedEntry]] = {}
+        for entry in entries:
+            groups.setdefault(("digest", entry.user_id) if entry.digest else ("alert", entry.alert_id), []).append(entry)
+
+        channel = self.channels[channel_name]
+        dispatcher = self.dispatchers[channel_name]
+        chunk_size = max(1, self.batch_size // dispatcher.concurrency)
+        submitted = {}
+        for (kind, _), group in groups.items():
+            if kind == "digest":
+                send = partial(self._send_digest, channel, group, alerts, users)
+                submitted[dispatcher.submit(min(e.priority for e in group), send)] = group
+                continue
+            for i in range(0, len(group), chunk_size):
+                chunk = group[i:i + chunk_size]
+                send = partial(self._send_batch, channel, chunk, alerts, users)
+                submitted[dispatcher.submit(chunk[0].priority, send, cost=len(chunk))] = chunk
+        return submitted
+
+    def _record_finished(self, channel_name: str, finished: Dict[Future, List[ClaimedEntry]]):
+        """Write the outcomes of finished sends back in one transaction."""
+        if not finished:
+            return
+        outcomes = [
+            self._outcome(channel_name, entry, *outcome)
+            for future, entries in finished.items()
+            for entry, outcome in zip(entries, future.result())
+        ]
+        db = self.session_factory()
+        try:
+            outbox_repo = OutboxRepository(db)
+            outbox_repo.apply_outcomes(outcomes)
+            outbox_repo.commit()
+        finally:
+            db.close()
+
+    def _send_batch(self, channel: NotificationChannel, entries: List[ClaimedEntry], alerts, users):
+        """Send one alert to a batch of recipients; returns one (status, error, retry_at) per entry."""
+        alert = alerts.get(entries[0].alert_id)
+        recipients = [users.get(entry.user_id) for entry in entries]
+        present = [user for user in recipients if user]
+        if not alert or not present:
+            return [MISSING_OUTCOME] * len(entries)
+        try:
+            if len(present) == 1:
+                results = iter([channel.send(alert, present[0])])
+            else:
+                results = iter(channel.send_many(alert, present))
+        except CircuitOpenError as e:
+            return [(DEFERRED, str(e), e.retry_at)] * len(entries)
+        except Exception as e:
+            return [(OutboxStatus.PENDING, str(e) or e.__class__.__name__, None)] * len(entries)
+        return [self._result_outcome(next(results, None)) if user else MISSING_OUTCOME for user in recipients]
+
+    def _send_digest(self, channel: NotificationChannel, entries: List[ClaimedEntry], alerts, users):
+        """Send one user's held alerts as a single message; every entry shares the outcome."""
+        user = users.get(entries[0].user_id)
+        held = [alerts[entry.alert_id] for entry in entries if entry.alert_id in alerts]
+        if not user or not held:
+            return [MISSING_OUTCOME] * len(entries)
+        try:
+            if len(held) == 1:
+                result = channel.send(held[0], user)
+            else:
+                result = channel.send_digest(held, user)
+        except CircuitOpenError as e:
+            return [(DEFERRED, str(e), e.retry_at)] * len(entries)
+        except Exception as e:
+            return [(OutboxStatus.PENDING, str(e) or e.__class__.__name__, None)] * len(entries)
+        return [self._result_outcome(result)] * len(entries)
+
+    def _result_outcome(self, result) -> tuple:
+        """Map a channel result dict to (status, error, retry_at)."""
+        result = result or {}
+        if result.get("status") == "failed":
+            return OutboxStatus.PENDING, "Channel reported failure", None
+        if result.get("status") == "skipped":
+            return OutboxStatus.SKIPPED, result.get("reason"), None
+        return OutboxStatus.SENT, None, None
+
+    def _outcome(self, channel_name: str, entry: ClaimedEntry, status: str, error: Optional[str],
+                 retry_at: Optional[datetime]) -> Dict[str, Any]:
+        """Column updates for one finished entry."""
+        stats = self.stats[channel_name]
+        if status == DEFERRED:
+            # The provider was never called, so the attempt is handed back
+            stats["deferred"] += 1
+            return {"id": entry.id, "attempts": entry.attempts - 1, "next_attempt_at": retry_at, "last_error": error}
+        if status in (OutboxStatus.SENT, OutboxStatus.SKIPPED):
+            stats["sent" if status == OutboxStatus.SENT else "skipped"] += 1
+            return {"id": entry.id, "status": status, "sent_at": datetime.utcnow(), "last_error": error}
+        error = (error or "")[:1000]
+        if entry.attempts >= self.max_attempts:
+            stats["dead"] += 1
+            logger.error(f"Outbox entry {entry.id} dead-lettered after {entry.attempts} attempts: {error}",
+                         extra={"channel": channel_name, "alert_id": entry.alert_id, "user_id": entry.user_id})
+            return {"id": entry.id, "status": OutboxStatus.DEAD, "last_error": error}
+        stats["retried"] += 1
+        retry_at = self._next_attempt_at(entry.attempts)
+        logger.warning(f"Outbox send failed, retrying at {retry_at.isoformat()}: {error}",
+                       extra={"channel": channel_name, "alert_id": entry.alert_id, "user_id": entry.user_id,
+                              "attempts": entry.attempts})
+        return {"id": entry.id, "next_attempt_at": retry_at, "last_error": error}
+
+    def _next_attempt_at(self, attempts: int) -> datetime:
+        """Exponential backoff with +/-20% jitter so retries of a burst spread out."""
+        delay = min(self.backoff_base_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+        return datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running(),
+            "channels": list(self.channels),
+            "concurrency": {name: self.concurrency.get(name, 4) for name in self.channels},
+            "stats": self.stats,
+            "dispatch": {name: dispatcher.get_metrics() for name, dispatcher in self.dispatchers.items()}
+        }
+
+# Global outbox worker instance
+outbox_worker = OutboxWorker(
+    SessionLocal,
+    ChannelFactory.get_configured_channels(),
+    concurrency=settings.OUTBOX_CHANNEL_CONCURRENCY,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    backoff_base_seconds=settings.OUTBOX_BACKOFF_BASE_SECONDS,
+    backoff_max_seconds=settings.OUTBOX_BACKOFF_MAX_SECONDS,
+    poll_interval_seconds=settings.OUTBOX_POLL_INTERVAL_SECONDS
+)
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Tuple
+from app.repositories.delivery_archive_repo import month_start, next_month
+
+class RetentionService:
+    """Moves whole months of old deliveries out of the hot table into archive segments."""
+
+    def __init__(self, delivery_repo, archive_repo, retention_days: int, chunk_size: int = 50000):
+        self.delivery_repo = delivery_repo
+        self.archive_repo = archive_repo
+        self.retention_days = retention_days
+        self.chunk_size = chunk_size
+
+    def archive_old_deliveries(self, now: datetime = None) -> Dict[str, Any]:
+        """Archive every month that ends before the retention cutoff.
+
+        Each month is streamed to its segment file in chunks of ``chunk_size`` rows and
+        only deleted once the segment is written, so an interrupted run only leaves rows
+        that the next run merges into the same segment.
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=self.retention_days)
+        oldest = self.delivery_repo.get_oldest_delivered_at()
+
+        archived_months = []
+        archived_rows = 0
+        month = month_start(oldest) if oldest else None
+        while month and next_month(month) <= cutoff:
+            end = next_month(month)
+            rows = self.delivery_repo.get_deliveries_for_archive(month, end, batch_size=self.chunk_size)
+            if self.archive_repo.write_segment(month, self._chunks(rows)):
+                archived_rows += self.delivery_repo.delete_deliveries_between(month, end)
+                archived_months.append(month.strftime("%Y-%m"))
+            month = end
+
+        return {
+            "message": "Delivery archival completed",
+            "cutoff": cutoff,
+            "archived_months": archived_months,
+            "archived_rows": archived_rows
+        }
+
+    def _chunks(self, rows) -> Iterator[List[Tuple]]:
+        """Helper method to batch the archive query's rows into lists of ``chunk_size`` tuples."""
+        rows = iter(rows)
+        while True:
+            chunk = [tuple(row) for row in islice(rows, self.chunk_size)]
+            if not chunk:
+                return
+            yield chunk
@@ -6,13 +6,16 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 
+from app.core.settings import settings
 from app.db.session import get_db
 from app.repositories.alert_repo import AlertRepository
 from app.repositories.delivery_repo import DeliveryRepository
+from app.repositories.delivery_archive_repo import DeliveryArchiveRepository
+from app.repositories.outbox_repo import OutboxRepository
 from app.repositories.preference_repo import UserPreferenceRepository
 from app.repositories.user_repo import UserRepository
 from app.services.notification_service import NotificationService
-from app.channels.in_app import InAppChannel
+from app.services.retention_service import RetentionService
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +62,17 @@ class SchedulerService:
             max_instances=1
         )
         
+        # Job 4: Move old deliveries out of the hot table into archive segments
+        self.scheduler.add_job(
+            func=self._archive_deliveries_job,
+            trigger=CronTrigger(hour=3, minute=0),  # Every day at 3 AM
+            id="archive_deliveries",
+            name="Archive old deliveries",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1
+        )
+        
         logger.info("Scheduler initialized with default jobs")
 
     def start(self):
@@ -92,10 +106,9 @@ class SchedulerService:
             pref_repo = UserPreferenceRepository(db)
             alert_repo = AlertRepository(db)
             user_repo = UserRepository(db)
-            channels = [InAppChannel()]
             
             notification_service = NotificationService(
-                delivery_repo, pref_repo, alert_repo, user_repo, channels
+                delivery_repo, pref_repo, alert_repo, user_repo
             )
             
             # Trigger reminders
@@ -120,10 +133,9 @@ class SchedulerService:
             pref_repo = UserPreferenceRepository(db)
             alert_repo = AlertRepository(db)
             user_repo = UserRepository(db)
-            channels = [InAppChannel()]
             
             notification_service = NotificationService(
-                delivery_repo, pref_repo, alert_repo, user_repo, channels
+                delivery_repo, pref_repo, alert_repo, user_repo
             )
             
             # Reset daily snoozes
@@ -158,11 +170,37 @@ class SchedulerService:
             
             logger.info(f"Cleanup job completed: {expired_count} expired alerts archived")
             
+            # Purge outbox entries that finished long ago
+            outbox_repo = OutboxRepository(db)
+            purged = outbox_repo.purge_finished(now - timedelta(days=settings.OUTBOX_RETENTION_DAYS))
+            logger.info(f"Cleanup job purged {purged} finished outbox entries")
+            
         except Exception as e:
             logger.error(f"Error in cleanup job: {str(e)}")
         finally:
             db.close()
 
+    async def _archive_deliveries_job(self):
+        """Job to archive deliveries older than the retention window (housekeeping)."""
+        try:
+            logger.info("Starting delivery archival job")
+            
+            db = next(get_db())
+            delivery_repo = DeliveryRepository(db)
+            archive_repo = DeliveryArchiveRepository(settings.DELIVERY_ARCHIVE_DIR)
+            
+            retention_service = RetentionService(
+                delivery_repo, archive_repo, settings.DELIVERY_RETENTION_DAYS,
+                chunk_size=settings.DELIVERY_ARCHIVE_CHUNK_SIZE
+            )
+            result = retention_service.archive_old_deliveries()
+            logger.info(f"Delivery archival job completed: {result}")
+            
+        except Exception as e:
+            logger.error(f"Error in delivery archival job: {str(e)}")
+        finally:
+            db.close()
+
     def add_custom_reminder_job(self, alert_id: str, frequency_hours: int = 2):
         """Add custom reminder job for specific alert (future extensibility)."""
         job_id = f"custom_reminder_{alert_id}"
@@ -200,10 +238,9 @@ class SchedulerService:
             pref_repo = UserPreferenceRepository(db)
             alert_repo = AlertRepository(db)
             user_repo = UserRepository(db)
-            channels = [InAppChannel()]
             
             notification_service = NotificationService(
-                delivery_repo, pref_repo, alert_repo, user_repo, channels
+                delivery_repo, pref_repo, alert_repo, user_repo
             )
             
             # Get specific alert
@@ -220,14 +257,13 @@ class SchedulerService:
                 return
             
             # Get users for this alert and trigger reminders
-            users = user_repo.get_all_users()
-            eligible_users = notification_service.get_users_for_alert(alert, users)
+            eligible_users = user_repo.get_directory().resolve_audience(alert.visibility)
             
-            delivered_count = 0
-            for user in eligible_users:
-                if notification_service.should_deliver(alert, user):
-                    notification_service.deliver(alert, user)
-                    delivered_count += 1
+            prefs = pref_repo.get_preferences_for_alerts([alert.id])
+            due_users = notification_service.get_due_users(alert, eligible_users, prefs)
+            if due_users:
+                notification_service.deliver_many(alert, due_users, prefs)
+            delivered_count = len(due_users)
             
             logger.info(f"Custom reminder job for alert {alert_id} completed: {delivered_count} deliveries")
             
@@ -27,7 +27,4 @@ class UserService:
         team = self.team_repo.get_team_by_id(team_id)
         if not team:
             raise ValueError(f"Team with id {team_id} does not exist")
-        user.team_id = team_id
-        self.user_repo.db.commit()
-        self.user_repo.db.refresh(user)
-        return user
+        return self.user_repo.update_user(user.id, {"team_id": team.id})
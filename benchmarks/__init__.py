@@ -0,0 +1,9 @@
+import subprocess
+
+def git_revision() -> str:
+    """Short hash of the checked-out commit, recorded with every benchmark result."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
@@ -0,0 +1,232 @@
+"""Channel throughput benchmark against local provider stand-ins.
+
+Measures sends/s, per-send p50/p99 latency and CPU per send for each channel at several
+recipient counts, plus NotificationService.deliver_many end to end on a scratch SQLite
+database. Results are written as JSON for comparison across runs.
+
+    python -m benchmarks.channel_throughput --sizes 1000 10000 100000 --latency-ms 2 --error-rate 0.01
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# The service scenario writes to a scratch database; never the configured one
+_SCRATCH_DIR = tempfile.mkdtemp(prefix="channel-bench-")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{_SCRATCH_DIR}/bench.db")
+
+import numpy as np
+
+from app.channels.email import EmailChannel
+from app.channels.in_app import InAppChannel
+from app.channels.sms import SMSChannel
+from app.core.logging_config import logging_pipeline
+from app.core.settings import settings
+from app.models.alert import Alert, Severity
+from app.models.user import User
+from benchmarks import git_revision
+from benchmarks.providers import FakeSMTPServer, FakeSMSServer
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "channel_throughput.json")
+
+def make_alert() -> Alert:
+    return Alert(
+        id=uuid.uuid4(),
+        title="Benchmark alert",
+        body="Synthetic alert used to measure channel throughput.",
+        severity=Severity.WARNING,
+        delivery_types=["in_app", "email", "sms"],
+        created_at=datetime.utcnow()
+    )
+
+def make_users(count: int):
+    return [User(id=uuid.uuid4(), name=f"bench-user-{i}") for i in range(count)]
+
+def summarize(scenario: str, channel: str, recipients: int, concurrency: int, wall: float, cpu: float,
+              errors: int, latencies=None) -> dict:
+    result = {
+        "scenario": scenario,
+        "channel": channel,
+        "recipients": recipients,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 4),
+        "sends_per_second": round(recipients / wall, 1) if wall else None,
+        "cpu_us_per_send": round(cpu / recipients * 1e6, 2) if recipients else None,
+        "errors": errors,
+        "error_rate": round(errors / recipients, 4) if recipients else 0,
+        "p50_ms": None,
+        "p99_ms": None
+    }
+    if latencies is not None and len(latencies):
+        result["p50_ms"] = round(float(np.percentile(latencies, 50)) * 1000, 3)
+        result["p99_ms"] = round(float(np.percentile(latencies, 99)) * 1000, 3)
+    return result
+
+def bench_send(channel, alert: Alert, users, concurrency: int) -> dict:
+    """One channel.send per recipient across ``concurrency`` threads, timing each call."""
+    latencies = np.zeros(len(users))
+
+    def send(index_user):
+        index, user = index_user
+        started = time.perf_counter()
+        try:
+            ok = (channel.send(alert, user) or {}).get("status") != "failed"
+        except Exception:
+            ok = False
+        latencies[index] = time.perf_counter() - started
+        return ok
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(send, enumerate(users)))
+    else:
+        outcomes = [send(item) for item in enumerate(users)]
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    return summarize("send", channel.channel_name, len(users), concurrency, wall, cpu,
+                     outcomes.count(False), latencies)
+
+def bench_send_many(channel, alert: Alert, users) -> dict:
+    """One channel.send_many call for all recipients (the outbox worker's batch path)."""
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    results = channel.send_many(alert, users)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    errors = sum(1 for result in results if (result or {}).get("status") == "failed")
+    concurrency = getattr(channel, "pool_size", None) or getattr(channel, "concurrency", 1)
+    return summarize("send_many", channel.channel_name, len(users), concurrency, wall, cpu, errors)
+
+def bench_service(size: int, use_outbox: bool) -> dict:
+    """NotificationService.deliver_many for one alert on the scratch database."""
+    from app.db.base import Base
+    from app.db.bulk import bulk_insert
+    from app.db.session import SessionLocal, engine
+    from app.repositories.alert_repo import AlertRepository
+    from app.repositories.delivery_repo import DeliveryRepository
+    from app.repositories.preference_repo import UserPreferenceRepository
+    from app.repositories.user_repo import UserRepository
+    from app.services.digest_policy import DigestPolicy
+    from app.services.notification_service import NotificationService
+    import app.db.create_tables  # noqa: F401 - registers every model on Base.metadata
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        alert = make_alert()
+        alert.delivery_types = ["in_app"]
+        db.add(alert)
+        bulk_insert(db, User, [{"id": uuid.uuid4(), "name": f"bench-user-{i}", "team_id": None}
+                               for i in range(size)])
+        db.commit()
+        users = db.query(User).all()
+
+        service = NotificationService(
+            DeliveryRepository(db), UserPreferenceRepository(db), AlertRepository(db), UserRepository(db),
+            [InAppChannel()], use_outbox=use_outbox, digest_policy=DigestPolicy(enabled=False)
+        )
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        service.deliver_many(alert, users, {})
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        scenario = "deliver_many_outbox" if use_outbox else "deliver_many_inline"
+        return summarize(scenario, "in_app", size, 1, wall, cpu, 0)
+    finally:
+        db.close()
+
+def run(args) -> dict:
+    # Production logging pipeline (queued, sampled), written to the scratch directory
+    log_path = os.path.join(_SCRATCH_DIR, "bench.log")
+    with open(log_path, "w") as log_stream:
+        logging_pipeline.configure(settings.LOG_LEVEL, settings.LOG_JSON, settings.LOG_CHANNEL_SAMPLE_RATES,
+                                   stream=log_stream)
+        logging_pipeline.start()
+        try:
+            report = _run(args)
+        finally:
+            logging_pipeline.stop()
+    report["meta"]["log_file"] = log_path
+    return report
+
+def _run(args) -> dict:
+    alert = make_alert()
+    results = []
+    with FakeSMTPServer(args.latency_ms, args.jitter_ms, args.error_rate) as smtp, \
+            FakeSMSServer(args.latency_ms, args.jitter_ms, args.error_rate) as sms:
+        channels = {
+            "in_app": lambda: InAppChannel(),
+            "email": lambda: EmailChannel({
+                "smtp_server": "127.0.0.1", "smtp_port": smtp.port, "username": "bench", "password": "bench",
+                "simulate": False, "use_tls": False, "pool_size": args.concurrency
+            }),
+            "sms": lambda: SMSChannel({
+                "api_key": "bench", "api_secret": "bench", "api_url": sms.url, "concurrency": args.concurrency
+            })
+        }
+        for size in args.sizes:
+            users = make_users(size)
+            for name in args.channels:
+                channel = channels[name]()
+                try:
+                    results.append(bench_send(channel, alert, users, 1 if name == "in_app" else args.concurrency))
+                    results.append(bench_send_many(channel, alert, users))
+                finally:
+                    if hasattr(channel, "close"):
+                        channel.close()
+                for result in results[-2:]:
+                    print(format_row(result), flush=True)
+            if not args.skip_service:
+                for use_outbox in (False, True):
+                    results.append(bench_service(size, use_outbox))
+                    print(format_row(results[-1]), flush=True)
+        providers = {"smtp": smtp.stats.snapshot(), "sms": sms.stats.snapshot()}
+
+    return {
+        "benchmark": "channel_throughput",
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {
+                "sizes": args.sizes, "channels": args.channels, "concurrency": args.concurrency,
+                "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate
+            },
+            "providers": providers
+        },
+        "results": results
+    }
+
+def format_row(result: dict) -> str:
+    latency = f"p50 {result['p50_ms']}ms p99 {result['p99_ms']}ms" if result["p50_ms"] is not None else ""
+    return (f"{result['scenario']:<20} {result['channel']:<7} n={result['recipients']:<7} "
+            f"{result['sends_per_second']:>10}/s  cpu {result['cpu_us_per_send']}us/send  "
+            f"errors {result['error_rate']:.2%}  {latency}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--channels", nargs="+", default=["in_app", "email", "sms"],
+                        choices=["in_app", "email", "sms"])
+    parser.add_argument("--concurrency", type=int, default=8, help="threads / pooled connections per provider")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake provider response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of sends the providers reject")
+    parser.add_argument("--skip-service", action="store_true", help="skip the deliver_many scenarios")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Local stand-ins for the email and SMS providers, with configurable latency and error rates."""
+import json
+import random
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _ProviderStats:
+    """Counters shared by a fake provider's handler threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def add(self, field: str):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self):
+        with self.lock:
+            return {"connections": self.connections, "accepted": self.accepted, "rejected": self.rejected}
+
+def _respond_delay(latency_ms: float, jitter_ms: float):
+    if latency_ms or jitter_ms:
+        time.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, AUTH PLAIN, MAIL/RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def setup(self):
+        super().setup()
+        with self.server.open_lock:
+            self.server.open_connections.add(self.connection)
+
+    def finish(self):
+        with self.server.open_lock:
+            self.server.open_connections.discard(self.connection)
+        super().finish()
+
+    def handle(self):
+        server = self.server
+        server.stats.add("connections")
+        self.wfile.write(b"220 fake-smtp ready\r\n")
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    _respond_delay(server.latency_ms, server.jitter_ms)
+                    if random.random() < server.error_rate:
+                        server.stats.add("rejected")
+                        self.wfile.write(b"451 Temporary failure\r\n")
+                    else:
+                        server.stats.add("accepted")
+                        self.wfile.write(b"250 Queued\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"EHLO":
+                self.wfile.write(b"250-fake-smtp\r\n250 AUTH PLAIN\r\n")
+            elif command == b"AUTH":
+                self.wfile.write(b"235 Authentication successful\r\n")
+            elif command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"RCPT" and any(address in line for address in server.rejected_recipients):
+                server.stats.add("rejected")
+                self.wfile.write(b"550 No such user\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """In-process SMTP server on localhost; use as a context manager.
+
+    RCPT TO any address in ``rejected_recipients`` gets a 550, like an unknown mailbox.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 rejected_recipients=()):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rejected_recipients = [address.encode() for address in rejected_recipients]
+        self.stats = _ProviderStats()
+        self.open_lock = threading.Lock()
+        self.open_connections = set()
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def drop_connections(self) -> int:
+        """Close every open client connection from the server side, as a provider restart would."""
+        with self.open_lock:
+            connections = list(self.open_connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return len(connections)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+class _SMSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real provider API
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        _respond_delay(server.latency_ms, server.jitter_ms)
+        if random.random() < server.error_rate:
+            server.stats.add("rejected")
+            status, body = 503, {"error": "provider unavailable"}
+        else:
+            server.stats.add("accepted")
+            status, body = 201, {"status": "queued"}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def setup(self):
+        super().setup()
+        self.server.stats.add("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeSMSServer(ThreadingHTTPServer):
+    """In-process SMS HTTP endpoint (POST /messages); use as a context manager."""
+
+    daemon_threads = True
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _SMSHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stats = _ProviderStats()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/messages"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
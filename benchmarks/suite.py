@@ -0,0 +1,320 @@
+"""End-to-end benchmark suite on a generated data set, checked against a stored baseline.
+
+Generates a scale data set with seed.py (on a scratch SQLite database unless
+BENCH_DATABASE_URL points at a local PostgreSQL), then times the reminder sweep, the
+daily snooze reset, the user feed route, list_alerts_with_filters and every
+AnalyticsService method. Each scenario reports median wall time, query count and peak
+traced memory. Sweeps that write run inside a transaction that is rolled back, so every
+repeat sees the same data. The run fails (exit code 1) when a metric regresses past its
+threshold relative to the baseline.
+
+    python -m benchmarks.suite                      # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --update-baseline    # record this run as the new baseline
+    BENCH_DATABASE_URL=postgresql://localhost/bench python -m benchmarks.suite --users 50000
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Everything runs against a scratch database; never the configured one
+_SCRATCH_DIR = tempfile.mkdtemp(prefix="bench-suite-")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{_SCRATCH_DIR}/suite.db")
+os.environ["DELIVERY_ARCHIVE_DIR"] = os.path.join(_SCRATCH_DIR, "archive")
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import seed
+from app.channels.in_app import InAppChannel
+from app.core.logging_config import logging_pipeline
+from app.core.settings import settings
+from app.db.async_session import async_engine
+from app.db.session import SessionLocal, engine
+from app.models.alert import Alert
+from app.models.team import Team
+from app.models.user import User
+from app.repositories.alert_cache import active_alert_cache
+from app.repositories.alert_repo import AlertRepository
+from app.repositories.delivery_archive_repo import DeliveryArchiveRepository
+from app.repositories.delivery_repo import DeliveryRepository
+from app.repositories.directory import user_directory
+from app.repositories.preference_repo import UserPreferenceRepository
+from app.repositories.user_repo import UserRepository
+from app.services.alert_service import AlertService
+from app.services.analytics_service import AnalyticsService
+from app.services.notification_service import NotificationService
+from benchmarks import git_revision
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "suite.json")
+
+# Differences below these floors are noise, whatever the relative threshold says
+MIN_TIME_DELTA_SECONDS = 0.005
+MIN_MEMORY_DELTA_BYTES = 256 * 1024
+
+class QueryCounter:
+    """Counts statements sent to the database by the sync engine and the async engine."""
+
+    def __init__(self, *engines):
+        self.count = 0
+        for target in engines:
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+@contextmanager
+def rolled_back_session():
+    """Session whose commits only release savepoints; everything is rolled back at the end."""
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection, join_transaction_mode="create_savepoint", autoflush=False)
+    try:
+        yield db
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+@contextmanager
+def read_session():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def notification_service(db: Session) -> NotificationService:
+    return NotificationService(DeliveryRepository(db), UserPreferenceRepository(db), AlertRepository(db),
+                               UserRepository(db), [InAppChannel()])
+
+def analytics_service(db: Session) -> AnalyticsService:
+    return AnalyticsService(AlertRepository(db), DeliveryRepository(db), UserPreferenceRepository(db),
+                            UserRepository(db), DeliveryArchiveRepository(settings.DELIVERY_ARCHIVE_DIR))
+
+def build_scenarios(feed_users: int) -> dict:
+    """Scenario name -> (session factory, callable taking the session)."""
+    with read_session() as db:
+        alert_id = db.query(Alert.id).order_by(Alert.title).first()[0]
+        team_id = db.query(Team.id).order_by(Team.name).first()[0]
+        user_ids = [row[0] for row in db.query(User.id).order_by(User.name).limit(feed_users)]
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    client = TestClient(app)
+
+    def feed(_db):
+        for user_id in user_ids:
+            response = client.get(f"/api/v1/user/alerts/feed/{user_id}")
+            response.raise_for_status()
+
+    def list_alerts(db):
+        service = AlertService(AlertRepository(db))
+        for filters in ({}, {"status": "active"}, {"severity": "critical"}, {"audience": "team"}):
+            service.list_alerts_with_filters(**filters)
+
+    scenarios = {
+        "notifications.trigger_reminders": (rolled_back_session, lambda db: notification_service(db).trigger_reminders()),
+        "notifications.reset_daily_snoozes": (rolled_back_session, lambda db: notification_service(db).reset_daily_snoozes()),
+        f"route.user_feed[{len(user_ids)} users]": (read_session, feed),
+        "alerts.list_alerts_with_filters": (read_session, list_alerts),
+    }
+    analytics_calls = {
+        "get_dashboard_analytics": (),
+        "get_alert_analytics": (alert_id,),
+        "get_alert_performance_metrics": (alert_id,),
+        "get_system_health_metrics": (),
+        "get_trend_analytics": (),
+        "get_severity_breakdown": (),
+        "get_engagement_summary": (),
+        "get_team_analytics": (),
+        "get_single_team_analytics": (team_id,),
+    }
+    uncovered = {name for name in vars(AnalyticsService) if not name.startswith("_")
+                 and callable(getattr(AnalyticsService, name))} - set(analytics_calls)
+    if uncovered:
+        print(f"Warning: AnalyticsService methods without a scenario: {', '.join(sorted(uncovered))}")
+    for name, call_args in analytics_calls.items():
+        scenarios[f"analytics.{name}"] = (
+            read_session, lambda db, name=name, call_args=call_args: getattr(analytics_service(db), name)(*call_args))
+    return scenarios
+
+def measure(session_factory, func, repeat: int, counter: QueryCounter, slow_seconds: float) -> dict:
+    """Median wall time and query count over ``repeat`` timed runs, then one traced run for peak memory.
+
+    A scenario whose warm-up run takes longer than ``slow_seconds`` is timed once.
+    """
+    with session_factory() as db:
+        started = time.perf_counter()
+        func(db)  # warm-up: caches, compiled statements, connection pool
+        if time.perf_counter() - started > slow_seconds:
+            repeat = 1
+
+    times, queries = [], []
+    for _ in range(repeat):
+        with session_factory() as db:
+            counter.count = 0
+            started = time.perf_counter()
+            func(db)
+            times.append(time.perf_counter() - started)
+            queries.append(counter.count)
+
+    # tracemalloc slows everything down, so memory comes from its own run. The cycle
+    # collector is paused so the peak does not depend on when a collection happens to run.
+    gc.collect()
+    with session_factory() as db:
+        gc.disable()
+        tracemalloc.start()
+        try:
+            func(db)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            gc.enable()
+
+    return {
+        "wall_seconds": round(statistics.median(times), 5),
+        "wall_seconds_min": round(min(times), 5),
+        "query_count": max(queries),
+        "peak_memory_bytes": peak
+    }
+
+def generate_dataset(args):
+    # Timestamps are generated relative to the current minute rather than seed.py's current
+    # hour, so reminder due-ness (and with it the sweep's query count) matches between runs
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    seed_args = seed.parse_args([
+        "--scale", "--database-url", settings.DATABASE_URL, "--reset", "--seed", str(args.seed),
+        "--now", now.isoformat(),
+        "--teams", str(args.teams), "--users", str(args.users), "--alerts", str(args.alerts),
+        "--history-days", str(args.history_days)
+    ])
+    seed.run_scale(seed_args)
+
+def dataset_params(args) -> dict:
+    return {"seed": args.seed, "teams": args.teams, "users": args.users, "alerts": args.alerts,
+            "history_days": args.history_days, "feed_users": args.feed_users,
+            "dialect": engine.dialect.name}
+
+def run(args) -> dict:
+    if not args.reuse_dataset:
+        generate_dataset(args)
+    counter = QueryCounter(engine, async_engine.sync_engine)
+    active_alert_cache.invalidate()
+    with read_session() as db:
+        user_directory.reload(db)
+
+    results = {}
+    for name, (session_factory, func) in build_scenarios(args.feed_users).items():
+        if args.only and not any(part in name for part in args.only):
+            continue
+        results[name] = measure(session_factory, func, args.repeat, counter, args.slow_seconds)
+        print(format_row(name, results[name]), flush=True)
+
+    return {
+        "benchmark": "suite",
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "repeat": args.repeat,
+            "dataset": dataset_params(args)
+        },
+        "results": results
+    }
+
+def compare(report: dict, baseline: dict, args) -> list:
+    """Regressions of this run against the baseline, as printable strings."""
+    regressions = []
+    checks = (
+        ("wall_seconds", args.time_threshold, MIN_TIME_DELTA_SECONDS),
+        ("query_count", args.query_threshold, 0),
+        ("peak_memory_bytes", args.memory_threshold, MIN_MEMORY_DELTA_BYTES),
+    )
+    for name, result in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        for metric, threshold, floor in checks:
+            old, new = previous[metric], result[metric]
+            if new - old > max(old * threshold, floor):
+                change = f"+{(new - old) / old:.0%}" if old else "new"
+                regressions.append(f"{name}: {metric} {old} -> {new} ({change}, threshold {threshold:.0%})")
+    return regressions
+
+def format_row(name: str, result: dict) -> str:
+    return (f"{name:<48} {result['wall_seconds'] * 1000:>10.1f} ms  {result['query_count']:>6} queries  "
+            f"{result['peak_memory_bytes'] / 1024 / 1024:>8.1f} MiB peak")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--alerts", type=int, default=200)
+    parser.add_argument("--history-days", type=float, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--feed-users", type=int, default=20, help="users whose feed the route scenario fetches")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per scenario (the median is reported)")
+    parser.add_argument("--slow-seconds", type=float, default=10.0,
+                        help="scenarios whose warm-up takes longer are timed once")
+    parser.add_argument("--only", nargs="+", help="run only scenarios whose name contains one of these")
+    parser.add_argument("--reuse-dataset", action="store_true",
+                        help="skip generation; BENCH_DATABASE_URL already holds the data set "
+                             "(time-dependent scenarios drift as the data ages)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="allowed wall time increase")
+    parser.add_argument("--query-threshold", type=float, default=0.0, help="allowed query count increase")
+    parser.add_argument("--memory-threshold", type=float, default=0.2, help="allowed peak memory increase")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+    if args.reuse_dataset and "BENCH_DATABASE_URL" not in os.environ:
+        parser.error("--reuse-dataset needs BENCH_DATABASE_URL")
+
+    # Production logging pipeline, written to the scratch directory
+    log_path = os.path.join(_SCRATCH_DIR, "bench.log")
+    with open(log_path, "w") as log_stream:
+        logging_pipeline.configure(settings.LOG_LEVEL, settings.LOG_JSON, settings.LOG_CHANNEL_SAMPLE_RATES,
+                                   stream=log_stream)
+        logging_pipeline.start()
+        try:
+            report = run(args)
+        finally:
+            logging_pipeline.stop()
+    report["meta"]["log_file"] = log_path
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["meta"]["dataset"] != report["meta"]["dataset"]:
+        print(f"Baseline was recorded on a different data set ({baseline['meta']['dataset']}); "
+              f"rerun with the same options or --update-baseline")
+        return 2
+    regressions = compare(report, baseline, args)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regression(s) against baseline {baseline['meta']['git_revision']}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
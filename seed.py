@@ -1,16 +1,38 @@
 """
 Seed script to create sample data for testing the Alerting & Notification Platform.
 Creates users, teams, and sample alerts with all required attributes.
+
+With --scale it instead generates a large, reproducible data set for benchmarks: teams,
+users and alerts with a configurable visibility mix, plus days of reminder history
+(deliveries and preferences), all written with bulk inserts.
+
+    python seed.py --scale --users 50000 --alerts 500 --history-days 14 --seed 42
+    python seed.py --scale --database-url sqlite:///scale.db --reset
 """
 
+import argparse
+import random
+import time
+import uuid
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.settings import settings
+from app.db.base import Base
+from app.db.bulk import bulk_insert
 from app.db.session import get_db
+from app.models.alert import Alert, DeliveryType, Severity
+from app.models.alert_audience import AlertAudience
+from app.models.notification_delivery import NotificationDelivery
+from app.models.team import Team
+from app.models.user import User
+from app.models.user_alert_pref import UserAlertPreference
 from app.repositories.user_repo import UserRepository
 from app.repositories.team_repo import TeamRepository
 from app.repositories.alert_repo import AlertRepository
 from app.services.user_service import UserService
 from app.services.alert_service import AlertService
+import app.db.create_tables  # noqa: F401 - registers every model on Base.metadata
 
 def create_seed_data(db: Session):
     """Create seed data for testing."""
@@ -223,8 +245,234 @@ def create_seed_data(db: Session):
     print(f"   - Alerts have different visibility settings to test targeting")
     print(f"   - Some alerts will expire soon to test expiry logic")
 
-def main():
+# ------------------ SCALE MODE ------------------
+
+# Reminder frequencies and alert lifetimes scale-mode alerts are drawn from
+REMINDER_FREQUENCIES_MINUTES = [60, 120, 120, 180, 240]
+ALERT_DURATIONS = [timedelta(hours=6), timedelta(days=1), timedelta(days=3), timedelta(days=7), timedelta(days=14)]
+DELIVERY_TYPE_MIXES = [["in_app"], ["in_app"], ["in_app", "email"], ["in_app", "email", "sms"]]
+
+def parse_mix(value: str) -> dict:
+    """Parse a visibility mix such as "org=0.2,team=0.6,user=0.2" into normalized weights."""
+    weights = {"org": 0.0, "team": 0.0, "user": 0.0}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in weights:
+            raise argparse.ArgumentTypeError(f"Unknown visibility kind '{kind}' (expected org, team, user)")
+        weights[kind.strip()] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("Visibility mix weights must add up to more than 0")
+    return {kind: weight / total for kind, weight in weights.items()}
+
+class BulkWriter:
+    """Buffers generated rows for one model and writes them with bulk_insert, one commit per batch.
+
+    Writers in ``depends_on`` are flushed first, so a batch never references unwritten rows.
+    """
+
+    def __init__(self, db: Session, model, batch_size: int, depends_on=()):
+        self.db = db
+        self.model = model
+        self.batch_size = batch_size
+        self.depends_on = depends_on
+        self.rows = []
+        self.count = 0
+        self.insert_seconds = 0.0
+
+    def add(self, row: dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for writer in self.depends_on:
+            writer.flush()
+        if self.rows:
+            started = time.perf_counter()
+            bulk_insert(self.db, self.model, self.rows)
+            self.db.commit()
+            self.insert_seconds += time.perf_counter() - started
+            self.count += len(self.rows)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        print(f" {self.model.__tablename__:<24} {self.count:>10} rows  {self.insert_seconds:7.1f}s inserting")
+
+def create_scale_data(db: Session, args):
+    """Generate teams, users, alerts, audiences and reminder history from ``args``.
+
+    Every id, choice and time offset comes from one random.Random(args.seed), so the same
+    arguments and --now always produce the same data set.
+    """
+    rng = random.Random(args.seed)
+    now = args.now
+    today = now.date()
+
+    def new_id() -> uuid.UUID:
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    print(f"Generating scale data (seed {args.seed}, now {now.isoformat()})...")
+
+    # 1. Teams and users; team membership is uniform, a fraction of users have no team
+    teams = BulkWriter(db, Team, args.batch_size)
+    team_ids = [new_id() for _ in range(args.teams)]
+    for i, team_id in enumerate(team_ids):
+        teams.add({"id": team_id, "name": f"Scale Team {i + 1:05d}"})
+    teams.close()
+
+    users = BulkWriter(db, User, args.batch_size)
+    user_ids = []
+    team_members = {team_id: [] for team_id in team_ids}
+    for i in range(args.users):
+        user_id = new_id()
+        team_id = rng.choice(team_ids) if team_ids and rng.random() >= args.no_team_fraction else None
+        users.add({"id": user_id, "name": f"Scale User {i + 1:07d}", "team_id": team_id})
+        user_ids.append(user_id)
+        if team_id is not None:
+            team_members[team_id].append(user_id)
+    users.close()
+
+    # 2. Alerts, their audience rows, and per user/alert reminder history
+    alerts = BulkWriter(db, Alert, args.batch_size)
+    audiences = BulkWriter(db, AlertAudience, args.batch_size, depends_on=[alerts])
+    deliveries = BulkWriter(db, NotificationDelivery, args.batch_size, depends_on=[alerts])
+    preferences = BulkWriter(db, UserAlertPreference, args.batch_size, depends_on=[alerts])
+    kinds, weights = zip(*args.visibility_mix.items())
+    severities = list(Severity)
+    history = timedelta(days=args.history_days)
+
+    for i in range(args.alerts):
+        alert_id = new_id()
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "team" and team_ids:
+            targets = rng.sample(team_ids, min(len(team_ids), rng.randint(1, 3)))
+            visibility = {"org": False, "teams": [str(t) for t in targets], "users": []}
+            audience = [user_id for team_id in targets for user_id in team_members[team_id]]
+        elif kind == "user" and user_ids:
+            audience = rng.sample(user_ids, min(len(user_ids), rng.randint(1, 20)))
+            visibility = {"org": False, "teams": [], "users": [str(u) for u in audience]}
+        else:
+            visibility = {"org": True, "teams": [], "users": []}
+            audience = user_ids
+
+        start_time = now - history * rng.random()
+        expiry_time = start_time + rng.choice(ALERT_DURATIONS)
+        freq = rng.choice(REMINDER_FREQUENCIES_MINUTES)
+        delivery_types = rng.choice(DELIVERY_TYPE_MIXES)
+        alerts.add({
+            "id": alert_id,
+            "title": f"Scale alert {i + 1:06d}",
+            "body": f"Generated {kind} alert {i + 1} for scale testing.",
+            "severity": rng.choice(severities),
+            "delivery_types": delivery_types,
+            "reminder_enabled": True,
+            "reminder_freq_minutes": freq,
+            "start_time": start_time,
+            "expiry_time": expiry_time,
+            "is_archived": rng.random() < args.archived_fraction,
+            "visibility": visibility,
+            "created_at": start_time
+        })
+        for row in AlertRepository.audience_rows(alert_id, visibility):
+            audiences.add(dict(row, id=new_id()))
+
+        # Reminder ticks from start until expiry (or now): the first send plus the latest ones
+        ticks = []
+        tick, end = start_time, min(expiry_time, now)
+        while tick <= end:
+            ticks.append(tick)
+            tick += timedelta(minutes=freq)
+        if len(ticks) > args.max_reminders:
+            ticks = ticks[:1] + ticks[len(ticks) - args.max_reminders + 1:] if args.max_reminders > 1 else ticks[:1]
+        if not ticks:
+            continue
+        for user_id in audience:
+            jitter = timedelta(seconds=rng.random() * 60)
+            for tick in ticks:
+                delivered_at = tick + jitter
+                for channel in delivery_types:
+                    read_at = None
+                    if rng.random() < args.read_rate:
+                        read_at = delivered_at + timedelta(minutes=rng.expovariate(1 / 30))
+                        if read_at > now:
+                            read_at = None
+                    deliveries.add({"id": new_id(), "alert_id": alert_id, "user_id": user_id, "channel": channel,
+                                    "delivered_at": delivered_at, "read_at": read_at})
+            preferences.add({
+                "id": new_id(), "user_id": user_id, "alert_id": alert_id,
+                # Snoozed today, or yesterday so the daily snooze reset has work to do
+                "snoozed_date": today - timedelta(days=rng.randint(0, 1)) if rng.random() < args.snooze_rate else None,
+                "last_delivered_at": ticks[-1] + jitter
+            })
+    for writer in (alerts, audiences, deliveries, preferences):
+        writer.close()
+
+    print(f"\nScale data created: {teams.count} teams, {users.count} users, {alerts.count} alerts, "
+          f"{deliveries.count} deliveries, {preferences.count} preferences")
+
+def run_scale(args):
+    """Run scale mode against --database-url (default: the configured DATABASE_URL)."""
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == "sqlite":
+        # A throwaway benchmark database: trade durability for load speed
+        @event.listens_for(engine, "connect")
+        def _fast_sqlite(connection, _):
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    started = time.perf_counter()
+    try:
+        create_scale_data(db, args)
+    except Exception as e:
+        print(f" Error creating scale data: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        engine.dispose()
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Create sample data, or with --scale a large benchmark data set.")
+    parser.add_argument("--scale", action="store_true", help="generate a large data set with bulk inserts")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL,
+                        help="scale mode target (PostgreSQL or SQLite); defaults to DATABASE_URL")
+    parser.add_argument("--reset", action="store_true", help="scale mode: drop and recreate all tables first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--now", type=datetime.fromisoformat, default=None,
+                        help="reference time for generated timestamps (default: the current hour, UTC)")
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--alerts", type=int, default=200)
+    parser.add_argument("--visibility-mix", type=parse_mix, default=parse_mix("org=0.2,team=0.6,user=0.2"),
+                        help='share of alerts per audience kind, e.g. "org=0.2,team=0.6,user=0.2"')
+    parser.add_argument("--history-days", type=float, default=14, help="alert start times spread over this many past days")
+    parser.add_argument("--max-reminders", type=int, default=6, help="most deliveries per user, alert and channel")
+    parser.add_argument("--read-rate", type=float, default=0.4)
+    parser.add_argument("--snooze-rate", type=float, default=0.1)
+    parser.add_argument("--no-team-fraction", type=float, default=0.05)
+    parser.add_argument("--archived-fraction", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per bulk insert and commit")
+    args = parser.parse_args(argv)
+    if args.now is None:
+        args.now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    if args.max_reminders < 1:
+        parser.error("--max-reminders must be at least 1")
+    return args
+
+def main(argv=None):
     """Main function to run seed data creation."""
+    args = parse_args(argv)
+    if args.scale:
+        run_scale(args)
+        return
+
     db = next(get_db())
     try:
         create_seed_data(db)
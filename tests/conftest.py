@@ -0,0 +1,30 @@
+import os
+
+# Settings need a database URL at import; tests use their own scratch databases
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.repositories.alert_cache import active_alert_cache
+from app.repositories.directory import user_directory
+from app.models import alert, alert_audience, user, team, notification_delivery, notification_outbox, user_alert_pref  # noqa: F401 - registers every model on Base.metadata
+
+@pytest.fixture
+def db(tmp_path):
+    """Session on a scratch SQLite database with every table created.
+
+    The process-wide alert cache and user directory are reset, since each test has its own database.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    active_alert_cache.invalidate()
+    user_directory.reload(session)
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
@@ -0,0 +1,101 @@
+"""Archive segments: chunked writes, merges and the stored per-segment summaries."""
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.models.alert import Severity
+from app.repositories.delivery_archive_repo import DeliveryArchiveRepository
+
+MONTH = datetime(2025, 1, 1)
+
+def make_rows(count: int, alerts, users, teams):
+    rows = []
+    for i in range(count):
+        delivered_at = MONTH + timedelta(hours=i)
+        read_at = delivered_at + timedelta(minutes=i % 7 + 1) if i % 3 == 0 else None
+        rows.append((uuid.uuid4(), alerts[i % len(alerts)], users[i % len(users)], "in_app", delivered_at, read_at,
+                     [Severity.INFO, Severity.CRITICAL][i % 2], teams[i % len(teams)]))
+    return rows
+
+@pytest.fixture
+def rows():
+    alerts = [uuid.uuid4() for _ in range(3)]
+    users = [uuid.uuid4() for _ in range(5)]
+    teams = [uuid.uuid4(), None]
+    return make_rows(200, alerts, users, teams)
+
+def chunks(rows, size: int):
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+def summary_view(summary) -> dict:
+    return {name: getattr(summary, name) for name in ("severity", "users", "alerts", "alert_users", "teams", "team_users")}
+
+def test_chunked_write_loads_like_one_array(tmp_path, rows):
+    archive = DeliveryArchiveRepository(str(tmp_path))
+    assert archive.write_segment(MONTH, chunks(rows, 30)) == 200
+
+    segment = archive.load_segment(MONTH, ("id", "delivered_at"))
+    assert segment["id"].tolist() == [str(row[0]) for row in rows]
+    assert archive.get_delivery_totals() == (200, sum(1 for row in rows if row[5]))
+
+def test_rewrite_replaces_rows_with_the_same_id(tmp_path, rows):
+    archive = DeliveryArchiveRepository(str(tmp_path))
+    archive.write_segment(MONTH, chunks(rows, 64))
+    reread = [row[:5] + (row[4] + timedelta(minutes=1),) + row[6:] for row in rows[:10]]
+    extra = make_rows(1, [rows[0][1]], [rows[0][2]], [rows[0][7]])
+
+    assert archive.write_segment(MONTH, [reread, extra]) == 11
+
+    ids = archive.load_segment(MONTH, ("id",))["id"]
+    assert len(ids) == len(set(ids)) == 201
+    assert archive.get_delivery_totals()[1] == sum(1 for row in rows[10:] if row[5]) + 10 + 1  # the extra row is read
+    assert archive.write_segment(MONTH, iter([])) == 0
+
+def test_stored_summary_matches_the_rows(tmp_path, rows):
+    archive = DeliveryArchiveRepository(str(tmp_path / "chunked"))
+    archive.write_segment(MONTH, chunks(rows, 17))
+    with np.load(archive.segment_path(MONTH)) as segment:
+        assert "summary.alerts.stats" in segment.files
+
+    # A segment without stored aggregates (the original single-array layout) is summarised from its rows
+    legacy = DeliveryArchiveRepository(str(tmp_path / "legacy"))
+    legacy_path = legacy.segment_path(MONTH)
+    (tmp_path / "legacy").mkdir()
+    np.savez_compressed(legacy_path, **legacy._to_columns(rows))
+
+    assert summary_view(archive.get_summary(MONTH)) == summary_view(legacy.get_summary(MONTH))
+
+    alert_id = rows[0][1]
+    alert_rows = [row for row in rows if row[1] == alert_id]
+    read_seconds = [(row[5] - row[4]).total_seconds() for row in alert_rows if row[5]]
+    summary = archive.get_alert_summary(alert_id)
+    assert summary["delivered"] == len(alert_rows)
+    assert summary["read"] == len(read_seconds)
+    assert summary["users"] == {str(row[2]) for row in alert_rows}
+    assert summary["read_seconds"] == pytest.approx(sum(read_seconds))
+    assert (summary["fastest_read_seconds"], summary["slowest_read_seconds"]) == (min(read_seconds), max(read_seconds))
+    assert (summary["first_delivered"], summary["last_delivered"]) == (alert_rows[0][4], alert_rows[-1][4])
+
+def test_summary_is_cached_until_the_segment_changes(tmp_path, rows):
+    archive = DeliveryArchiveRepository(str(tmp_path))
+    archive.write_segment(MONTH, [rows[:100]])
+    first = archive.get_summary(MONTH)
+    assert DeliveryArchiveRepository(str(tmp_path)).get_summary(MONTH) is first
+
+    archive.write_segment(MONTH, [rows[100:]])
+    assert archive.get_summary(MONTH) is not first
+    assert archive.get_delivery_totals()[0] == 200
+
+def test_team_stats_scan_only_months_the_window_cuts(tmp_path, rows):
+    archive = DeliveryArchiveRepository(str(tmp_path))
+    archive.write_segment(MONTH, [rows])
+    team = str(rows[0][7])
+
+    whole = archive.get_team_delivery_stats(MONTH, datetime(2025, 2, 1))[team]
+    assert whole["delivered"] == sum(1 for row in rows if str(row[7]) == team)
+
+    cut = archive.get_team_delivery_stats(MONTH, MONTH + timedelta(hours=50))[team]
+    assert cut["delivered"] == sum(1 for row in rows[:50] if str(row[7]) == team)
+    assert cut["users"] == {str(row[2]) for row in rows[:50] if str(row[7]) == team}
@@ -0,0 +1,73 @@
+"""Reminder sweep recipients and failure isolation."""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.channels.in_app import InAppChannel
+from app.models.alert import Alert, Severity
+from app.models.notification_delivery import NotificationDelivery
+from app.models.team import Team
+from app.models.user import User
+from app.repositories.alert_repo import AlertRepository
+from app.repositories.delivery_repo import DeliveryRepository
+from app.repositories.preference_repo import UserPreferenceRepository
+from app.repositories.user_repo import UserRepository
+from app.services.digest_policy import DigestPolicy
+from app.services.notification_service import NotificationService
+
+@pytest.fixture
+def sweep_data(db):
+    teams = [Team(id=uuid.uuid4(), name="Ops"), Team(id=uuid.uuid4(), name="Sales")]
+    users = [User(id=uuid.uuid4(), name=f"user-{i}", team_id=teams[0].id) for i in range(3)]
+    started = datetime.utcnow() - timedelta(hours=1)
+    alerts = [
+        Alert(id=uuid.uuid4(), title=f"Ops alert {i}", body="Body", severity=Severity.INFO, delivery_types=["in_app"],
+              start_time=started, created_at=started, visibility={"org": False, "teams": [str(teams[0].id)]})
+        for i in range(2)
+    ]
+    db.add_all([*teams, *users, *alerts])
+    db.commit()
+    return teams, users, alerts
+
+def make_service(db) -> NotificationService:
+    return NotificationService(
+        DeliveryRepository(db), UserPreferenceRepository(db), AlertRepository(db), UserRepository(db),
+        [InAppChannel()], use_outbox=False, digest_policy=DigestPolicy(enabled=False)
+    )
+
+def recipients(db, alert) -> set:
+    return {d.user_id for d in db.query(NotificationDelivery).filter(NotificationDelivery.alert_id == alert.id)}
+
+def test_sweep_sees_users_changed_by_other_processes(db, sweep_data):
+    teams, users, alerts = sweep_data
+    UserRepository(db).get_directory(reload=True)
+
+    # Written behind the directory's back, as another worker would
+    db.query(User).filter(User.id == users[0].id).delete()
+    db.query(User).filter(User.id == users[1].id).update({"team_id": teams[1].id})
+    db.commit()
+
+    result = make_service(db).trigger_reminders()
+
+    assert result["failed_alerts"] == 0
+    assert result["delivered"] == 2
+    assert recipients(db, alerts[0]) == recipients(db, alerts[1]) == {users[2].id}
+
+def test_failed_alert_does_not_stop_the_sweep(db, sweep_data, monkeypatch):
+    teams, users, alerts = sweep_data
+    service = make_service(db)
+    create_deliveries_bulk = service.delivery_repo.create_deliveries_bulk
+
+    def fail_first_alert(rows, **kwargs):
+        if rows[0][0] == alerts[0].id:
+            raise RuntimeError("insert failed")
+        return create_deliveries_bulk(rows, **kwargs)
+
+    monkeypatch.setattr(service.delivery_repo, "create_deliveries_bulk", fail_first_alert)
+    result = service.trigger_reminders()
+
+    assert result["failed_alerts"] == 1
+    assert result["delivered"] == 3
+    assert recipients(db, alerts[0]) == set()
+    assert recipients(db, alerts[1]) == {user.id for user in users}
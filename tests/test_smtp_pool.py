@@ -0,0 +1,90 @@
+"""EmailChannel.send_many against the in-process fake SMTP server."""
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.channels.email import EmailChannel
+from app.models.alert import Alert, Severity
+from app.models.user import User
+from benchmarks.providers import FakeSMTPServer
+
+@pytest.fixture
+def smtp():
+    with FakeSMTPServer() as server:
+        yield server
+
+def make_channel(server: FakeSMTPServer, **config) -> EmailChannel:
+    return EmailChannel({
+        "smtp_server": "127.0.0.1", "smtp_port": server.port, "username": "test", "password": "test",
+        "simulate": False, "use_tls": False, **config
+    })
+
+def make_alert() -> Alert:
+    return Alert(id=uuid.uuid4(), title="Pool test", body="Pooled SMTP sessions", severity=Severity.INFO,
+                 created_at=datetime.utcnow())
+
+def make_users(count: int):
+    return [User(id=uuid.uuid4(), name=f"user-{i}") for i in range(count)]
+
+def send_all(channel: EmailChannel, count: int):
+    results = channel.send_many(make_alert(), make_users(count))
+    assert [result["status"] for result in results] == ["sent"] * count
+
+def test_sessions_are_reused_across_messages(smtp):
+    channel = make_channel(smtp, pool_size=4)
+    try:
+        send_all(channel, 200)
+        stats = channel.get_stats()
+    finally:
+        channel.close()
+
+    assert smtp.stats.snapshot()["accepted"] == 200
+    assert stats["messages_sent"] == 200
+    assert stats["connections_opened"] <= 4
+    assert smtp.stats.snapshot()["connections"] <= 4
+
+def test_sessions_are_recycled_after_reuse_limit(smtp):
+    channel = make_channel(smtp, pool_size=2, max_messages_per_session=10)
+    try:
+        send_all(channel, 100)
+        stats = channel.get_stats()
+    finally:
+        channel.close()
+
+    # Every session closes after 10 messages; only the last one per worker may end short
+    assert 10 <= stats["connections_opened"] <= 12
+    assert stats["connections_closed"] >= stats["connections_opened"] - 2
+    assert smtp.stats.snapshot()["connections"] == stats["connections_opened"]
+
+def test_dropped_connection_reconnects(smtp):
+    channel = make_channel(smtp, pool_size=2)
+    try:
+        send_all(channel, 20)
+        assert smtp.drop_connections() > 0
+        send_all(channel, 20)
+        stats = channel.get_stats()
+    finally:
+        channel.close()
+
+    assert stats["reconnects"] >= 1
+    assert stats["messages_sent"] == 40
+    assert smtp.stats.snapshot()["accepted"] == 40
+
+def test_refused_recipient_keeps_the_session():
+    with FakeSMTPServer(rejected_recipients=["unknown@example.com"]) as smtp:
+        channel = make_channel(smtp, pool_size=1)
+        recipients = [SimpleNamespace(id=uuid.uuid4(), email=f"user-{i}@example.com") for i in range(10)]
+        recipients[3].email = "unknown@example.com"
+        try:
+            results = channel.send_many(make_alert(), recipients)
+            stats = channel.get_stats()
+        finally:
+            channel.close()
+
+    assert [result["status"] for result in results].count("failed") == 1
+    assert results[3]["status"] == "failed"
+    assert stats["connections_opened"] == 1
+    assert stats["reconnects"] == 0
+    assert stats["messages_sent"] == 9
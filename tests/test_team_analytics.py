@@ -0,0 +1,75 @@
+"""Team analytics windows, with and without archived deliveries."""
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.models.alert import Alert, Severity
+from app.models.notification_delivery import NotificationDelivery
+from app.models.team import Team
+from app.models.user import User
+from app.models.user_alert_pref import UserAlertPreference
+from app.repositories.alert_repo import AlertRepository
+from app.repositories.delivery_archive_repo import DeliveryArchiveRepository
+from app.repositories.delivery_repo import DeliveryRepository
+from app.repositories.preference_repo import UserPreferenceRepository
+from app.repositories.user_repo import UserRepository
+from app.services.analytics_service import AnalyticsService
+
+@pytest.fixture
+def team_data(db):
+    team = Team(id=uuid.uuid4(), name="Platform")
+    users = [User(id=uuid.uuid4(), name=f"user-{i}", team_id=team.id) for i in range(2)]
+    alert = Alert(id=uuid.uuid4(), title="Team alert", body="Body", severity=Severity.WARNING,
+                  delivery_types=["in_app"], start_time=datetime(2024, 12, 1), created_at=datetime(2024, 12, 1))
+    db.add_all([team, *users, alert])
+    db.flush()
+    db.add_all([
+        NotificationDelivery(alert_id=alert.id, user_id=users[0].id, channel="in_app",
+                             delivered_at=datetime(2025, 1, 20, 9), read_at=datetime(2025, 1, 20, 9, 10)),
+        NotificationDelivery(alert_id=alert.id, user_id=users[1].id, channel="in_app",
+                             delivered_at=datetime(2025, 2, 1, 9)),
+        UserAlertPreference(user_id=users[0].id, alert_id=alert.id, snoozed_date=date(2025, 1, 31)),
+        UserAlertPreference(user_id=users[1].id, alert_id=alert.id, snoozed_date=date(2025, 2, 1)),
+    ])
+    db.commit()
+    return team, users, alert
+
+def make_service(db, archive_dir) -> AnalyticsService:
+    return AnalyticsService(AlertRepository(db), DeliveryRepository(db), UserPreferenceRepository(db),
+                            UserRepository(db), DeliveryArchiveRepository(str(archive_dir)))
+
+def test_aware_window_with_archived_segment(db, team_data, tmp_path):
+    team, users, alert = team_data
+    archive = DeliveryArchiveRepository(str(tmp_path / "archive"))
+    archive.write_segment(datetime(2024, 12, 1), [[
+        (uuid.uuid4(), alert.id, users[1].id, "in_app", datetime(2024, 12, 5, 9), datetime(2024, 12, 5, 9, 20),
+         Severity.WARNING, team.id)
+    ]])
+    service = make_service(db, tmp_path / "archive")
+
+    result = service.get_team_analytics(start=datetime(2024, 12, 1, tzinfo=timezone.utc),
+                                        end=datetime(2025, 2, 1, tzinfo=timezone.utc))
+    stats = result["teams"][0]
+
+    assert result["window"] == {"start": datetime(2024, 12, 1), "end": datetime(2025, 2, 1)}
+    assert stats["total_delivered"] == 2
+    assert stats["total_read"] == 2
+    assert stats["users_reached"] == 2
+    assert stats["avg_time_to_read_minutes"] == 15
+
+    # 01:00+01:00 is midnight UTC, so the archived December delivery is inside the window
+    single = service.get_single_team_analytics(team.id, start=datetime(2024, 12, 1, 1, tzinfo=timezone(timedelta(hours=1))))
+    assert single["total_delivered"] == 3
+
+def test_snoozes_use_the_delivery_window(db, team_data, tmp_path):
+    service = make_service(db, tmp_path / "archive")
+
+    january = service.get_team_analytics(start=datetime(2025, 1, 1), end=datetime(2025, 2, 1))["teams"][0]
+    assert january["total_delivered"] == 1
+    assert january["snooze_count"] == 1
+
+    # An end inside a day still counts that day's snoozes
+    through_feb_1 = service.get_team_analytics(start=datetime(2025, 1, 1), end=datetime(2025, 2, 1, 12))["teams"][0]
+    assert through_feb_1["total_delivered"] == 2
+    assert through_feb_1["snooze_count"] == 2